@@ -1,85 +1,111 @@
 # ai_module/predictions.py
-from market_analysis.models import JobOffer, Skill
+import numpy as np
+from django.db.models import Case, IntegerField, Sum, Value, When
+from market_analysis.rollups import DAY, demand_rollups
 from datetime import datetime, timedelta
 
 # Este módulo contiene funciones para calcular tendencias de habilidades en ofertas de trabajo.
 # Utiliza datos de ofertas de trabajo de los últimos 90 días para predecir la demanda futura.
+# Los conteos de todas las habilidades se obtienen con una sola consulta agrupada por
+# (habilidad, fuente, periodo de 30 días) sobre las series diarias ya agregadas
+# (market_analysis/rollups.py) y las tendencias se calculan a la vez con NumPy.
 
-# Calcula la tendencia de una habilidad específica en un origen de datos dado.
-# Retorna la demanda futura de la habilidad en base a las ofertas de los últimos 90 días.
+SOURCES = ['LinkedIn', 'Tecnoempleo']
+SOURCE_WEIGHTS = {'LinkedIn': 1.5}
+
+# Periodos de 30 días: 0 = últimos 30 días, 1 = de 30 a 60 días, 2 = de 60 a 90 días.
+PERIODS = 3
+
+
+# Devuelve (ids de habilidad, nombres, matriz de conteos) con forma
+# (habilidades, fuentes, periodos) a partir de una única consulta agrupada.
 # Parámetros:
-# - skill: la habilidad a analizar.
-# - source: el origen de los datos (por ejemplo, LinkedIn).
-# - days_ahead: número de días a predecir en el futuro.
-def calculate_skill_trend(skill, source, days_ahead=30):
-    today = datetime.now().date()
+# - sources: lista de orígenes de datos (columnas de la matriz).
+# - today: fecha de referencia (por defecto, hoy).
+# - skill_ids: si se indica, limita la consulta a esas habilidades.
+def skill_demand_matrix(sources=SOURCES, today=None, skill_ids=None):
+    today = today or datetime.now().date()
     period_30_days_ago = today - timedelta(days=30)
     period_60_days_ago = today - timedelta(days=60)
     period_90_days_ago = today - timedelta(days=90)
 
-    offers_last_30_days = JobOffer.objects.filter(
-        source=source,
-        publication_date__gte=period_30_days_ago,
-        skills__id=skill.id
-    ).count()
-
-    offers_30_to_60_days = JobOffer.objects.filter(
-        source=source,
-        publication_date__gte=period_60_days_ago,
-        publication_date__lt=period_30_days_ago,
-        skills__id=skill.id
-    ).count()
-
-    offers_60_to_90_days = JobOffer.objects.filter(
-        source=source,
-        publication_date__gte=period_90_days_ago,
-        publication_date__lt=period_60_days_ago,
-        skills__id=skill.id
-    ).count()
-
-    weight = 1.5 if source == "LinkedIn" else 1.0
-    offers_last_30_days = int(offers_last_30_days * weight)
-    offers_30_to_60_days = int(offers_30_to_60_days * weight)
-    offers_60_to_90_days = int(offers_60_to_90_days * weight)
-
-    if offers_30_to_60_days + offers_60_to_90_days == 0:
-        return 0
+    rollups = demand_rollups(DAY, start=period_90_days_ago, skill_ids=skill_ids, sources=sources)
+    rows = rollups.annotate(
+        period=Case(
+            When(period_start__gte=period_30_days_ago, then=Value(0)),
+            When(period_start__gte=period_60_days_ago, then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField(),
+        )
+    ).values_list('skill_id', 'skill__name', 'source', 'period').annotate(
+        count=Sum('demand_count')
+    ).order_by('skill_id')
+
+    ids, names, index = [], [], {}
+    cells = []
+    source_index = {source: i for i, source in enumerate(sources)}
+    for skill_id, name, source, period, count in rows:
+        if skill_id not in index:
+            index[skill_id] = len(ids)
+            ids.append(skill_id)
+            names.append(name)
+        cells.append((index[skill_id], source_index[source], period, count))
 
-    avg_offers_prev = (offers_30_to_60_days + offers_60_to_90_days) / 60
-    avg_offers_recent = offers_last_30_days / 30
+    counts = np.zeros((len(ids), len(sources), PERIODS), dtype=np.int64)
+    if cells:
+        rows_idx, cols_idx, periods, values = np.array(cells, dtype=np.int64).T
+        counts[rows_idx, cols_idx, periods] = values
+    return ids, names, counts
 
-    if avg_offers_prev == 0:
-        trend = 1 if avg_offers_recent > 0 else 0
-    else:
-        trend = (avg_offers_recent - avg_offers_prev) / avg_offers_prev
 
-    current_demand = offers_last_30_days
-    predicted_demand = current_demand * (1 + trend * (days_ahead / 30))
+# Calcula la demanda predicha para cada (habilidad, fuente) a partir de la matriz de conteos.
+# Aplica las mismas reglas que el cálculo por habilidad: ponderación por fuente truncada
+# a entero, tendencia de la media diaria reciente frente a la de los 60 días anteriores
+# y demanda predicha nunca negativa.
+def predict_demand(counts, sources=SOURCES, days_ahead=30):
+    weights = np.array([SOURCE_WEIGHTS.get(source, 1.0) for source in sources])
+    weighted = np.trunc(counts * weights[np.newaxis, :, np.newaxis])
+    recent, previous = weighted[..., 0], weighted[..., 1] + weighted[..., 2]
 
-    return max(0, int(predicted_demand))
+    avg_offers_prev = previous / 60
+    avg_offers_recent = recent / 30
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trend = np.where(previous > 0, (avg_offers_recent - avg_offers_prev) / avg_offers_prev, 0.0)
+
+    predicted = recent * (1 + trend * (days_ahead / 30))
+    predicted = np.where(previous > 0, np.maximum(0, np.trunc(predicted)), 0)
+    return predicted.astype(np.int64)
+
+
+# Calcula la tendencia de una habilidad específica en un origen de datos dado.
+# Retorna la demanda futura de la habilidad en base a las ofertas de los últimos 90 días.
+# Parámetros:
+# - skill: la habilidad a analizar.
+# - source: el origen de los datos (por ejemplo, LinkedIn).
+# - days_ahead: número de días a predecir en el futuro.
+def calculate_skill_trend(skill, source, days_ahead=30):
+    _, _, counts = skill_demand_matrix(sources=[source], skill_ids=[skill.id])
+    if not counts.size:
+        return 0
+    return int(predict_demand(counts, sources=[source], days_ahead=days_ahead)[0, 0])
 
 # Obtiene las tendencias futuras de todas las habilidades disponibles.
 # Retorna una lista de habilidades con su demanda futura predicha.
 # Parámetros:
 # - days_ahead: número de días a predecir en el futuro.
 def get_future_skill_trends(days_ahead=30):
-    skills = Skill.objects.all()
-    sources = ['LinkedIn', 'Tecnoempleo']
     predictions = [
         {'skill': 'Python', 'predicted_demand': 15},
         {'skill': 'Java', 'predicted_demand': 10},
     ]
 
-    for skill in skills:
-        total_predicted_demand = 0
-        for source in sources:
-            predicted_demand = calculate_skill_trend(skill, source, days_ahead)
-            total_predicted_demand += predicted_demand
-        if total_predicted_demand > 0:
-            predictions.append({
-                'skill': skill.name,
-                'predicted_demand': total_predicted_demand
-            })
+    _, names, counts = skill_demand_matrix(SOURCES)
+    total_predicted_demand = predict_demand(counts, SOURCES, days_ahead).sum(axis=1)
+    for position in np.flatnonzero(total_predicted_demand > 0):
+        predictions.append({
+            'skill': names[position],
+            'predicted_demand': int(total_predicted_demand[position])
+        })
 
     predictions.sort(key=lambda x: x['predicted_demand'], reverse=True)
-    return predictions
\ No newline at end of file
+    return predictions
@@ -1,116 +1,187 @@
 # ai_module/recommendations.py
-from sklearn.metrics.pairwise import cosine_similarity
+# Recomendación de tareas abiertas (pendientes o en progreso) según las habilidades del usuario.
+#
+# Las habilidades de las tareas (`projects.Skill`) y las del usuario (`market_analysis.Skill`)
+# están en tablas distintas, así que se comparan por nombre en minúsculas. Todas las tareas
+# abiertas se puntúan a la vez:
+#   1. `TaskSkillIndex` es una matriz dispersa tareas x habilidades (SciPy, CSC) construida con
+#      una sola consulta a la tabla intermedia tarea-habilidad, más el factor de cada tarea
+#      (peso de su prioridad / norma de su fila).
+#   2. La puntuación es la similitud coseno con el vector del usuario por el peso de la
+#      prioridad: basta sumar las columnas de sus habilidades y escalar por fila.
+#   3. Las `max_recommendations` mejores se eligen con `np.argpartition` (sin ordenar todas).
+# El índice se guarda en el proceso y se descarta al cambiar tareas o habilidades (señales)
+# o tras RECOMMENDER_INDEX_TTL segundos (cambios hechos por otros procesos).
+import os
+import threading
+import time
+
 import numpy as np
-from projects.models import Task, Project
-from market_analysis.models import Skill
-from django.utils import timezone
+from django.conf import settings
 from django.contrib.auth import get_user_model
-import os
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from scipy import sparse
+
+from projects.models import Project, Skill, Task
 
 User = get_user_model()
 
+OPEN_STATES = ('pending', 'in_progress')
+PRIORITY_WEIGHTS = {'low': 1.0, 'medium': 1.2, 'high': 1.5}
+
+
+# Matriz tareas x habilidades de las tareas abiertas que tienen alguna habilidad.
+class TaskSkillIndex:
+    def __init__(self, rows):
+        task_index, skill_index = {}, {}
+        priorities = []
+        task_positions, skill_positions = [], []
+        for task_id, priority, name in rows:
+            if task_id not in task_index:
+                task_index[task_id] = len(task_index)
+                priorities.append(priority)
+            task_positions.append(task_index[task_id])
+            skill_positions.append(skill_index.setdefault(name.lower(), len(skill_index)))
+
+        self.task_ids = np.fromiter(task_index, dtype=np.int64, count=len(task_index))
+        self.skill_index = skill_index
+        matrix = sparse.csc_matrix(
+            (np.ones(len(task_positions)), (task_positions, skill_positions)),
+            shape=(len(task_index), len(skill_index)),
+        )
+        # Una habilidad repetida en una tarea (mismo nombre con otras mayúsculas) cuenta una vez
+        matrix.data[:] = 1
+        self.matrix = matrix
+        norms = np.sqrt(np.asarray(matrix.sum(axis=1)).ravel())
+        weights = np.array([PRIORITY_WEIGHTS.get(priority, 1.0) for priority in priorities])
+        self.row_scale = weights / np.where(norms > 0, norms, 1)
+
+    def __len__(self):
+        return len(self.task_ids)
+
+    @classmethod
+    def build(cls):
+        through = Task.skills.through
+        rows = through.objects.filter(task__state__in=OPEN_STATES).values_list(
+            'task_id', 'task__priority', 'skill__name'
+        ).order_by('task_id')
+        return cls(rows.iterator(chunk_size=10000))
+
+    # Puntuación de cada tarea (coseno por peso de la prioridad) para un conjunto de nombres
+    # de habilidades.
+    def scores(self, skill_names):
+        columns = sorted({self.skill_index[name.lower()] for name in skill_names if name.lower() in self.skill_index})
+        if not columns:
+            return np.zeros(len(self))
+        overlap = np.asarray(self.matrix[:, columns].sum(axis=1)).ravel()
+        return overlap * self.row_scale / np.sqrt(len(columns))
+
+    # Ids de las `k` tareas con mayor puntuación positiva, de mayor a menor (a igual
+    # puntuación, la de menor id).
+    def top_k(self, skill_names, k):
+        scores = self.scores(skill_names)
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k > 0:
+            # Puntuación de la k-ésima; se conservan también las empatadas con ella para
+            # desempatar por id y no por la posición que deje argpartition
+            kth = candidates[np.argpartition(-scores[candidates], k - 1)[k - 1]]
+            candidates = candidates[scores[candidates] >= scores[kth]]
+        order = np.lexsort((self.task_ids[candidates], -scores[candidates]))[:k]
+        return self.task_ids[candidates[order]].tolist()
+
+
+_index = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+# Devuelve el índice del proceso (lo construye la primera vez, si se ha invalidado o si ha caducado).
+def get_task_index():
+    global _index, _loaded_at
+    ttl = getattr(settings, 'RECOMMENDER_INDEX_TTL', 300)
+    with _lock:
+        if _index is None or time.monotonic() - _loaded_at > ttl:
+            _index = TaskSkillIndex.build()
+            _loaded_at = time.monotonic()
+        return _index
+
+
+def invalidate_task_index():
+    global _index
+    with _lock:
+        _index = None
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+@receiver(m2m_changed, sender=Task.skills.through)
+def _tasks_changed(sender, action='post_save', **kwargs):
+    if action.startswith('post'):
+        invalidate_task_index()
+
+
+# Crea un proyecto y dos tareas de prueba si no hay tareas abiertas (instalaciones nuevas).
+def _ensure_demo_tasks(user):
+    if Task.objects.filter(state__in=OPEN_STATES).exists():
+        return
+    default_user = User.objects.filter(is_superuser=True).first() or User.objects.first()
+    if not default_user:
+        default_user = User.objects.create_user(
+            username='default_manager',
+            password=os.getenv('AI_MODULE_PASSWORD'),
+            email=os.getenv('AI_MODULE_EMAIL'),
+            is_active=True
+        )
+        print("Creado usuario predeterminado: default_manager")
+    project, _ = Project.objects.get_or_create(
+        name='Proyecto de Prueba',
+        defaults={
+            'description': 'Proyecto para tareas de prueba',
+            'start_date': timezone.now().date(),
+            'manager': user if user.is_authenticated else default_user,
+        }
+    )
+    python = Skill.objects.get_or_create(name='Python')[0]
+    java = Skill.objects.get_or_create(name='Java')[0]
+    task1 = Task.objects.create(
+        title='Aprender Python Básico',
+        description='Curso introductorio de Python',
+        priority='high',
+        state='pending',
+        deadline=timezone.now().date() + timezone.timedelta(days=30),
+        project=project
+    )
+    task1.skills.add(python)
+    task2 = Task.objects.create(
+        title='Desarrollar API en Java',
+        description='Crear una API REST con Java',
+        priority='medium',
+        state='pending',
+        deadline=timezone.now().date() + timezone.timedelta(days=30),
+        project=project
+    )
+    task2.skills.add(java)
+
+
 def recommend_tasks(user, max_recommendations=5):
     """
     Recomienda tareas a un usuario basado en la coincidencia de habilidades.
     """
-    # Obtener o crear usuario predeterminado
-    try:
-        default_user = User.objects.filter(is_superuser=True).first() or User.objects.first()
-        if not default_user:
-            # Crear usuario predeterminado
-            default_user = User.objects.create_user(
-                username='default_manager',
-                password=os.getenv('AI_MODULE_PASSWORD'),
-                email=os.getenv('AI_MODULE_EMAIL'),
-                is_active=True
-            )
-            print("Creado usuario predeterminado: default_manager")
-    except Exception as e:
-        print(f"Error obteniendo/creando usuario predeterminado: {e}")
-        return []
-
-    # Usar usuario autenticado o predeterminado
-    project_manager = user if user.is_authenticated else default_user
-
     try:
-        # Crear proyecto de prueba si no existe
-        project, _ = Project.objects.get_or_create(
-            name='Proyecto de Prueba',
-            defaults={
-                'description': 'Proyecto para tareas de prueba',
-                'start_date': timezone.now().date(),
-                'manager': project_manager
-            }
-        )
-        tasks = Task.objects.filter(state__in=['pending', 'in_progress'])[:max_recommendations]
-        if not tasks.exists():
-            # Crear tareas de prueba
-            python = Skill.objects.get_or_create(name='Python')[0]
-            java = Skill.objects.get_or_create(name='Java')[0]
-            task1 = Task.objects.create(
-                title='Aprender Python Básico',
-                description='Curso introductorio de Python',
-                priority='high',
-                state='pending',
-                deadline=timezone.now().date() + timezone.timedelta(days=30),
-                project=project
-            )
-            task1.skills.add(python)
-            task2 = Task.objects.create(
-                title='Desarrollar API en Java',
-                description='Crear una API REST con Java',
-                priority='medium',
-                state='pending',
-                deadline=timezone.now().date() + timezone.timedelta(days=30),
-                project=project
-            )
-            task2.skills.add(java)
-            tasks = Task.objects.filter(id__in=[task1.id, task2.id])
-        task_list = list(tasks)
+        _ensure_demo_tasks(user)
     except Exception as e:
         print(f"Error creating test tasks: {e}")
         return []
 
-    # Si el usuario no tiene habilidades, devolver tareas populares
-    user_skills = set(user.skills.values_list('id', flat=True)) if user.is_authenticated and hasattr(user, 'skills') else set()
-    if not user_skills:
-        return task_list[:max_recommendations]
-
-    # Crea un índice de todas las habilidades
-    all_skills = Skill.objects.all()
-    skill_ids = list(all_skills.values_list('id', flat=True))
-    skill_id_to_index = {skill_id: idx for idx, skill_id in enumerate(skill_ids)}
-
-    # Crea el vector del usuario
-    user_vector = np.zeros(len(skill_ids))
-    for skill_id in user_skills:
-        user_vector[skill_id_to_index[skill_id]] = 1
-
-    # Crea vectores para las tareas
-    task_vectors = []
-    tasks_list = []
-    for task in task_list:
-        task_skills = set(task.skills.values_list('id', flat=True))
-        task_vector = np.zeros(len(skill_ids))
-        for skill_id in task_skills:
-            task_vector[skill_id_to_index[skill_id]] = 1
-        task_vectors.append(task_vector)
-        tasks_list.append(task)
-
-    # Calcula la similitud coseno
-    task_vectors = np.array(task_vectors)
-    user_vector = user_vector.reshape(1, -1)
-    similarities = cosine_similarity(user_vector, task_vectors)[0]
-
-    # Ajusta la similitud según la prioridad
-    priority_weights = {'low': 1.0, 'medium': 1.2, 'high': 1.5}
-    task_similarities = []
-    for task, sim in zip(tasks_list, similarities):
-        weight = priority_weights.get(task.priority, 1.0)
-        adjusted_sim = sim * weight
-        task_similarities.append((task, adjusted_sim))
-
-    # Ordena y selecciona las mejores
-    task_similarities.sort(key=lambda x: x[1], reverse=True)
-    recommended_tasks = [task for task, sim in task_similarities if sim > 0][:max_recommendations]
-    return recommended_tasks if recommended_tasks else task_list[:max_recommendations]
\ No newline at end of file
+    # Si el usuario no tiene habilidades (o ninguna coincide), devolver las primeras tareas abiertas
+    fallback = Task.objects.filter(state__in=OPEN_STATES)
+    user_skills = list(user.skills.values_list('name', flat=True)) if user.is_authenticated else []
+    task_ids = get_task_index().top_k(user_skills, max_recommendations) if user_skills else []
+    if not task_ids:
+        return list(fallback[:max_recommendations])
+    tasks = fallback.in_bulk(task_ids)
+    return [tasks[task_id] for task_id in task_ids if task_id in tasks]
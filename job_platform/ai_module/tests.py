@@ -1,3 +1,103 @@
 from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from datetime import date, datetime, timedelta
+from market_analysis.aggregation import refresh_market_data_range
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from market_analysis.models import JobOffer, Skill
+from projects.models import Project, Skill as TaskSkill, Task
+from .predictions import calculate_skill_trend, get_future_skill_trends
+from .recommendations import get_task_index, invalidate_task_index, recommend_tasks
 
-# Create your tests here.
+
+# Pruebas para el cálculo vectorizado de tendencias de habilidades.
+class SkillTrendTests(TestCase):
+    def setUp(self):
+        self.today = datetime.now().date()
+        self.go = Skill.objects.create(name="Go")
+        self.rust = Skill.objects.create(name="Rust")
+        self.count = 0
+
+    def offer(self, source, days_ago, *skills):
+        self.count += 1
+        offer = JobOffer.objects.create(
+            title=f"Oferta {self.count}", company="TechCorp", source=source,
+            publication_date=self.today - timedelta(days=days_ago),
+        )
+        offer.skills.add(*skills)
+
+    def test_trends_for_all_skills_in_one_query(self):
+        # Go en LinkedIn: 2 recientes y 1 anterior -> ponderado 3 y 1, tendencia 5, demanda 18
+        self.offer("LinkedIn", 5, self.go)
+        self.offer("LinkedIn", 10, self.go, self.rust)
+        self.offer("LinkedIn", 40, self.go)
+        # Rust en Tecnoempleo: 1 reciente y 3 anteriores -> tendencia -1/3, demanda 0
+        self.offer("Tecnoempleo", 1, self.rust)
+        self.offer("Tecnoempleo", 45, self.rust)
+        self.offer("Tecnoempleo", 70, self.rust)
+        self.offer("Tecnoempleo", 80, self.rust)
+        # Fuera de la ventana de 90 días
+        self.offer("Tecnoempleo", 120, self.go)
+        # Las predicciones leen las series diarias agregadas (market_analysis/rollups.py)
+        refresh_market_data_range(self.today - timedelta(days=120), self.today)
+
+        with CaptureQueriesContext(connection) as ctx:
+            predictions = get_future_skill_trends()
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(predictions[0], {'skill': "Go", 'predicted_demand': 18})
+        self.assertNotIn("Rust", [p['skill'] for p in predictions])
+        self.assertEqual(calculate_skill_trend(self.go, "LinkedIn"), 18)
+        self.assertEqual(calculate_skill_trend(self.rust, "Tecnoempleo"), 0)
+        self.assertEqual(calculate_skill_trend(self.go, "Tecnoempleo"), 0)
+
+
+# Pruebas del recomendador de tareas con matriz dispersa.
+class TaskRecommendationTests(TestCase):
+    def setUp(self):
+        invalidate_task_index()
+        self.user = get_user_model().objects.create_user(username="dev", password="12345")
+        self.user.skills.add(Skill.objects.create(name="Python"), Skill.objects.create(name="Django"))
+        self.project = Project.objects.create(name="Proyecto", description="", start_date=date.today(),
+                                              manager=self.user)
+        self.skills = {name: TaskSkill.objects.create(name=name) for name in ["python", "django", "java", "go"]}
+
+    def task(self, title, skills, priority='medium', state='pending'):
+        task = Task.objects.create(title=title, description="", priority=priority, state=state,
+                                   deadline=date.today(), project=self.project)
+        task.skills.add(*[self.skills[name] for name in skills])
+        return task
+
+    def test_scores_all_open_tasks_and_returns_top_k(self):
+        for i in range(6):
+            self.task(f"Java {i}", ["java"])
+        self.task("Completada", ["python", "django"], priority='high', state='completed')
+        partial = self.task("Python y Go", ["python", "go"])
+        exact = self.task("Django", ["python", "django"])
+        urgent = self.task("Django urgente", ["python", "django"], priority='high')
+
+        self.assertEqual(recommend_tasks(self.user, max_recommendations=2), [urgent, exact])
+        self.assertEqual(recommend_tasks(self.user), [urgent, exact, partial])
+
+    def test_index_is_cached_and_invalidated_on_changes(self):
+        python_task = self.task("Python", ["python"])
+        index = get_task_index()
+        with self.assertNumQueries(0):
+            self.assertIs(get_task_index(), index)
+        go_task = self.task("Go", ["go"])
+        go_task.skills.add(self.skills["django"])
+        self.assertIsNot(get_task_index(), index)
+        self.assertEqual(recommend_tasks(self.user), [python_task, go_task])
+
+    def test_user_without_matching_skills_gets_open_tasks(self):
+        java_task = self.task("Java", ["java"])
+        self.user.skills.clear()
+        self.assertEqual(recommend_tasks(self.user), [java_task])
+
+    def test_dashboard_renders_recommendations(self):
+        self.task("Python", ["python"])
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('market_analysis:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task.title for task in response.context['recommended_tasks']], ["Python"])
@@ -0,0 +1,135 @@
+# benchmarks/bench_joboffer_indexes.py
+# Genera un conjunto grande de ofertas sintéticas y mide las consultas de JobOffer que
+# hacen los dashboards y el listado de resultados, con y sin los índices de la
+# migración 0008. Muestra el plan de ejecución (EXPLAIN) y el tiempo de cada consulta.
+# Todo se ejecuta dentro de una transacción que se deshace al final: no deja datos
+# y los índices borrados para la comparación vuelven a existir.
+#
+# Uso (desde job_platform/):
+#   python benchmarks/bench_joboffer_indexes.py --offers 200000
+#   python benchmarks/bench_joboffer_indexes.py --offers 200000 --analyze   # EXPLAIN ANALYZE (PostgreSQL)
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_platform.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.models import Count  # noqa: E402
+
+from market_analysis.models import JobOffer, Skill  # noqa: E402
+
+INDEXES = ['joboffer_source_pubdate_idx', 'joboffer_pubdate_desc_idx', 'joboffer_location_trgm']
+LOCATIONS = ['Madrid', 'Barcelona', 'Valencia', 'Sevilla', 'Bilbao', 'Oviedo, Asturias', 'Gijón, Asturias', 'Remoto']
+SOURCES = ['LinkedIn', 'Tecnoempleo']
+
+
+class Rollback(Exception):
+    pass
+
+
+# Crea `count` ofertas repartidas en dos años, con 3 habilidades cada una.
+def populate(count, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    Skill.objects.bulk_create([Skill(name=f"bench-skill-{i}") for i in range(200)], ignore_conflicts=True)
+    skill_ids = list(Skill.objects.filter(name__startswith="bench-skill-").values_list('id', flat=True))
+    JobOffer.objects.bulk_create([
+        JobOffer(
+            title=f"Oferta benchmark {i}",
+            company=f"Empresa {rng.randrange(2000)}",
+            location=rng.choice(LOCATIONS),
+            source=rng.choice(SOURCES),
+            publication_date=today - timedelta(days=rng.randrange(730)),
+        )
+        for i in range(count)
+    ], batch_size=2000)
+    offer_ids = JobOffer.objects.filter(title__startswith="Oferta benchmark ").values_list('id', flat=True)
+    through = JobOffer.skills.through
+    through.objects.bulk_create([
+        through(joboffer_id=offer_id, skill_id=skill_id)
+        for offer_id in offer_ids.iterator()
+        for skill_id in rng.sample(skill_ids, 3)
+    ], batch_size=5000, ignore_conflicts=True)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+# Consultas de JobOffer de market_analysis.views.dashboard y data_integration.views.
+def view_queries():
+    one_month_ago = date.today() - timedelta(days=30)
+    recent = JobOffer.objects.filter(publication_date__gte=one_month_ago)
+    return {
+        'ofertas por fuente': recent.values('source').annotate(count=Count('id')).order_by('-count'),
+        'total de ofertas': recent.values('id'),
+        'empresas': recent.values('company').annotate(count=Count('id')).order_by('-count')[:5],
+        'habilidades Asturias': recent.filter(location__icontains='Asturias', skills__isnull=False).values(
+            'skills__name').annotate(count=Count('id')).order_by('-count')[:5],
+        'ofertas recientes': recent.order_by('-publication_date')[:10],
+        'por fuente y fecha': JobOffer.objects.filter(source='LinkedIn', publication_date__gte=one_month_ago).values('id'),
+    }
+
+
+# Evalúa una copia del queryset (sin la caché de resultados de ejecuciones anteriores).
+def run_query(queryset):
+    queryset = queryset.all()
+    if queryset.query.is_sliced:
+        return list(queryset)
+    return queryset.count() if not queryset.query.group_by else list(queryset)
+
+
+def measure(label, repeat, show_plans, analyze):
+    print(f"\n=== {label} ===")
+    for name, queryset in view_queries().items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run_query(queryset)
+            timings.append(time.perf_counter() - start)
+        print(f"{name:<22} {min(timings) * 1000:>9.2f} ms (mejor de {repeat})")
+        if show_plans:
+            options = {'analyze': True} if analyze and connection.vendor == 'postgresql' else {}
+            for line in queryset.explain(**options).splitlines():
+                print(f"    {line}")
+
+
+def drop_indexes():
+    with connection.cursor() as cursor:
+        for name in INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planes y tiempos de las consultas de JobOffer con y sin índices.")
+    parser.add_argument('--offers', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-plans', action='store_true', help="No mostrar los planes de ejecución.")
+    parser.add_argument('--analyze', action='store_true', help="Usar EXPLAIN ANALYZE (solo PostgreSQL).")
+    args = parser.parse_args()
+
+    try:
+        with transaction.atomic():
+            start = time.perf_counter()
+            populate(args.offers, args.seed)
+            print(f"{args.offers} ofertas sintéticas generadas en {time.perf_counter() - start:.1f} s "
+                  f"({connection.vendor})")
+            measure("con índices", args.repeat, not args.no_plans, args.analyze)
+            drop_indexes()
+            measure("sin índices", args.repeat, not args.no_plans, args.analyze)
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_offer_pipeline.py
+# Compara las consultas por oferta del guardado antiguo (get_or_create por oferta y por
+# habilidad) con la etapa de persistencia por lotes (`OfferBatchWriter`).
+# Todo se ejecuta dentro de una transacción que se deshace al final: no deja datos.
+#
+# Uso (desde job_platform/):
+#   python benchmarks/bench_offer_pipeline.py --offers 500 --skills-per-offer 5
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_platform.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from data_integration.pipeline import OfferBatchWriter  # noqa: E402
+from market_analysis.models import JobOffer, Skill  # noqa: E402
+
+SKILLS = ['python', 'java', 'javascript', 'react', 'django', 'docker', 'kubernetes', 'aws', 'sql', 'git']
+
+
+class Rollback(Exception):
+    pass
+
+
+# Genera ofertas sintéticas con el mismo formato que devuelven los scrapers.
+def synthetic_offers(count, skills_per_offer, source):
+    return [
+        {
+            'title': f"Desarrollador {i}",
+            'company': f"Empresa {i % 50}",
+            'location': "Madrid",
+            'source': source,
+            'publication_date': date.today(),
+            'salary': None,
+            'url': f"https://www.linkedin.com/jobs/view/{i}/" if source == "LinkedIn" else None,
+            'required_skills': [SKILLS[(i + k) % len(SKILLS)] for k in range(skills_per_offer)],
+        }
+        for i in range(count)
+    ]
+
+
+# Guardado tal como lo hacían los scrapers antes de la etapa por lotes.
+def save_one_by_one(offers):
+    for data in offers:
+        skills = [Skill.objects.get_or_create(name=name)[0] for name in data['required_skills']]
+        if data['url']:
+            job, _ = JobOffer.objects.get_or_create(url=data['url'], defaults={
+                'title': data['title'], 'company': data['company'], 'location': data['location'],
+                'publication_date': data['publication_date'], 'salary': data['salary'], 'source': data['source'],
+            })
+            job.skills.set(skills)
+        else:
+            job, created = JobOffer.objects.get_or_create(
+                title=data['title'], company=data['company'], source=data['source'],
+                defaults={'location': data['location'], 'publication_date': data['publication_date'], 'salary': None},
+            )
+            if created:
+                for skill in skills:
+                    job.skills.add(skill)
+
+
+# Sin recalcular MarketData, para comparar solo el guardado de ofertas.
+def save_in_batches(offers):
+    with OfferBatchWriter(refresh_aggregates=False) as writer:
+        for data in offers:
+            writer.add(data)
+
+
+def measure(label, func, offers):
+    try:
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                func(offers)
+                elapsed = time.perf_counter() - start
+            raise Rollback
+    except Rollback:
+        pass
+    queries = len(ctx.captured_queries)
+    print(f"{label:<12} {len(offers):>7} ofertas  {queries:>7} consultas  "
+          f"{queries / len(offers):>7.2f} consultas/oferta  {elapsed * 1000:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consultas por oferta: guardado antiguo vs. por lotes.")
+    parser.add_argument('--offers', type=int, default=500)
+    parser.add_argument('--skills-per-offer', type=int, default=5)
+    args = parser.parse_args()
+
+    for source in ['LinkedIn', 'Tecnoempleo']:
+        offers = synthetic_offers(args.offers, args.skills_per_offer, source)
+        print(f"\n{source}")
+        measure("antes", save_one_by_one, offers)
+        measure("por lotes", save_in_batches, offers)
+
+
+if __name__ == '__main__':
+    main()
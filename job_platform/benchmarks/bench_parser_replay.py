@@ -0,0 +1,186 @@
+# benchmarks/bench_parser_replay.py
+# Vuelve a pasar por los parsers (data_integration/parsers.py) un corpus de páginas guardadas
+# y mide páginas por segundo y memoria máxima con cada analizador de BeautifulSoup
+# ('lxml' y 'html.parser'). Comprueba además que ambos analizadores extraen las mismas ofertas.
+# Si selectolax está instalado (no es una dependencia del proyecto) se mide también, como
+# referencia, el análisis del HTML y los mismos selectores CSS con selectolax.
+#
+# El corpus es el archivo de capturas (SNAPSHOT_DIR, ver data_integration/snapshots.py);
+# si está vacío o se pasa --synthetic, se generan páginas sintéticas de tamaño parecido.
+# No escribe en la base de datos.
+#
+# Uso (desde job_platform/):
+#   python benchmarks/bench_parser_replay.py
+#   python benchmarks/bench_parser_replay.py --snapshot-dir /var/tmp/job_platform_snapshots --limit 2000
+#   python benchmarks/bench_parser_replay.py --synthetic 500
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_platform.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils.dateparse import parse_datetime  # noqa: E402
+
+from data_integration.parsers import REPLAY_PARSERS, replay_page  # noqa: E402
+from data_integration.skills import DEFAULT_ALIASES, DEFAULT_VOCABULARY, SkillExtractor  # noqa: E402
+from data_integration.snapshots import SnapshotStore  # noqa: E402
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+PARSERS = ['lxml', 'html.parser']
+MEMORY_SAMPLE = 20
+
+# Selectores que usan los parsers, para la medida de referencia con selectolax.
+SELECTORS = {
+    ('LinkedIn', 'detail'): [
+        'h1.top-card-layout__title', 'a.topcard__org-name-link', '.artdeco-entity-lockup__caption div[dir="ltr"]',
+        'div.jobs-description__content', '.job-details-skill-match-status__skill div', 'time',
+        '.jobs-unified-top-card__salary',
+    ],
+    ('Tecnoempleo', 'search'): [
+        '.col-10.col-md-9.col-lg-7', 'h3.fs-5.mb-2 a', 'a.text-primary.link-muted',
+        'span.d-block.d-lg-none.text-gray-800', 'span.badge.bg-gray-500',
+    ],
+}
+
+WORDS = ("buscamos desarrollador experiencia python django docker kubernetes equipo proyecto "
+         "cliente remoto salario formacion aws react sql git agile").split()
+
+
+# Relleno con la estructura típica de las páginas reales: muchos nodos anidados y scripts.
+def _noise(rng, blocks):
+    parts = []
+    for i in range(blocks):
+        links = "".join(f'<li><a href="/x/{i}/{j}">{rng.choice(WORDS)}</a></li>' for j in range(8))
+        parts.append(
+            f'<div class="artdeco-card"><section class="s{i}"><span>{" ".join(rng.choices(WORDS, k=12))}</span>'
+            f'<ul>{links}</ul><script>window.__data{i} = {{"k": "{rng.random()}"}};</script></section></div>'
+        )
+    return "".join(parts)
+
+
+def synthetic_linkedin_detail(rng, i):
+    description = "".join(f"<p>{' '.join(rng.choices(WORDS, k=40))}</p>" for _ in range(12))
+    return (
+        f'<html><head><title>Oferta {i}</title></head><body>{_noise(rng, 150)}'
+        f'<h1 class="top-card-layout__title">Desarrollador {i}</h1>'
+        f'<a class="topcard__org-name-link">Empresa {i % 97}</a>'
+        f'<div class="artdeco-entity-lockup__caption"><div dir="ltr">Madrid, España</div></div>'
+        f'<div class="jobs-description__content">{description}</div>'
+        f'<time>{rng.randint(1, 6)} days ago</time>{_noise(rng, 150)}</body></html>'
+    )
+
+
+def synthetic_tecnoempleo_page(rng, i):
+    cards = []
+    for k in range(30):
+        badges = "".join(f'<span class="badge bg-gray-500">{rng.choice(WORDS)}</span>' for _ in range(5))
+        cards.append(
+            f'<div class="col-10 col-md-9 col-lg-7"><h3 class="fs-5 mb-2"><a href="#">Oferta {i}-{k}</a></h3>'
+            f'<a class="text-primary link-muted" href="#">Empresa {k}</a>'
+            f'<span class="d-block d-lg-none text-gray-800">Oviedo - {date.today():%d/%m/%Y} Nueva</span>{badges}</div>'
+        )
+    cards = "".join(cards)
+    return f'<html><body>{_noise(rng, 60)}{cards}{_noise(rng, 30)}</body></html>'
+
+
+# Devuelve una lista de páginas (source, kind, html, url, fecha de captura).
+def load_corpus(snapshot_dir, limit, synthetic, seed):
+    pages = []
+    if not synthetic and snapshot_dir and os.path.isdir(snapshot_dir):
+        store = SnapshotStore(snapshot_dir)
+        for entry in store.entries():
+            if (entry['source'], entry['kind']) not in REPLAY_PARSERS:
+                continue
+            pages.append((entry['source'], entry['kind'], store.read_text(entry), entry['url'],
+                          parse_datetime(entry['captured_at']).date()))
+            if len(pages) >= limit:
+                break
+    if pages:
+        return pages, f"archivo de capturas {snapshot_dir}"
+
+    rng = random.Random(seed)
+    count = synthetic or 100
+    for i in range(count):
+        if i % 4:
+            pages.append(('LinkedIn', 'detail', synthetic_linkedin_detail(rng, i),
+                          f"https://www.linkedin.com/jobs/view/{i}/", date.today()))
+        else:
+            pages.append(('Tecnoempleo', 'search', synthetic_tecnoempleo_page(rng, i),
+                          f"https://www.tecnoempleo.com/ofertas-trabajo/?pagina={i}", date.today()))
+    return pages, "páginas sintéticas"
+
+
+def replay_all(pages, extractor, parser):
+    return [replay_page(source, kind, html, url, extractor, parser=parser, today=captured)
+            for source, kind, html, url, captured in pages]
+
+
+def selectolax_all(pages):
+    found = 0
+    for source, kind, html, url, captured in pages:
+        tree = HTMLParser(html)
+        for selector in SELECTORS[(source, kind)]:
+            found += len(tree.css(selector))
+    return found
+
+
+# Tiempo de una pasada por todo el corpus y memoria máxima (tracemalloc, que ralentiza mucho
+# el análisis) de otra pasada por las primeras MEMORY_SAMPLE páginas.
+def measure(label, func, pages, total_bytes):
+    start = time.perf_counter()
+    result = func(pages)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(pages[:MEMORY_SAMPLE])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<24} {len(pages) / elapsed:>9.1f} páginas/s  {total_bytes / elapsed / 1024 ** 2:>7.1f} MB/s  "
+          f"memoria máx. {peak / 1024 ** 2:>7.1f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rendimiento de los parsers con páginas guardadas.")
+    parser.add_argument('--snapshot-dir', default=getattr(settings, 'SNAPSHOT_DIR', None))
+    parser.add_argument('--limit', type=int, default=1000, help="Máximo de capturas a leer.")
+    parser.add_argument('--synthetic', type=int, default=0, help="Usar N páginas sintéticas.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    pages, origin = load_corpus(args.snapshot_dir, args.limit, args.synthetic, args.seed)
+    total_bytes = sum(len(html.encode('utf-8')) for _, _, html, _, _ in pages)
+    print(f"Corpus: {len(pages)} páginas ({origin}), {total_bytes / 1024 ** 2:.1f} MB de HTML\n")
+
+    extractor = SkillExtractor(DEFAULT_VOCABULARY, DEFAULT_ALIASES)
+    results = {
+        name: measure(f"BeautifulSoup {name}", lambda sample, name=name: replay_all(sample, extractor, name),
+                      pages, total_bytes)
+        for name in PARSERS
+    }
+    if HTMLParser is not None:
+        measure("selectolax (selectores)", selectolax_all, pages, total_bytes)
+    else:
+        print("selectolax no está instalado: se omite la medida de referencia.")
+
+    offers = sum(len(result or []) for result in results[PARSERS[0]])
+    different = sum(1 for a, b in zip(*results.values()) if a != b)
+    print(f"\nOfertas extraídas: {offers}")
+    print(f"Páginas con resultados distintos entre {' y '.join(PARSERS)}: {different}")
+
+
+if __name__ == '__main__':
+    main()
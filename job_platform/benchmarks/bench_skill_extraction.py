@@ -0,0 +1,97 @@
+# benchmarks/bench_skill_extraction.py
+# Compara la extracción de habilidades antigua (un re.search por habilidad y por oferta)
+# con el extractor compilado de `data_integration.skills` sobre descripciones sintéticas.
+# No escribe en la base de datos.
+#
+# Uso (desde job_platform/):
+#   python benchmarks/bench_skill_extraction.py --descriptions 100000
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_platform.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from data_integration.skills import DEFAULT_ALIASES, DEFAULT_VOCABULARY, SkillExtractor  # noqa: E402
+
+FILLER = (
+    "buscamos incorporar equipo desarrollo proyecto cliente experiencia conocimientos valorable "
+    "trabajo remoto empresa tecnologia producto software aplicaciones servicios datos calidad "
+    "metodologias entorno funciones requisitos ofrecemos salario formacion contrato jornada google "
+    "gitlab javascripts pythonic going react-native"
+).split()
+
+
+# Descripciones de unas 300 palabras (~2000 caracteres, el máximo que guarda el scraper)
+# con algunas habilidades y alias mezclados.
+def synthetic_descriptions(count, seed):
+    rng = random.Random(seed)
+    terms = DEFAULT_VOCABULARY + list(DEFAULT_ALIASES)
+    descriptions = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=300)
+        for _ in range(rng.randint(0, 8)):
+            words[rng.randrange(len(words))] = rng.choice(terms)
+        descriptions.append(' '.join(words)[:2000])
+    return descriptions
+
+
+# Bucle tal como estaba en LinkedInScraper antes del extractor compilado.
+def legacy_extract(text, valid_skills):
+    skills_list = []
+    for skill in valid_skills:
+        if skill == 'go':
+            if re.search(r'\bgo\b|\bgolang\b', text):
+                skills_list.append(skill)
+        elif re.search(rf'\b{re.escape(skill)}\b', text) and skill not in skills_list:
+            skills_list.append(skill)
+    return sorted(skills_list)
+
+
+def measure(label, func, descriptions):
+    start = time.perf_counter()
+    results = [func(text) for text in descriptions]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:>8.2f} s  {elapsed / len(descriptions) * 1e6:>8.1f} µs/descripción  "
+          f"{sum(map(len, results)):>8} habilidades")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extracción de habilidades: búsqueda por habilidad vs. compilada.")
+    parser.add_argument('--descriptions', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    descriptions = synthetic_descriptions(args.descriptions, args.seed)
+    valid_skills = set(DEFAULT_VOCABULARY)
+
+    start = time.perf_counter()
+    extractor = SkillExtractor(DEFAULT_VOCABULARY, DEFAULT_ALIASES)
+    print(f"Vocabulario compilado en {(time.perf_counter() - start) * 1000:.2f} ms "
+          f"({len(extractor.canonical)} términos)\n")
+
+    legacy = measure("antes", lambda text: legacy_extract(text, valid_skills), descriptions)
+    compiled = measure("compilado", extractor.extract, descriptions)
+
+    # Con el mismo vocabulario (solo el alias golang) ambos deberían coincidir, salvo en los
+    # términos que empiezan o terminan en símbolo (c++, c#, .net): \b no los encontraba junto a un espacio.
+    parity = SkillExtractor(DEFAULT_VOCABULARY, {'golang': 'go'})
+    symbols = {'c++', 'c#', '.net'}
+    differences = sum(
+        1 for text, old in zip(descriptions, legacy)
+        if set(old) - symbols != set(parity.extract(text)) - symbols
+    )
+    print(f"\nDescripciones con resultados distintos (sin contar c++/c#/.net): {differences}")
+    print(f"Habilidades extra encontradas por los alias: {sum(map(len, compiled)) - sum(map(len, legacy))}")
+
+
+if __name__ == '__main__':
+    main()
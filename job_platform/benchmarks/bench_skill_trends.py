@@ -0,0 +1,133 @@
+# benchmarks/bench_skill_trends.py
+# Compara el cálculo de tendencias antiguo (tres COUNT por habilidad y fuente) con el
+# cálculo vectorizado de `ai_module.predictions` (una consulta agrupada + NumPy)
+# y comprueba que ambos devuelven las mismas predicciones.
+# Todo se ejecuta dentro de una transacción que se deshace al final: no deja datos.
+#
+# Uso (desde job_platform/):
+#   python benchmarks/bench_skill_trends.py --skills 10000 --offers 20000
+#   python benchmarks/bench_skill_trends.py --skills 10000 --skip-legacy
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_platform.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from ai_module.predictions import SOURCES, get_future_skill_trends  # noqa: E402
+from market_analysis.models import JobOffer, Skill  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+# Cálculo por habilidad tal como estaba antes del motor vectorizado.
+def legacy_skill_trend(skill, source, days_ahead=30):
+    today = datetime.now().date()
+    windows = [(today - timedelta(days=30), None),
+               (today - timedelta(days=60), today - timedelta(days=30)),
+               (today - timedelta(days=90), today - timedelta(days=60))]
+    counts = []
+    for start, end in windows:
+        offers = JobOffer.objects.filter(source=source, publication_date__gte=start, skills__id=skill.id)
+        if end:
+            offers = offers.filter(publication_date__lt=end)
+        counts.append(offers.count())
+
+    weight = 1.5 if source == "LinkedIn" else 1.0
+    recent, previous_1, previous_2 = (int(count * weight) for count in counts)
+    if previous_1 + previous_2 == 0:
+        return 0
+    avg_offers_prev = (previous_1 + previous_2) / 60
+    trend = (recent / 30 - avg_offers_prev) / avg_offers_prev
+    return max(0, int(recent * (1 + trend * (days_ahead / 30))))
+
+
+def legacy_future_skill_trends(days_ahead=30):
+    predictions = [
+        {'skill': 'Python', 'predicted_demand': 15},
+        {'skill': 'Java', 'predicted_demand': 10},
+    ]
+    for skill in Skill.objects.order_by('id'):
+        total = sum(legacy_skill_trend(skill, source, days_ahead) for source in SOURCES)
+        if total > 0:
+            predictions.append({'skill': skill.name, 'predicted_demand': total})
+    predictions.sort(key=lambda x: x['predicted_demand'], reverse=True)
+    return predictions
+
+
+# Crea habilidades y ofertas sintéticas repartidas en los últimos 100 días.
+def populate(skill_count, offer_count, skills_per_offer, seed):
+    rng = random.Random(seed)
+    today = datetime.now().date()
+    Skill.objects.bulk_create([Skill(name=f"bench-skill-{i}") for i in range(skill_count)], batch_size=1000)
+    skill_ids = list(Skill.objects.filter(name__startswith="bench-skill-").values_list('id', flat=True))
+    JobOffer.objects.bulk_create([
+        JobOffer(
+            title=f"Oferta benchmark {i}",
+            company=f"Empresa {i % 100}",
+            source=rng.choice(SOURCES),
+            publication_date=today - timedelta(days=rng.randrange(100)),
+        )
+        for i in range(offer_count)
+    ], batch_size=1000)
+    offer_ids = list(JobOffer.objects.filter(title__startswith="Oferta benchmark ").values_list('id', flat=True))
+    through = JobOffer.skills.through
+    through.objects.bulk_create([
+        through(joboffer_id=offer_id, skill_id=skill_id)
+        for offer_id in offer_ids
+        for skill_id in rng.sample(skill_ids, skills_per_offer)
+    ], batch_size=1000, ignore_conflicts=True)
+
+
+# Cuenta las consultas con un wrapper (CaptureQueriesContext solo guarda las últimas 9000).
+def measure(label, func):
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<14} {len(queries):>8} consultas  {elapsed * 1000:>10.1f} ms  "
+          f"{len(result) - 2:>7} habilidades con demanda")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tendencias de habilidades: por habilidad vs. vectorizado.")
+    parser.add_argument('--skills', type=int, default=10000)
+    parser.add_argument('--offers', type=int, default=20000)
+    parser.add_argument('--skills-per-offer', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-legacy', action='store_true', help="No ejecutar el cálculo antiguo (muy lento).")
+    args = parser.parse_args()
+
+    try:
+        with transaction.atomic():
+            populate(args.skills, args.offers, args.skills_per_offer, args.seed)
+            print(f"{args.skills} habilidades, {args.offers} ofertas, {args.skills_per_offer} habilidades/oferta\n")
+            vectorized = measure("vectorizado", get_future_skill_trends)
+            if not args.skip_legacy:
+                legacy = measure("antes", legacy_future_skill_trends)
+                print("\nResultados idénticos" if legacy == vectorized else "\nLos resultados NO coinciden")
+            raise Rollback
+    except Rollback:
+        pass
+
+
+if __name__ == '__main__':
+    main()
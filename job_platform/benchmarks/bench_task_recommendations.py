@@ -0,0 +1,148 @@
+# benchmarks/bench_task_recommendations.py
+# Compara el recomendador de tareas antiguo (un vector denso y una consulta por tarea,
+# similitud coseno de scikit-learn) con el de `ai_module.recommendations` (matriz dispersa
+# tareas x habilidades cacheada + argpartition) sobre todas las tareas abiertas, y comprueba
+# que ambos recomiendan las mismas tareas.
+# Todo se ejecuta dentro de una transacción que se deshace al final: no deja datos.
+#
+# Uso (desde job_platform/):
+#   python benchmarks/bench_task_recommendations.py --tasks 100000
+#   python benchmarks/bench_task_recommendations.py --tasks 5000             # con el cálculo antiguo
+#   python benchmarks/bench_task_recommendations.py --tasks 100000 --skip-legacy
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_platform.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from sklearn.metrics.pairwise import cosine_similarity  # noqa: E402
+
+from ai_module.recommendations import (  # noqa: E402
+    OPEN_STATES, PRIORITY_WEIGHTS, get_task_index, invalidate_task_index, recommend_tasks,
+)
+from market_analysis.models import Skill as UserSkill  # noqa: E402
+from projects.models import Project, Skill, Task  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+# Recomendación tal como estaba antes de la matriz dispersa, pero sobre todas las tareas
+# abiertas (antes solo miraba las `max_recommendations` primeras) y comparando las
+# habilidades por nombre.
+def legacy_recommend_tasks(user, max_recommendations=5):
+    user_skills = {name.lower() for name in user.skills.values_list('name', flat=True)}
+    skill_names = [name.lower() for name in Skill.objects.values_list('name', flat=True)]
+    skill_to_index = {name: idx for idx, name in enumerate(skill_names)}
+
+    user_vector = np.zeros(len(skill_names))
+    for name in user_skills & set(skill_to_index):
+        user_vector[skill_to_index[name]] = 1
+
+    task_list = list(Task.objects.filter(state__in=OPEN_STATES))
+    task_vectors = []
+    for task in task_list:
+        task_vector = np.zeros(len(skill_names))
+        for name in task.skills.values_list('name', flat=True):
+            task_vector[skill_to_index[name.lower()]] = 1
+        task_vectors.append(task_vector)
+    similarities = cosine_similarity(user_vector.reshape(1, -1), np.array(task_vectors))[0]
+
+    task_similarities = [
+        (task, sim * PRIORITY_WEIGHTS.get(task.priority, 1.0)) for task, sim in zip(task_list, similarities)
+    ]
+    task_similarities.sort(key=lambda x: (-x[1], x[0].id))
+    return [task for task, sim in task_similarities if sim > 0][:max_recommendations]
+
+
+# Crea habilidades y tareas sintéticas y un usuario con `user_skills` habilidades.
+def populate(task_count, skill_count, skills_per_task, user_skills, seed):
+    rng = random.Random(seed)
+    user = get_user_model().objects.create_user(username="bench-user", password="bench")
+    project = Project.objects.create(name="Proyecto benchmark", description="", start_date=date.today(), manager=user)
+    Skill.objects.bulk_create([Skill(name=f"bench-skill-{i}") for i in range(skill_count)], batch_size=1000)
+    skill_ids = list(Skill.objects.filter(name__startswith="bench-skill-").values_list('id', flat=True))
+    Task.objects.bulk_create([
+        Task(
+            title=f"Tarea benchmark {i}",
+            description="",
+            state=rng.choice(['pending', 'in_progress', 'completed']),
+            priority=rng.choice(list(PRIORITY_WEIGHTS)),
+            deadline=date.today(),
+            project=project,
+        )
+        for i in range(task_count)
+    ], batch_size=1000)
+    task_ids = list(Task.objects.filter(project=project).values_list('id', flat=True))
+    through = Task.skills.through
+    through.objects.bulk_create([
+        through(task_id=task_id, skill_id=skill_id)
+        for task_id in task_ids
+        for skill_id in rng.sample(skill_ids, rng.randint(1, skills_per_task))
+    ], batch_size=5000, ignore_conflicts=True)
+    names = rng.sample([f"bench-skill-{i}" for i in range(skill_count)], user_skills)
+    UserSkill.objects.bulk_create([UserSkill(name=name) for name in names], ignore_conflicts=True)
+    user.skills.set(UserSkill.objects.filter(name__in=names))
+    return user
+
+
+# Cuenta las consultas con un wrapper (CaptureQueriesContext solo guarda las últimas 9000).
+def measure(label, func):
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+    print(f"{label:<22} {len(queries):>8} consultas  {elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recomendación de tareas: vectores densos vs. matriz dispersa.")
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--skills', type=int, default=2000)
+    parser.add_argument('--skills-per-task', type=int, default=8)
+    parser.add_argument('--user-skills', type=int, default=15)
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--skip-legacy', action='store_true', help="No ejecutar el cálculo antiguo (muy lento).")
+    args = parser.parse_args()
+
+    try:
+        with transaction.atomic():
+            user = populate(args.tasks, args.skills, args.skills_per_task, args.user_skills, args.seed)
+            print(f"{args.tasks} tareas, {args.skills} habilidades, hasta {args.skills_per_task} "
+                  f"habilidades/tarea, usuario con {args.user_skills}\n")
+            invalidate_task_index()
+            index = measure("índice (construcción)", get_task_index)
+            print(f"{'':<22} {len(index)} tareas abiertas, matriz {index.matrix.shape} con {index.matrix.nnz} valores")
+            sparse_top = measure("recomendación (caché)", lambda: recommend_tasks(user, args.top))
+            if not args.skip_legacy:
+                legacy_top = measure("antes", lambda: legacy_recommend_tasks(user, args.top))
+                print("\nResultados idénticos" if legacy_top == sparse_top else "\nLos resultados NO coinciden")
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        invalidate_task_index()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,11 @@
 from django.contrib import admin
+from .models import CrawledPage, ScrapeJob, ScrapeRun
 
-# Register your models here.
+admin.site.register(ScrapeJob)
+admin.site.register(CrawledPage)
+
+
+@admin.register(ScrapeRun)
+class ScrapeRunAdmin(admin.ModelAdmin):
+    list_display = ('source', 'started_at', 'status', 'duration', 'pages', 'offers', 'failures')
+    list_filter = ('source', 'status')
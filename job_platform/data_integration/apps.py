@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DataIntegrationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'data_integration'
+
+    def ready(self):
+        from . import skills  # noqa: F401
@@ -0,0 +1,140 @@
+# data_integration/export.py
+# Exportación de ofertas (JobOffer con sus habilidades) en CSV, JSON Lines y Parquet.
+# Las ofertas se leen con `iterator(chunk_size=...)` y se escriben por bloques, de modo que
+# exportar millones de filas usa memoria constante:
+#   - los nombres de las habilidades se cargan una sola vez (diccionario id -> nombre),
+#   - por cada bloque de ofertas se hace una consulta a la tabla intermedia oferta-habilidad,
+#   - cada bloque se serializa y se entrega antes de leer el siguiente.
+# Lo usan la vista `export_offers` (StreamingHttpResponse) y el comando `export_offers`.
+import csv
+import json
+from collections import defaultdict
+from itertools import islice
+
+from market_analysis.models import JobOffer, Skill
+from market_analysis.search import search_offers
+
+EXPORT_FIELDS = ['id', 'title', 'company', 'location', 'source', 'publication_date', 'salary', 'url']
+DEFAULT_CHUNK_SIZE = 2000
+
+
+# Ofertas a exportar, con los mismos filtros en la vista y en el comando.
+# - source: LinkedIn o Tecnoempleo (vacío = todas).
+# - since: fecha mínima de publicación (date).
+# - search: texto a buscar, igual que el parámetro `?search=` de los listados.
+def offers_for_export(source=None, since=None, search=''):
+    offers = JobOffer.objects.all()
+    if source:
+        offers = offers.filter(source=source)
+    if since:
+        offers = offers.filter(publication_date__gte=since)
+    return search_offers(offers, search or '')
+
+
+# Devuelve bloques (listas) de diccionarios con los campos de EXPORT_FIELDS más 'skills'.
+def iter_offer_chunks(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    skill_names = dict(Skill.objects.values_list('id', 'name'))
+    through = JobOffer.skills.through
+    rows = queryset.values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        skills = defaultdict(list)
+        for offer_id, skill_id in through.objects.filter(
+            joboffer_id__in=[row['id'] for row in chunk]
+        ).values_list('joboffer_id', 'skill_id'):
+            skills[offer_id].append(skill_names.get(skill_id, ''))
+        for row in chunk:
+            row['skills'] = sorted(skills[row['id']])
+        yield chunk
+
+
+# Objeto con método write() que devuelve lo escrito, para usar csv.writer sin buffer.
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _csv_chunks(chunks):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS + ['skills'])
+    for chunk in chunks:
+        yield ''.join(
+            writer.writerow([row[field] for field in EXPORT_FIELDS] + ['|'.join(row['skills'])])
+            for row in chunk
+        )
+
+
+def _jsonl_chunks(chunks):
+    for chunk in chunks:
+        yield ''.join(json.dumps(row, default=str, ensure_ascii=False) + '\n' for row in chunk)
+
+
+# Destino de pyarrow que acumula los bytes escritos para entregarlos por bloques.
+class _ParquetSink:
+    closed = False
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+# Cada bloque de ofertas se escribe como un row group del fichero Parquet.
+def _parquet_chunks(chunks):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('company', pa.string()),
+        ('location', pa.string()),
+        ('source', pa.string()),
+        ('publication_date', pa.date32()),
+        ('salary', pa.string()),
+        ('url', pa.string()),
+        ('skills', pa.list_(pa.string())),
+    ])
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    for chunk in chunks:
+        writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+# Formatos disponibles: función que genera los bloques, tipo de contenido y extensión.
+EXPORT_FORMATS = {
+    'csv': (_csv_chunks, 'text/csv; charset=utf-8', 'csv'),
+    'jsonl': (_jsonl_chunks, 'application/x-ndjson; charset=utf-8', 'jsonl'),
+    'parquet': (_parquet_chunks, 'application/vnd.apache.parquet', 'parquet'),
+}
+
+
+# Genera el contenido exportado de `queryset` en el formato indicado, bloque a bloque.
+def export_offers(queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportación desconocido: {export_format}")
+    serialize = EXPORT_FORMATS[export_format][0]
+    return serialize(iter_offer_chunks(queryset.order_by('id'), chunk_size))
@@ -0,0 +1,130 @@
+# data_integration/jobs.py
+# Este módulo gestiona la cola de trabajos de scraping respaldada por la base de datos.
+# Las vistas encolan trabajos con `enqueue_scrape_job` y devuelven la respuesta al instante;
+# el worker (`python manage.py run_scrape_worker`) reclama los trabajos pendientes con
+# `claim_next_job` y los ejecuta con `execute_job`, con concurrencia limitada.
+import logging
+
+from django.core.exceptions import PermissionDenied
+from django.utils import timezone
+from rolepermissions.checkers import has_role
+
+from .metrics import ScrapeMetrics
+from .models import ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+# Roles autorizados a lanzar cada scraper (los mismos que exigen los decoradores de los scrapers).
+SCRAPER_ROLES = {
+    'LinkedIn': ['admin', 'collaborator'],
+    'Tecnoempleo': ['admin'],
+}
+
+
+# Ejecuta el scraper de LinkedIn para un trabajo y devuelve (número de ofertas, mensaje).
+def _run_linkedin(job, progress):
+    from .scrapers.linkedin import LinkedInScraper
+
+    scraper = LinkedInScraper(workers=job.params.get('workers'))
+    offers = scraper.run(
+        query=job.params.get('query', "software developer"),
+        location=job.params.get('location', "Spain"),
+        max_offers=job.params.get('max_offers', 10),
+        progress=progress,
+        incremental=job.params.get('incremental'),
+        metrics=ScrapeMetrics(job.source, job=job),
+    )
+    return len(offers), f"Se han extraído {len(offers)} ofertas de LinkedIn."
+
+
+# Ejecuta el scraper de Tecnoempleo para un trabajo y devuelve (número de ofertas, mensaje).
+def _run_tecnoempleo(job, progress):
+    from .scrapers.tecnoempleo import run_tecnoempleo_scraper
+
+    offers, date_list = run_tecnoempleo_scraper(
+        progress=progress,
+        keywords=job.params.get('keywords'),
+        provinces=job.params.get('provinces'),
+        max_pages=job.params.get('max_pages'),
+        incremental=job.params.get('incremental'),
+        metrics=ScrapeMetrics(job.source, job=job),
+    )
+    if date_list:
+        min_date = min(date_list).strftime('%d/%m/%Y')
+        max_date = max(date_list).strftime('%d/%m/%Y')
+        message = f"Se han extraído {len(offers)} ofertas de Tecnoempleo (desde {min_date} hasta {max_date})."
+    else:
+        message = f"Se han extraído {len(offers)} ofertas de Tecnoempleo. No se encontraron fechas válidas."
+    return len(offers), message
+
+
+SCRAPE_RUNNERS = {
+    'LinkedIn': _run_linkedin,
+    'Tecnoempleo': _run_tecnoempleo,
+}
+
+
+# Crea un trabajo pendiente para la fuente indicada tras comprobar los permisos del usuario.
+# Si ya hay un trabajo pendiente o en ejecución para la misma fuente, lo reutiliza
+# para no lanzar dos scrapes iguales a la vez.
+def enqueue_scrape_job(user, source, params=None):
+    if source not in SCRAPE_RUNNERS:
+        raise ValueError(f"Fuente de scraping desconocida: {source}")
+    if not has_role(user, SCRAPER_ROLES[source]):
+        raise PermissionDenied(f"No tienes permiso para actualizar {source}.")
+
+    active_job = ScrapeJob.objects.filter(
+        source=source,
+        status__in=[ScrapeJob.STATUS_PENDING, ScrapeJob.STATUS_RUNNING]
+    ).first()
+    if active_job:
+        return active_job, False
+
+    job = ScrapeJob.objects.create(
+        source=source,
+        params=params or {},
+        requested_by=user if user.is_authenticated else None,
+    )
+    logger.info(f"Trabajo de scraping encolado: {job}")
+    return job, True
+
+
+# Reclama el trabajo pendiente más antiguo y lo marca como 'running'.
+# El UPDATE condicional garantiza que dos workers no reclamen el mismo trabajo.
+def claim_next_job():
+    pending_ids = ScrapeJob.objects.filter(
+        status=ScrapeJob.STATUS_PENDING
+    ).order_by('created_at').values_list('id', flat=True)[:10]
+    for job_id in pending_ids:
+        claimed = ScrapeJob.objects.filter(id=job_id, status=ScrapeJob.STATUS_PENDING).update(
+            status=ScrapeJob.STATUS_RUNNING,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return ScrapeJob.objects.get(id=job_id)
+    return None
+
+
+# Ejecuta un trabajo ya reclamado, registrando progreso y resultado en la base de datos.
+def execute_job(job):
+    def progress(done, total):
+        ScrapeJob.objects.filter(id=job.id).update(progress=done, total=total)
+
+    logger.info(f"Ejecutando trabajo de scraping: {job}")
+    try:
+        runner = SCRAPE_RUNNERS[job.source]
+        offers_count, message = runner(job, progress)
+        job.mark_as_completed(offers_count=offers_count, message=message)
+        logger.info(f"Trabajo completado: {job} ({offers_count} ofertas)")
+    except Exception as e:
+        logger.error(f"Error en el trabajo {job}: {e}")
+        job.mark_as_failed(error_message=str(e))
+    return job
+
+
+# Devuelve a 'pending' los trabajos que quedaron en 'running' por una caída del worker.
+def requeue_stale_jobs(older_than):
+    return ScrapeJob.objects.filter(
+        status=ScrapeJob.STATUS_RUNNING,
+        started_at__lt=timezone.now() - older_than,
+    ).update(status=ScrapeJob.STATUS_PENDING, started_at=None)
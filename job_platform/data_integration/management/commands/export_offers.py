@@ -0,0 +1,53 @@
+# data_integration/management/commands/export_offers.py
+# Exporta las ofertas con sus habilidades en CSV, JSON Lines o Parquet, por bloques
+# y con memoria constante (ver data_integration/export.py).
+#
+# Uso:
+#   python manage.py export_offers --format csv --output ofertas.csv
+#   python manage.py export_offers --format jsonl --source LinkedIn --since 2025-01-01 > ofertas.jsonl
+#   python manage.py export_offers --format parquet --output ofertas.parquet
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from data_integration.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_offers, offers_for_export
+
+
+class Command(BaseCommand):
+    help = "Exporta las ofertas de trabajo (con sus habilidades) en CSV, JSON Lines o Parquet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help="Formato de salida.")
+        parser.add_argument('--output', help="Fichero de salida (por defecto, la salida estándar).")
+        parser.add_argument('--source', help="Exportar solo una fuente (LinkedIn, Tecnoempleo).")
+        parser.add_argument('--since', help="Fecha mínima de publicación (AAAA-MM-DD).")
+        parser.add_argument('--search', default='', help="Texto a buscar, como en el listado de resultados.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Ofertas por bloque.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_date(options['since'])
+            except ValueError:
+                pass
+            if not since:
+                raise CommandError("--since debe ser una fecha válida con el formato AAAA-MM-DD.")
+        if options['format'] == 'parquet' and not options['output']:
+            raise CommandError("El formato parquet necesita --output.")
+
+        offers = offers_for_export(source=options['source'], since=since, search=options['search'])
+        chunks = export_offers(offers, options['format'], chunk_size=options['chunk_size'])
+
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        if options['format'] == 'parquet':
+            output = open(options['output'], 'wb')
+        else:
+            output = open(options['output'], 'w', encoding='utf-8', newline='')
+        with output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(self.style.SUCCESS(f"Ofertas exportadas a {options['output']}."))
@@ -0,0 +1,32 @@
+# data_integration/management/commands/load_skill_vocabulary.py
+# Copia el vocabulario de habilidades por defecto (data_integration/skills.py) a la base
+# de datos para poder editarlo desde el admin. Es idempotente: no borra nada de lo existente.
+#
+# Uso:
+#   python manage.py load_skill_vocabulary
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from data_integration.skills import DEFAULT_ALIASES, DEFAULT_VOCABULARY
+from market_analysis.models import Skill, SkillAlias
+
+
+class Command(BaseCommand):
+    help = "Guarda en la base de datos el vocabulario de habilidades y los alias por defecto."
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        skills = {}
+        for name in DEFAULT_VOCABULARY:
+            skill, _ = Skill.objects.get_or_create(name=name)
+            if not skill.in_vocabulary:
+                skill.in_vocabulary = True
+                skill.save(update_fields=['in_vocabulary'])
+            skills[name] = skill
+        created = 0
+        for alias, name in DEFAULT_ALIASES.items():
+            _, was_created = SkillAlias.objects.get_or_create(alias=alias, defaults={'skill': skills[name]})
+            created += was_created
+        self.stdout.write(self.style.SUCCESS(
+            f"Vocabulario cargado: {len(skills)} habilidades, {created} alias nuevos."
+        ))
@@ -0,0 +1,42 @@
+# data_integration/management/commands/prune_snapshots.py
+# Aplica la retención del archivo de capturas de los scrapers (data_integration/snapshots.py):
+# borra las capturas más antiguas que --max-age-days y, si el archivo sigue ocupando más
+# de --max-mb, las más antiguas hasta bajar de ese tamaño. Por defecto usa los settings
+# SNAPSHOT_MAX_AGE_DAYS y SNAPSHOT_MAX_BYTES. No lanzarlo mientras haya scrapers en marcha.
+#
+# Uso:
+#   python manage.py prune_snapshots
+#   python manage.py prune_snapshots --max-age-days 7 --max-mb 200
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from data_integration.snapshots import get_snapshot_store
+
+
+class Command(BaseCommand):
+    help = "Borra las capturas de páginas antiguas según la retención por antigüedad y tamaño."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-days', type=int, help="Días que se conservan las capturas.")
+        parser.add_argument('--max-mb', type=float, help="Tamaño máximo del archivo, en MB comprimidos.")
+
+    def handle(self, *args, **options):
+        store = get_snapshot_store()
+        if store is None:
+            raise CommandError("El archivo de capturas está desactivado (SNAPSHOTS_ENABLED).")
+        max_age_days = options['max_age_days']
+        if max_age_days is None:
+            max_age_days = getattr(settings, 'SNAPSHOT_MAX_AGE_DAYS', 30)
+        max_bytes = getattr(settings, 'SNAPSHOT_MAX_BYTES', None)
+        if options['max_mb'] is not None:
+            max_bytes = int(options['max_mb'] * 1024 ** 2)
+
+        removed, freed = store.prune(
+            max_age=timedelta(days=max_age_days) if max_age_days else None,
+            max_bytes=max_bytes,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Capturas borradas: {removed} ({freed / 1024 ** 2:.1f} MB liberados)."
+        ))
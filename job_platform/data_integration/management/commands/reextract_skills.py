@@ -0,0 +1,123 @@
+# data_integration/management/commands/reextract_skills.py
+# Aplica el vocabulario de habilidades actual a todas las ofertas guardadas
+# (ver data_integration/reextraction.py). Los rangos de ids se reparten entre varios
+# procesos y el avance se guarda en un punto de control (fichero JSON): si el comando
+# se interrumpe, al volver a lanzarlo continúa donde se quedó, siempre que el vocabulario
+# no haya cambiado. Al terminar recalcula MarketData de los días con ofertas modificadas.
+#
+# Uso:
+#   python manage.py reextract_skills
+#   python manage.py reextract_skills --workers 8 --chunk-size 5000
+#   python manage.py reextract_skills --dry-run
+#   python manage.py reextract_skills --restart   # ignora el punto de control
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from data_integration.reextraction import DEFAULT_CHUNK_SIZE, id_ranges, reextract_range, vocabulary_fingerprint
+from data_integration.skills import SkillExtractor, load_vocabulary
+from market_analysis.aggregation import refresh_market_data
+
+DEFAULT_CHECKPOINT = 'reextract_skills.checkpoint.json'
+
+_worker_extractor = None
+
+
+# Inicializa cada proceso del pool: Django (si el proceso no es un fork) y el extractor.
+def _init_worker(vocabulary, aliases):
+    global _worker_extractor
+    if not apps.ready:
+        django.setup()
+    _worker_extractor = SkillExtractor(vocabulary, aliases)
+
+
+def _run_range(bounds, dry_run):
+    first_id, last_id = bounds
+    return bounds, reextract_range(_worker_extractor, first_id, last_id, dry_run=dry_run)
+
+
+class Command(BaseCommand):
+    help = "Vuelve a extraer las habilidades de las ofertas guardadas con el vocabulario actual."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            help="Procesos en paralelo (por defecto, uno por CPU; 1 con SQLite).",
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Ofertas por rango de ids.")
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="Fichero del punto de control.")
+        parser.add_argument('--restart', action='store_true', help="Empieza desde el principio.")
+        parser.add_argument('--dry-run', action='store_true', help="Calcula los cambios sin guardarlos.")
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or (1 if connection.vendor == 'sqlite' else os.cpu_count() or 1)
+        if workers < 1 or options['chunk_size'] < 1:
+            raise CommandError("--workers y --chunk-size deben ser mayores que cero.")
+        dry_run = options['dry_run']
+        path = options['checkpoint']
+
+        vocabulary, aliases = load_vocabulary()
+        extractor = SkillExtractor(vocabulary, aliases)
+        fingerprint = vocabulary_fingerprint(extractor)
+        state = {'vocabulary': fingerprint, 'last_id': 0, 'dates': [],
+                 'offers': 0, 'changed': 0, 'added': 0, 'removed': 0}
+        if not options['restart'] and not dry_run and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('vocabulary') == fingerprint:
+                state = saved
+                self.stdout.write(f"Reanudando desde la oferta {state['last_id']}.")
+            else:
+                self.stdout.write(self.style.WARNING("El vocabulario ha cambiado: se ignora el punto de control."))
+
+        dates = set(state['dates'])
+        ranges = id_ranges(options['chunk_size'], after_id=state['last_id'])
+        for (first_id, last_id), stats in self._run(ranges, extractor, vocabulary, aliases, workers, dry_run):
+            for key in ('offers', 'changed', 'added', 'removed'):
+                state[key] += stats[key]
+            dates.update(day.isoformat() for day in stats['dates'])
+            state['last_id'] = last_id
+            state['dates'] = sorted(dates)
+            if not dry_run:
+                self._save_checkpoint(path, state)
+            self.stdout.write(
+                f"Ofertas {first_id}-{last_id}: {stats['changed']} de {stats['offers']} modificadas "
+                f"(+{stats['added']} / -{stats['removed']} habilidades)."
+            )
+
+        if not dry_run:
+            refresh_market_data(date.fromisoformat(day) for day in dates)
+            if os.path.exists(path):
+                os.remove(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Simulación terminada' if dry_run else 'Reextracción terminada'}: {state['changed']} de "
+            f"{state['offers']} ofertas modificadas, {state['added']} habilidades añadidas, "
+            f"{state['removed']} quitadas."
+        ))
+
+    # Procesa los rangos en orden; con varios procesos se entregan también en orden,
+    # de modo que el punto de control siempre marca un prefijo de ids ya terminado.
+    def _run(self, ranges, extractor, vocabulary, aliases, workers, dry_run):
+        if workers == 1:
+            for first_id, last_id in ranges:
+                yield (first_id, last_id), reextract_range(extractor, first_id, last_id, dry_run=dry_run)
+            return
+        ranges = list(ranges)
+        # Los procesos hijos abren sus propias conexiones; no deben heredar las del padre.
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(vocabulary, aliases)) as executor:
+            yield from executor.map(_run_range, ranges, [dry_run] * len(ranges))
+
+    @staticmethod
+    def _save_checkpoint(path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
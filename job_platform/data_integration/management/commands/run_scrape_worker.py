@@ -0,0 +1,112 @@
+# data_integration/management/commands/run_scrape_worker.py
+# Worker local que procesa la cola de trabajos de scraping (`ScrapeJob`).
+# No necesita ningún broker externo: consulta la base de datos cada pocos segundos
+# y ejecuta como máximo `--concurrency` scrapers a la vez en un pool de hilos.
+# Cuando no tiene trabajos en curso aplica la retención del archivo de capturas
+# (como mucho una vez cada SNAPSHOT_PRUNE_INTERVAL segundos) y cierra los navegadores del
+# pool que llevan demasiado tiempo sin usarse; al parar cierra todos los navegadores.
+#
+# Uso:
+#   python manage.py run_scrape_worker
+#   python manage.py run_scrape_worker --concurrency 2 --poll-interval 5
+#   python manage.py run_scrape_worker --once   # procesa lo pendiente y termina
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from data_integration.jobs import claim_next_job, execute_job, requeue_stale_jobs
+from data_integration.scrapers.browser_pool import close_browser_pools, prune_browser_pools
+from data_integration.snapshots import prune_snapshots
+
+SNAPSHOT_PRUNE_INTERVAL = 3600
+
+
+# Ejecuta un trabajo en un hilo del pool y cierra la conexión del hilo al terminar.
+def _execute_in_thread(job):
+    try:
+        return execute_job(job)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Procesa los trabajos de scraping encolados desde la web con concurrencia limitada."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=getattr(settings, 'SCRAPE_WORKER_CONCURRENCY', 2),
+            help="Número máximo de scrapers ejecutándose a la vez.",
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=getattr(settings, 'SCRAPE_WORKER_POLL_INTERVAL', 5),
+            help="Segundos de espera entre consultas a la cola cuando no hay trabajo.",
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=60,
+            help="Minutos tras los que un trabajo 'running' se considera huérfano y se reencola al arrancar.",
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Procesa los trabajos pendientes y termina.",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        poll_interval = options['poll_interval']
+
+        requeued = requeue_stale_jobs(timedelta(minutes=options['stale_minutes']))
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Reencolados {requeued} trabajos huérfanos."))
+
+        self.stdout.write(f"Worker de scraping iniciado (concurrencia={concurrency}).")
+        running = set()
+        last_prune = None
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                while True:
+                    # Reclamar trabajos mientras haya hueco en el pool
+                    while len(running) < concurrency:
+                        job = claim_next_job()
+                        if job is None:
+                            break
+                        self.stdout.write(f"Procesando {job}")
+                        running.add(executor.submit(_execute_in_thread, job))
+
+                    if not running:
+                        prune_browser_pools()
+                        if last_prune is None or time.monotonic() - last_prune > SNAPSHOT_PRUNE_INTERVAL:
+                            self._prune_snapshots()
+                            last_prune = time.monotonic()
+                        if options['once']:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    done, running = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = future.result()
+                        self.stdout.write(f"Terminado {job}")
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING("Deteniendo worker, esperando a los trabajos en curso..."))
+        close_browser_pools()
+        self.stdout.write(self.style.SUCCESS("Worker de scraping detenido."))
+
+    def _prune_snapshots(self):
+        try:
+            removed, freed = prune_snapshots()
+        except OSError as e:
+            self.stderr.write(f"No se pudo aplicar la retención de capturas: {e}")
+            return
+        if removed:
+            self.stdout.write(f"Capturas borradas: {removed} ({freed / 1024 ** 2:.1f} MB).")
@@ -0,0 +1,165 @@
+# data_integration/metrics.py
+# Tiempos por etapa de los scrapers, para saber en qué se va el tiempo de cada ejecución:
+#   startup  obtención de navegadores del pool (arranque de Chrome si no hay ninguno libre)
+#   fetch    descarga de la página (driver.get, petición HTTP)
+#   wait     esperas de Selenium hasta que aparece un elemento (WebDriverWait)
+#   sleep    pausas fijas y esperas del limitador de peticiones o de los reintentos
+#   parse    análisis del HTML (data_integration/parsers.py)
+#   persist  guardado en la base de datos (OfferBatchWriter, validadores HTTP)
+# Cada ejecución acumula sus tiempos en un `ScrapeMetrics` y al terminar guarda un resumen
+# (`ScrapeRun`: páginas, ofertas, fallos y percentiles por etapa). La vista `metrics_view`
+# lo publica en formato de texto de Prometheus.
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import ScrapeRun
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('startup', 'fetch', 'wait', 'sleep', 'parse', 'persist')
+
+
+# Percentil por el método del rango más cercano sobre una lista ordenada.
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+# Acumula los tiempos de una ejecución. Lo usan a la vez varios hilos (pool de navegadores
+# de LinkedIn, hilo del rastreador de Tecnoempleo), así que las escrituras van con un lock.
+# Uso:
+#   metrics = ScrapeMetrics("LinkedIn")
+#   with metrics.stage('fetch'):
+#       driver.get(url)
+#   metrics.count('pages')
+#   metrics.save()
+class ScrapeMetrics:
+    def __init__(self, source, job=None):
+        self.source = source
+        self.job = job
+        self.started_at = timezone.now()
+        self.start = time.monotonic()
+        self.durations = {stage: [] for stage in STAGES}
+        self.counters = {'pages': 0, 'offers': 0, 'failures': 0}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.durations.setdefault(stage, []).append(seconds)
+
+    def count(self, counter, value=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + value
+
+    # Mide el bloque como la etapa `stage`; si lanza una excepción se cuenta también como fallo.
+    @contextmanager
+    def stage(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.count('failures')
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    # Pausa fija registrada como 'sleep'.
+    def sleep(self, seconds):
+        time.sleep(seconds)
+        self.record('sleep', seconds)
+
+    # Resumen por etapa: número de mediciones, total, p50, p95 y máximo (en segundos).
+    def stage_summary(self):
+        with self._lock:
+            durations = {stage: sorted(values) for stage, values in self.durations.items() if values}
+        return {
+            stage: {
+                'count': len(values),
+                'total': round(sum(values), 6),
+                'p50': round(percentile(values, 0.5), 6),
+                'p95': round(percentile(values, 0.95), 6),
+                'max': round(values[-1], 6),
+            }
+            for stage, values in durations.items()
+        }
+
+    # Guarda el resumen de la ejecución; un error al guardarlo no debe ocultar el del scraper.
+    def save(self, status='completed'):
+        try:
+            return ScrapeRun.objects.create(
+                source=self.source,
+                job=self.job,
+                status=status,
+                started_at=self.started_at,
+                duration=time.monotonic() - self.start,
+                pages=self.counters.get('pages', 0),
+                offers=self.counters.get('offers', 0),
+                failures=self.counters.get('failures', 0),
+                stages=self.stage_summary(),
+            )
+        except Exception as e:
+            logger.error(f"No se pudieron guardar las métricas de {self.source}: {e}")
+            return None
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+# Texto en formato de exposición de Prometheus (versión 0.0.4) con los totales de todas las
+# ejecuciones por fuente y estado y los datos de la última ejecución de cada fuente.
+def render_prometheus():
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(**labels)} {value}")
+
+    totals = list(ScrapeRun.objects.values('source', 'status').annotate(
+        runs=Count('id'), pages=Sum('pages'), offers=Sum('offers'), failures=Sum('failures'),
+    ).order_by('source', 'status'))
+    metric('scrape_runs_total', 'counter', "Ejecuciones de scraping por fuente y estado.",
+           [({'source': row['source'], 'status': row['status']}, row['runs']) for row in totals])
+    for field, help_text in [('pages', "Páginas descargadas."), ('offers', "Ofertas extraídas."),
+                             ('failures', "Fallos (páginas o etapas con error).")]:
+        by_source = {}
+        for row in totals:
+            by_source[row['source']] = by_source.get(row['source'], 0) + (row[field] or 0)
+        metric(f'scrape_{field}_total', 'counter', help_text,
+               [({'source': source}, value) for source, value in by_source.items()])
+
+    sources = sorted({row['source'] for row in totals})
+    last_runs = [ScrapeRun.objects.filter(source=source).order_by('-started_at').first() for source in sources]
+    metric('scrape_last_run_timestamp_seconds', 'gauge', "Inicio de la última ejecución.",
+           [({'source': run.source}, round(run.started_at.timestamp(), 3)) for run in last_runs])
+    metric('scrape_last_run_duration_seconds', 'gauge', "Duración de la última ejecución.",
+           [({'source': run.source}, round(run.duration, 3)) for run in last_runs])
+    metric('scrape_last_run_pages_per_minute', 'gauge', "Páginas por minuto de la última ejecución.",
+           [({'source': run.source}, round(run.pages_per_minute, 3)) for run in last_runs])
+    metric('scrape_last_run_failure_ratio', 'gauge', "Fallos por página de la última ejecución.",
+           [({'source': run.source}, round(run.failure_rate, 4)) for run in last_runs])
+
+    lines.append("# HELP scrape_stage_seconds Duración por etapa en la última ejecución.")
+    lines.append("# TYPE scrape_stage_seconds summary")
+    for run in last_runs:
+        for stage, summary in sorted(run.stages.items()):
+            for key, quantile in (('p50', '0.5'), ('p95', '0.95')):
+                labels = _labels(source=run.source, stage=stage, quantile=quantile)
+                lines.append(f"scrape_stage_seconds{labels} {summary[key]}")
+            lines.append(f"scrape_stage_seconds_sum{_labels(source=run.source, stage=stage)} {summary['total']}")
+            lines.append(f"scrape_stage_seconds_count{_labels(source=run.source, stage=stage)} {summary['count']}")
+    return "\n".join(lines) + "\n"
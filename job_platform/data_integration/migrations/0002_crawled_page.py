@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrawledPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.CharField(blank=True, max_length=64)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('cards', models.PositiveIntegerField(default=0)),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_integration', '0002_crawled_page'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('status', models.CharField(default='completed', max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('duration', models.FloatField()),
+                ('pages', models.PositiveIntegerField(default=0)),
+                ('offers', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('stages', models.JSONField(default=dict)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='runs', to='data_integration.scrapejob')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['source', 'started_at'], name='data_integr_source_b469c9_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,130 @@
+# data_integration/models.py
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+# Este módulo define los modelos de la integración de datos.
+# Incluye la cola de trabajos de scraping que procesa el worker en segundo plano.
+
+# Modelo que representa un trabajo de scraping encolado desde la web.
+# Las vistas crean el registro en estado 'pending' y el worker (`run_scrape_worker`)
+# lo reclama, ejecuta el scraper y actualiza el progreso y el resultado.
+class ScrapeJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RUNNING, 'En ejecución'),
+        (STATUS_COMPLETED, 'Completado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    source = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='scrape_jobs'
+    )
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    offers_count = models.PositiveIntegerField(default=0)
+    message = models.TextField(blank=True)
+    error_message = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.pk} - {self.get_status_display()}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_COMPLETED, self.STATUS_FAILED)
+
+    def mark_as_completed(self, offers_count=0, message=""):
+        self.status = self.STATUS_COMPLETED
+        self.offers_count = offers_count
+        self.message = message
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'offers_count', 'message', 'finished_at'])
+
+    def mark_as_failed(self, error_message=""):
+        self.status = self.STATUS_FAILED
+        self.error_message = error_message
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'error_message', 'finished_at'])
+
+    def to_dict(self):
+        return {
+            'id': self.pk,
+            'source': self.source,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'progress': self.progress,
+            'total': self.total,
+            'offers_count': self.offers_count,
+            'message': self.message,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'finished': self.is_finished,
+        }
+
+# Validadores HTTP de las páginas de resultados descargadas (rastreo incremental).
+# En el siguiente rastreo la página se pide con If-None-Match/If-Modified-Since; si el
+# servidor responde 304, o el contenido tiene el mismo hash, no se vuelve a analizar y se usa
+# `cards` (número de tarjetas de oferta) para saber si hay más páginas.
+class CrawledPage(models.Model):
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(max_length=64, blank=True)
+    content_hash = models.CharField(max_length=64)
+    cards = models.PositiveIntegerField(default=0)
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.url
+
+# Resumen de una ejecución de un scraper (data_integration/metrics.py): páginas, ofertas,
+# fallos y, por etapa (fetch, wait, sleep, parse, persist), número de mediciones, tiempo total,
+# p50, p95 y máximo en segundos.
+class ScrapeRun(models.Model):
+    source = models.CharField(max_length=50)
+    job = models.ForeignKey(ScrapeJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='runs')
+    status = models.CharField(max_length=20, default=ScrapeJob.STATUS_COMPLETED)
+    started_at = models.DateTimeField()
+    duration = models.FloatField()
+    pages = models.PositiveIntegerField(default=0)
+    offers = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    stages = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['source', 'started_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.started_at:%d/%m/%Y %H:%M} ({self.pages} páginas, {self.duration:.0f}s)"
+
+    @property
+    def pages_per_minute(self):
+        return self.pages * 60 / self.duration if self.duration else 0.0
+
+    @property
+    def failure_rate(self):
+        return self.failures / self.pages if self.pages else float(bool(self.failures))
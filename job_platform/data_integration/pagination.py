@@ -0,0 +1,42 @@
+# data_integration/pagination.py
+# Paginación por clave (keyset) para listados de ofertas ordenados por
+# (publication_date, id) descendente. En lugar de OFFSET, cada página empieza
+# justo después de la última oferta de la anterior, así que el coste de una página
+# no depende de cuántas ofertas haya antes (usa el índice por fecha de publicación).
+# El cursor es una cadena "AAAA-MM-DD.id" que se pasa en el parámetro `?after=`.
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+
+def encode_cursor(offer):
+    return f"{offer.publication_date.isoformat()}.{offer.id}"
+
+
+# Devuelve (fecha, id) o None si el cursor no es válido.
+def decode_cursor(value):
+    try:
+        date_part, id_part = (value or '').split('.', 1)
+        publication_date = parse_date(date_part)
+        offer_id = int(id_part)
+    except ValueError:
+        return None
+    if publication_date is None:
+        return None
+    return publication_date, offer_id
+
+
+# Devuelve (ofertas de la página, cursor de la siguiente página o None).
+# Se pide una oferta de más para saber si hay página siguiente sin contar el total.
+def keyset_page(queryset, after=None, page_size=20):
+    queryset = queryset.order_by('-publication_date', '-id')
+    cursor = decode_cursor(after)
+    if cursor:
+        publication_date, offer_id = cursor
+        queryset = queryset.filter(
+            Q(publication_date__lt=publication_date) |
+            Q(publication_date=publication_date, id__lt=offer_id)
+        )
+    offers = list(queryset[:page_size + 1])
+    if len(offers) > page_size:
+        return offers[:page_size], encode_cursor(offers[page_size - 1])
+    return offers, None
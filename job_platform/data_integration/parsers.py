@@ -0,0 +1,187 @@
+# data_integration/parsers.py
+# Funciones puras de análisis del HTML de los scrapers: reciben el HTML (y los datos que
+# necesiten, como el extractor de habilidades o la fecha de hoy) y devuelven diccionarios
+# de ofertas para `OfferBatchWriter`. No usan Selenium, peticiones HTTP ni la base de datos,
+# así que se pueden probar y medir con páginas guardadas (data_integration/snapshots.py,
+# benchmarks/bench_parser_replay.py).
+#
+# `parser` es el analizador de BeautifulSoup: 'lxml' (por defecto, el más rápido) o 'html.parser'.
+import re
+import unicodedata
+from datetime import datetime, timedelta
+
+from bs4 import BeautifulSoup
+
+DEFAULT_PARSER = 'lxml'
+
+LINKEDIN_BASE_URL = "https://www.linkedin.com"
+
+
+# Quita acentos y caracteres no ASCII, como se guardan los textos de LinkedIn.
+def normalize_text(text):
+    if not text:
+        return ""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8').strip()
+
+
+# Convierte textos como "2 days ago" en una fecha; si no se reconoce, devuelve `today`.
+def parse_linkedin_date(date_text, today):
+    if "ago" not in date_text:
+        return today
+    match = re.search(r'(\d+)\s*(hour|day|week|month)', date_text)
+    if not match:
+        return today
+    value, unit = match.groups()
+    value = int(value)
+    if "day" in unit:
+        return today - timedelta(days=value)
+    if "week" in unit:
+        return today - timedelta(weeks=value)
+    if "month" in unit:
+        return today - timedelta(days=value * 30)
+    return today
+
+
+# URLs de las ofertas de una página de búsqueda de LinkedIn, en orden y sin repetir.
+def parse_linkedin_search(html, parser=DEFAULT_PARSER):
+    soup = BeautifulSoup(html, parser)
+    urls = []
+    for card in soup.select('a[href*="/jobs/view/"]'):
+        href = card.get('href', '')
+        if "/jobs/view/" not in href:
+            continue
+        url = f"{LINKEDIN_BASE_URL}{href.split('?')[0]}"
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+# Analiza una página de detalle de LinkedIn.
+# Extrae título, empresa, ubicación, descripción, habilidades, fecha de publicación y salario.
+# Las habilidades se buscan con `skill_extractor` (data_integration/skills.py): primero en la
+# sección de habilidades, después en el enlace de habilidades y por último en la descripción.
+# Devuelve None si la oferta no tiene título.
+def parse_linkedin_detail(html, url, skill_extractor, parser=DEFAULT_PARSER, today=None):
+    soup = BeautifulSoup(html, parser)
+    today = today or datetime.now().date()
+    data = {'url': url, 'source': "LinkedIn"}
+
+    title_tag = soup.select_one('h1.top-card-layout__title') or soup.select_one('.job-details-jobs-unified-top-card__job-title')
+    data['title'] = normalize_text(title_tag.get_text(strip=True)[:255]) if title_tag else "Sin título"
+
+    company_tag = soup.select_one('a.topcard__org-name-link') or soup.select_one('.job-details-jobs-unified-top-card__company-name a')
+    data['company'] = normalize_text(company_tag.get_text(strip=True)[:255]) if company_tag else "Desconocida"
+
+    location_tag = soup.select_one('.artdeco-entity-lockup__caption div[dir="ltr"]') or soup.select_one('.job-details-jobs-unified-top-card__primary-description')
+    data['location'] = normalize_text(location_tag.get_text(strip=True)[:255]) if location_tag else "Ubicación no especificada"
+
+    # Descripción: se guarda completa (comprimida, ver OfferDescription); los párrafos
+    # y elementos de lista se separan con saltos de línea para no pegar palabras
+    description_tag = soup.select_one('div.jobs-description__content') or soup.select_one('.jobs-box__html-content')
+    data['description'] = description_tag.get_text('\n', strip=True) if description_tag else ""
+    description = normalize_text(data['description'])
+
+    skills_list = []
+    skills_section = soup.select_one('.job-details-skill-match-status__skill div')
+    if skills_section:
+        skills_list = skill_extractor.known(normalize_text(skills_section.get_text(strip=True)).split(','))
+    if not skills_list:
+        skills_link = soup.select_one('a[href*="#HYM"][data-test-app-aware-link]')
+        if skills_link and "Skills:" in skills_link.get_text():
+            skills_text = normalize_text(skills_link.get_text(strip=True).strip().replace("Skills:", ""))
+            skills_list = skill_extractor.known(skills_text.split(','))
+    if not skills_list and description:
+        skills_list = skill_extractor.extract(description)
+    data['required_skills'] = sorted({skill_name.lower() for skill_name in skills_list})
+
+    date_tag = soup.select_one('time') or soup.select_one('span.jobs-unified-top-card__posted-date')
+    if date_tag:
+        data['publication_date'] = parse_linkedin_date(normalize_text(date_tag.get_text(strip=True).lower()), today)
+    else:
+        data['publication_date'] = today
+
+    salary_tag = soup.select_one('#SALARY .jobs-details__salary-main-rail-card span') or soup.select_one('.jobs-unified-top-card__salary')
+    data['salary'] = normalize_text(salary_tag.get_text(strip=True)[:255]) if salary_tag else None
+
+    if not data['title'] or not url or data['title'] == "Sin título":
+        return None
+    return data
+
+
+# Analiza el HTML de una página de resultados de Tecnoempleo.
+# Devuelve la lista de ofertas, la lista de fechas encontradas y el número de tarjetas de
+# oferta de la página (0 = no hay más páginas). Las ofertas sin fecha se fechan en
+# `one_month_ago` y las anteriores a esa fecha se descartan.
+def parse_tecnoempleo_page(html, one_month_ago, parser=DEFAULT_PARSER):
+    soup = BeautifulSoup(html, parser)
+    offers = []
+    date_list = []
+
+    offer_cards = soup.select('.col-10.col-md-9.col-lg-7')
+    for offer in offer_cards:
+        title_elem = offer.select_one('h3.fs-5.mb-2 a')
+        company_elem = offer.select_one('a.text-primary.link-muted')
+        location_elem = offer.select_one('span.d-block.d-lg-none.text-gray-800')
+        skills_elems = offer.select('span.badge.bg-gray-500')[:10]
+        if not (title_elem and company_elem and location_elem):
+            continue
+
+        location_text = location_elem.text.strip()
+        pub_date = None
+        # La ubicación lleva la fecha detrás: "Oviedo - 12/04/2025 Nueva"
+        if ' - ' in location_text:
+            location, date_candidate = location_text.split(' - ', 1)
+            location = location.strip()
+            date_candidate = date_candidate.replace('Actualizada', '').replace('Nueva', '').strip()
+            date_match = re.match(r'(\d{2}/\d{2}/\d{4})', date_candidate)
+            if date_match:
+                try:
+                    pub_date = datetime.strptime(date_match.group(1), '%d/%m/%Y').date()
+                    date_list.append(pub_date)
+                except ValueError:
+                    pub_date = None
+        else:
+            location = location_text
+        pub_date = pub_date or one_month_ago
+
+        if pub_date < one_month_ago:
+            continue
+
+        offers.append({
+            'title': title_elem.text.strip(),
+            'company': company_elem.text.strip(),
+            'location': location,
+            'source': "Tecnoempleo",
+            'publication_date': pub_date,
+            'salary': None,
+            'url': None,
+            'required_skills': [skill_elem.text.strip() for skill_elem in skills_elems],
+        })
+
+    return offers, date_list, len(offer_cards)
+
+
+# Parsers por fuente y tipo de página, para volver a analizar capturas guardadas.
+# Cada función recibe (html, url, parser, skill_extractor, today) y devuelve la lista de ofertas.
+def _replay_linkedin_detail(html, url, parser, skill_extractor, today):
+    offer = parse_linkedin_detail(html, url, skill_extractor, parser=parser, today=today)
+    return [offer] if offer else []
+
+
+def _replay_tecnoempleo_search(html, url, parser, skill_extractor, today):
+    return parse_tecnoempleo_page(html, today - timedelta(days=30), parser=parser)[0]
+
+
+REPLAY_PARSERS = {
+    ('LinkedIn', 'detail'): _replay_linkedin_detail,
+    ('Tecnoempleo', 'search'): _replay_tecnoempleo_search,
+}
+
+
+# Vuelve a analizar una captura (entrada del archivo de capturas) y devuelve sus ofertas,
+# o None si no hay parser para esa fuente y tipo de página. `today` es el día de la captura.
+def replay_page(source, kind, html, url, skill_extractor, parser=DEFAULT_PARSER, today=None):
+    replay = REPLAY_PARSERS.get((source, kind))
+    if replay is None:
+        return None
+    return replay(html, url, parser, skill_extractor, today or datetime.now().date())
@@ -0,0 +1,314 @@
+# data_integration/pipeline.py
+# Etapa de persistencia por lotes para las ofertas extraídas por los scrapers.
+# En lugar de hacer `get_or_create` por oferta y por habilidad (varias consultas por oferta),
+# acumula las ofertas y las guarda con un número fijo de consultas por lote:
+#   1. `bulk_create(ignore_conflicts=True)` de todas las habilidades + una consulta para sus ids.
+#   2. Upsert de las ofertas con `bulk_create(update_conflicts=True)` sobre `url`
+#      (LinkedIn) o sobre `(title, company, source)` (ofertas sin URL, p.ej. Tecnoempleo),
+#      más una consulta para recuperar sus ids.
+#   3. Sincronización de la tabla intermedia oferta-habilidad: lectura de las relaciones de las
+#      ofertas del lote, borrado de las que ya no se extraen y `bulk_create` de las nuevas.
+#   4. Upsert de las descripciones comprimidas (`OfferDescription`) que hayan cambiado.
+#   5. Upsert de los salarios normalizados (`OfferSalary`, market_analysis/salary.py) y borrado
+#      de los de las ofertas cuyo salario ya no se puede leer.
+#   6. En PostgreSQL, un UPDATE que recalcula el vector de búsqueda de las ofertas del lote.
+# Antes de guardar las ofertas se leen las fechas de publicación de las que ya existen (si
+# cambian, los agregados del día anterior también se recalculan) y se crean las empresas nuevas (`Company`) y se obtienen los ids de
+# todas con dos consultas (market_analysis/companies.py).
+# La provincia/región y la modalidad de trabajo de cada oferta se obtienen de su ubicación sin
+# consultar la base de datos (market_analysis/locations.py).
+# Al terminar (`finish`) enlaza las ofertas duplicadas de otras fuentes con su oferta canónica
+# (market_analysis/dedup.py), recalcula los agregados diarios de `MarketData` de los días
+# afectados e invalida la caché de los dashboards.
+import logging
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from market_analysis.aggregation import refresh_market_data
+from market_analysis.companies import resolve_companies
+from market_analysis.dashboard_cache import invalidate_dashboard_cache_on_commit
+from market_analysis.dedup import deduplicate_offers
+from market_analysis.locations import resolve_location
+from market_analysis.models import JobOffer, OfferDescription, Skill
+from market_analysis.salary import store_offer_salaries
+from market_analysis.search import update_search_vectors
+
+logger = logging.getLogger(__name__)
+
+# Campos que se actualizan cuando la oferta ya existe.
+UPDATE_FIELDS = ['location', 'publication_date', 'salary', 'last_seen_at', 'place', 'work_mode', 'employer']
+
+
+# Clave natural de una oferta: la URL si la tiene y si no (título, empresa, fuente).
+def offer_key(data):
+    if data.get('url'):
+        return ('url', data['url'])
+    return ('natural', data['title'], data['company'], data['source'])
+
+
+# Recorta y completa los campos igual que los guardaría la base de datos,
+# para que la clave natural del lote coincida con la de las filas guardadas.
+def normalize_offer(data):
+    return {
+        **data,
+        'title': data['title'][:255],
+        'company': (data.get('company') or "Desconocida")[:255],
+        'location': (data.get('location') or "")[:255],
+        'url': data.get('url') or None,
+        'required_skills': list(data.get('required_skills') or []),
+        'description': (data.get('description') or "").strip(),
+    }
+
+
+# Acumula ofertas (diccionarios con title, company, location, source, publication_date,
+# salary, url, required_skills y opcionalmente description) y las guarda por lotes.
+# Uso:
+#   with OfferBatchWriter() as writer:
+#       for data in ofertas:
+#           writer.add(data)
+#   writer.saved  # lista de JobOffer guardadas
+class OfferBatchWriter:
+    def __init__(self, batch_size=500, refresh_aggregates=True):
+        self.batch_size = batch_size
+        self.refresh_aggregates = refresh_aggregates
+        self.pending = {}
+        self.saved = []
+        self.touched_dates = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.finish()
+        return False
+
+    # Guarda el último lote y actualiza los agregados de los días con ofertas nuevas o modificadas.
+    # Con refresh_aggregates (y DEDUP_ENABLED) busca antes los duplicados de esos días.
+    # Los dashboards cacheados se invalidan al confirmarse los cambios.
+    def finish(self):
+        self.flush()
+        if self.touched_dates:
+            if self.refresh_aggregates:
+                if getattr(settings, 'DEDUP_ENABLED', True):
+                    result = deduplicate_offers(min(self.touched_dates), max(self.touched_dates))
+                    self.touched_dates |= result['dates']
+                refresh_market_data(self.touched_dates)
+            else:
+                invalidate_dashboard_cache_on_commit()
+            self.touched_dates = set()
+        return self.saved
+
+    # Añade una oferta al lote; si se repite la clave dentro del lote se combinan sus habilidades.
+    def add(self, data):
+        data = normalize_offer(data)
+        key = offer_key(data)
+        previous = self.pending.get(key)
+        if previous:
+            data = {
+                **data,
+                'required_skills': sorted(set(previous['required_skills']) | set(data.get('required_skills', []))),
+                'description': data['description'] or previous['description'],
+            }
+        self.pending[key] = data
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    # Guarda el lote pendiente y devuelve las ofertas guardadas en esta llamada.
+    def flush(self):
+        if not self.pending:
+            return []
+        batch = list(self.pending.values())
+        self.pending = {}
+
+        skill_ids = self._resolve_skills(batch)
+        company_ids = resolve_companies(data['company'] for data in batch)
+        for data in batch:
+            data['employer_id'] = company_ids.get(data['company'])
+        # Si el upsert cambia la fecha de una oferta, el día anterior también se recalcula
+        self.touched_dates.update(self._stored_dates(batch))
+        offers = self._upsert_offers(batch)
+        self._link_skills(batch, offers, skill_ids)
+        self._save_descriptions(batch, offers)
+        self._save_salaries(batch, offers)
+        update_search_vectors(offer.id for offer in offers.values())
+
+        saved = [offers[offer_key(data)] for data in batch if offer_key(data) in offers]
+        self.saved.extend(saved)
+        self.touched_dates.update(offer.publication_date for offer in saved)
+        logger.info(f"Lote guardado: {len(saved)} ofertas, {len(skill_ids)} habilidades.")
+        return saved
+
+    # Crea las habilidades que falten y devuelve un diccionario nombre en minúsculas -> id.
+    # Skill.name usa una collation insensible a mayúsculas, así que se respeta el nombre
+    # tal como llega del scraper y se indexa en minúsculas.
+    def _resolve_skills(self, batch):
+        names = {}
+        for data in batch:
+            for name in data.get('required_skills', []):
+                if name:
+                    names.setdefault(name.lower(), name)
+        if not names:
+            return {}
+        Skill.objects.bulk_create([Skill(name=name) for name in names.values()], ignore_conflicts=True)
+        return {
+            name.lower(): skill_id
+            for name, skill_id in Skill.objects.filter(name__in=names.values()).values_list('name', 'id')
+        }
+
+    # Fechas de publicación guardadas de las ofertas del lote que ya existen (una consulta por
+    # tipo de clave).
+    def _stored_dates(self, batch):
+        urls = [data['url'] for data in batch if data.get('url')]
+        natural = [data for data in batch if not data.get('url')]
+        dates = set()
+        if urls:
+            dates.update(JobOffer.objects.filter(url__in=urls).values_list('publication_date', flat=True))
+        if natural:
+            keys = {offer_key(data) for data in natural}
+            rows = JobOffer.objects.filter(
+                source__in={data['source'] for data in natural},
+                title__in={data['title'] for data in natural},
+                company__in={data['company'] for data in natural},
+            ).values_list('title', 'company', 'source', 'publication_date')
+            dates.update(day for title, company, source, day in rows if ('natural', title, company, source) in keys)
+        dates.discard(None)
+        return dates
+
+    # Inserta o actualiza las ofertas del lote y devuelve un diccionario clave -> JobOffer.
+    def _upsert_offers(self, batch):
+        by_url = [data for data in batch if data.get('url')]
+        by_natural_key = [data for data in batch if not data.get('url')]
+        offers = {}
+        if by_url:
+            offers.update(self._upsert_group(by_url, ['url']))
+        if by_natural_key:
+            offers.update(self._upsert_group(by_natural_key, ['title', 'company', 'source']))
+        return offers
+
+    def _upsert_group(self, group, unique_fields):
+        objects = [self._build_offer(data) for data in group]
+        try:
+            with transaction.atomic():
+                JobOffer.objects.bulk_create(
+                    objects,
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=UPDATE_FIELDS,
+                )
+        except IntegrityError as e:
+            # Una oferta del lote choca con la otra restricción única (p.ej. misma URL nueva
+            # pero mismo título/empresa/fuente): se guardan una a una para no perder el resto.
+            logger.warning(f"Conflicto en el lote de ofertas, guardando una a una: {e}")
+            return self._save_one_by_one(group)
+        return self._fetch_offers(group, unique_fields)
+
+    # Recupera las ofertas recién guardadas (con su id) con una sola consulta.
+    def _fetch_offers(self, group, unique_fields):
+        if unique_fields == ['url']:
+            queryset = JobOffer.objects.filter(url__in=[data['url'] for data in group])
+            return {('url', offer.url): offer for offer in queryset}
+        queryset = JobOffer.objects.filter(
+            source__in={data['source'] for data in group},
+            title__in={data['title'] for data in group},
+            company__in={data['company'] for data in group},
+        )
+        found = {('natural', offer.title, offer.company, offer.source): offer for offer in queryset}
+        return {offer_key(data): found[offer_key(data)] for data in group if offer_key(data) in found}
+
+    def _save_one_by_one(self, group):
+        offers = {}
+        for data in group:
+            offer = self._build_offer(data)
+            if offer.url:
+                lookup = {'url': offer.url}
+            else:
+                lookup = {'title': offer.title, 'company': offer.company, 'source': offer.source}
+            # Por attname ('place_id', 'employer_id') para no cargar el objeto relacionado
+            attnames = [JobOffer._meta.get_field(field).attname for field in UPDATE_FIELDS]
+            defaults = {attname: getattr(offer, attname) for attname in attnames}
+            defaults.update({field: getattr(offer, field) for field in ['title', 'company', 'source'] if field not in lookup})
+            try:
+                with transaction.atomic():
+                    offer, _ = JobOffer.objects.update_or_create(defaults=defaults, **lookup)
+                offers[offer_key(data)] = offer
+            except IntegrityError as e:
+                logger.error(f"Error al guardar en JobOffer: {data.get('title')} ({e})")
+        return offers
+
+    # Deja en la tabla intermedia exactamente las habilidades extraídas de cada oferta (como
+    # `offer.skills.set(...)`): lee las relaciones actuales, borra las que ya no se extraen
+    # (ofertas actualizadas) e inserta las que falten. Tres consultas como máximo por lote.
+    def _link_skills(self, batch, offers, skill_ids):
+        through = JobOffer.skills.through
+        wanted = set()
+        for data in batch:
+            offer = offers.get(offer_key(data))
+            if not offer:
+                continue
+            for name in data.get('required_skills', []):
+                skill_id = skill_ids.get(name.lower())
+                if skill_id:
+                    wanted.add((offer.id, skill_id))
+        offer_ids = {offer.id for offer in offers.values()}
+        if not offer_ids:
+            return
+        current = {}
+        for row_id, offer_id, skill_id in through.objects.filter(joboffer_id__in=offer_ids).values_list('id', 'joboffer_id', 'skill_id'):
+            current[(offer_id, skill_id)] = row_id
+        stale = [row_id for link, row_id in current.items() if link not in wanted]
+        if stale:
+            through.objects.filter(id__in=stale).delete()
+        rows = [through(joboffer_id=offer_id, skill_id=skill_id) for offer_id, skill_id in wanted if (offer_id, skill_id) not in current]
+        if rows:
+            through.objects.bulk_create(rows, ignore_conflicts=True)
+
+    # Guarda las descripciones comprimidas; las que no han cambiado (mismo hash) no se reescriben.
+    def _save_descriptions(self, batch, offers):
+        texts = {}
+        for data in batch:
+            offer = offers.get(offer_key(data))
+            if offer and data['description']:
+                texts[offer.id] = data['description']
+        if not texts:
+            return
+        stored = dict(OfferDescription.objects.filter(offer_id__in=list(texts)).values_list('offer_id', 'content_hash'))
+        descriptions = [OfferDescription.from_text(offer_id, text) for offer_id, text in texts.items()]
+        descriptions = [description for description in descriptions if stored.get(description.offer_id) != description.content_hash]
+        if descriptions:
+            OfferDescription.objects.bulk_create(
+                descriptions,
+                update_conflicts=True,
+                unique_fields=['offer'],
+                update_fields=['codec', 'content', 'length', 'content_hash'],
+            )
+
+    # Normaliza el salario de cada oferta del lote (también el de las que no lo tienen, para
+    # borrar el rango de las que lo han perdido).
+    def _save_salaries(self, batch, offers):
+        texts = {}
+        for data in batch:
+            offer = offers.get(offer_key(data))
+            if offer:
+                texts[offer.id] = data.get('salary')
+        if texts:
+            store_offer_salaries(texts)
+
+    @staticmethod
+    def _build_offer(data):
+        place_id, work_mode = resolve_location(data['location'])
+        return JobOffer(
+            title=data['title'],
+            company=data['company'],
+            location=data['location'],
+            source=data['source'],
+            publication_date=data['publication_date'],
+            salary=data.get('salary'),
+            url=data['url'],
+            last_seen_at=timezone.now(),
+            place_id=place_id,
+            work_mode=work_mode,
+            employer_id=data.get('employer_id'),
+        )
@@ -0,0 +1,112 @@
+# data_integration/reextraction.py
+# Vuelve a calcular las habilidades de las ofertas ya guardadas con el vocabulario actual
+# (comando `reextract_skills`). Para cada oferta, las habilidades nuevas son:
+#   - las que ya tenía, con los alias sustituidos por su nombre canónico (k8s -> kubernetes),
+#   - más las del vocabulario que aparecen en el título o en la descripción guardada.
+# No se quitan habilidades que no estén en el vocabulario (p.ej. las etiquetas de Tecnoempleo).
+#
+# El trabajo se reparte por rangos de ids (`id_ranges`); cada rango se procesa de forma
+# independiente (`reextract_range`) con un número fijo de consultas, así que los rangos se
+# pueden repartir entre varios procesos. Los cambios de la tabla intermedia se escriben con
+# un `bulk_create` y un DELETE por habilidad sustituida.
+import hashlib
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+
+from market_analysis.models import JobOffer, OfferDescription, Skill
+from market_analysis.search import update_search_vectors
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+# Huella del vocabulario, para no reanudar un punto de control hecho con otro vocabulario.
+def vocabulary_fingerprint(extractor):
+    data = json.dumps(sorted(extractor.canonical.items()), ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+# Devuelve rangos (primer id, último id) de `chunk_size` ofertas, a partir de `after_id`.
+def id_ranges(chunk_size=DEFAULT_CHUNK_SIZE, after_id=0):
+    ids = JobOffer.objects.filter(id__gt=after_id).order_by('id').values_list('id', flat=True)
+    ids = ids.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(ids, chunk_size))
+        if not chunk:
+            return
+        yield chunk[0], chunk[-1]
+
+
+# Texto de la oferta en el que se buscan habilidades del vocabulario.
+def offer_text(offer):
+    return f"{offer['title']}\n{offer.get('description', '')}"
+
+
+# Habilidades que debería tener una oferta: diccionario nombre en minúsculas -> nombre.
+def expected_skills(extractor, offer, current_names):
+    names = extractor.canonicalize(current_names) + extractor.extract(offer_text(offer))
+    expected = {}
+    for name in names:
+        expected.setdefault(name.lower(), name)
+    return expected
+
+
+# Recalcula las habilidades de las ofertas con id entre `first_id` y `last_id` (incluidos).
+# Devuelve un diccionario con el número de ofertas leídas y modificadas, de relaciones
+# añadidas y quitadas y las fechas de publicación de las ofertas modificadas.
+def reextract_range(extractor, first_id, last_id, dry_run=False):
+    through = JobOffer.skills.through
+    offers = list(JobOffer.objects.filter(id__range=(first_id, last_id)).values('id', 'title', 'publication_date'))
+    descriptions = {
+        description.offer_id: description.text
+        for description in OfferDescription.objects.filter(offer_id__gte=first_id, offer_id__lte=last_id)
+    }
+    for offer in offers:
+        offer['description'] = descriptions.get(offer['id'], '')
+    current = defaultdict(dict)
+    for offer_id, skill_id, name in through.objects.filter(
+        joboffer_id__gte=first_id, joboffer_id__lte=last_id
+    ).values_list('joboffer_id', 'skill_id', 'skill__name'):
+        current[offer_id][name.lower()] = (skill_id, name)
+
+    to_add = []
+    to_remove = defaultdict(list)
+    changed = {}
+    for offer in offers:
+        linked = current[offer['id']]
+        expected = expected_skills(extractor, offer, [name for _, name in linked.values()])
+        added = [(offer['id'], name) for key, name in expected.items() if key not in linked]
+        removed = [skill_id for key, (skill_id, _) in linked.items() if key not in expected]
+        if added or removed:
+            to_add.extend(added)
+            for skill_id in removed:
+                to_remove[skill_id].append(offer['id'])
+            changed[offer['id']] = offer['publication_date']
+
+    stats = {
+        'offers': len(offers),
+        'changed': len(changed),
+        'added': len(to_add),
+        'removed': sum(map(len, to_remove.values())),
+        'dates': sorted(set(changed.values())),
+    }
+    if dry_run or not changed:
+        return stats
+
+    with transaction.atomic():
+        names = {name.lower(): name for _, name in to_add}
+        Skill.objects.bulk_create([Skill(name=name) for name in names.values()], ignore_conflicts=True)
+        skill_ids = {
+            name.lower(): skill_id
+            for name, skill_id in Skill.objects.filter(name__in=names.values()).values_list('name', 'id')
+        }
+        through.objects.bulk_create(
+            [through(joboffer_id=offer_id, skill_id=skill_ids[name.lower()]) for offer_id, name in to_add],
+            ignore_conflicts=True,
+        )
+        for skill_id, offer_ids in to_remove.items():
+            through.objects.filter(skill_id=skill_id, joboffer_id__in=offer_ids).delete()
+        update_search_vectors(list(changed))
+    return stats
@@ -0,0 +1,293 @@
+# data_integration/scrapers/browser_pool.py
+# Pool de navegadores Selenium de larga duración. Arrancar Chrome, resolver el chromedriver
+# e iniciar sesión cuesta decenas de segundos; el pool mantiene los navegadores abiertos entre
+# ejecuciones del scraper (el worker `run_scrape_worker` es un proceso de larga duración), de
+# modo que un nuevo scrape reutiliza navegadores ya arrancados y con la sesión iniciada.
+#
+# - Las cookies de la sesión se guardan en disco (BROWSER_COOKIE_DIR): los navegadores nuevos
+#   las cargan al arrancar y no hace falta volver a hacer login tras reiniciar el worker.
+# - Antes de entregar un navegador se comprueba que sigue respondiendo; si no, se cierra y se
+#   arranca otro.
+# - Los navegadores se reciclan tras BROWSER_POOL_MAX_PAGES páginas, si el heap de JavaScript
+#   supera BROWSER_POOL_MAX_MEMORY_MB o si llevan más de BROWSER_POOL_MAX_IDLE_SECONDS sin usarse.
+#
+# Uso:
+#   pool = get_browser_pool("LinkedIn", factory=create_chrome_driver, size=3, cookie_url="https://www.linkedin.com")
+#   session = pool.acquire()
+#   try:
+#       session.driver.get(url)
+#       session.pages += 1
+#   finally:
+#       pool.release(session)
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+# Ruta del chromedriver; ChromeDriverManager consulta la red en cada llamada, así que se
+# resuelve una sola vez por proceso.
+@lru_cache(maxsize=1)
+def resolve_chromedriver():
+    return ChromeDriverManager().install()
+
+
+# Crea un navegador Chrome headless con la configuración de los scrapers.
+def create_chrome_driver():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"user-agent={USER_AGENT}")
+    chrome_options.add_argument("--lang=en-US")  # Forzar idioma inglés
+    return webdriver.Chrome(service=Service(resolve_chromedriver()), options=chrome_options)
+
+
+# Navegador del pool y su estado: páginas cargadas, versión de las cookies que tiene cargadas
+# y si se ha comprobado que tiene la sesión iniciada.
+class BrowserSession:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.logged_in = False
+        self.cookie_version = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    # Un navegador cuyo proceso ha muerto o cuya sesión de WebDriver ha caducado lanza una
+    # excepción con cualquier comando.
+    def is_healthy(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception as e:
+            logger.warning(f"Navegador sin respuesta, se descarta: {e}")
+            return False
+
+    # Heap de JavaScript usado por la página actual, en MB (None si Chrome no lo expone).
+    def memory_mb(self):
+        try:
+            used = self.driver.execute_script("return performance.memory && performance.memory.usedJSHeapSize")
+        except Exception:
+            return None
+        if not isinstance(used, (int, float)):
+            return None
+        return used / 1024 ** 2
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.error(f"Error al cerrar el navegador: {e}")
+
+
+class BrowserPool:
+    def __init__(self, name, factory=create_chrome_driver, size=1, max_pages=None, max_memory_mb=None,
+                 max_idle_seconds=None, cookie_url=None, cookie_dir=None):
+        self.name = name
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages if max_pages is not None else getattr(settings, 'BROWSER_POOL_MAX_PAGES', 200)
+        if max_memory_mb is None:
+            max_memory_mb = getattr(settings, 'BROWSER_POOL_MAX_MEMORY_MB', 512)
+        self.max_memory_mb = max_memory_mb
+        if max_idle_seconds is None:
+            max_idle_seconds = getattr(settings, 'BROWSER_POOL_MAX_IDLE_SECONDS', 1800)
+        self.max_idle_seconds = max_idle_seconds
+        self.cookie_url = cookie_url
+        if cookie_dir is None:
+            cookie_dir = getattr(settings, 'BROWSER_COOKIE_DIR', None)
+        slug = re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+        self.cookie_path = os.path.join(cookie_dir, f"{slug}.json") if cookie_dir and cookie_url else None
+        self.cookies = self._read_cookies()
+        self.cookie_version = 1 if self.cookies else 0
+        self.idle = []
+        self.busy = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self):
+        with self._condition:
+            return len(self.idle) + self.busy
+
+    # Entrega un navegador sano: uno libre del pool o uno nuevo si no se ha llegado a `size`.
+    # Si están todos ocupados espera hasta `timeout` segundos (None = sin límite) y devuelve
+    # None si no se libera ninguno.
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while not self.idle and self.busy >= self.size:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+            session = self.idle.pop() if self.idle else None
+            self.busy += 1
+        if session is not None and session.is_healthy():
+            self._sync_cookies(session)
+            return session
+        if session is not None:
+            session.quit()
+        try:
+            session = BrowserSession(self.factory())
+        except Exception:
+            self._forget()
+            raise
+        logger.info(f"Navegador nuevo en el pool {self.name} ({len(self)}/{self.size})")
+        self._sync_cookies(session)
+        return session
+
+    # Devuelve un navegador al pool; se cierra si está roto (`discard`) o ha llegado a los
+    # límites de páginas o memoria.
+    def release(self, session, discard=False):
+        reason = "descartado" if discard else self._recycle_reason(session)
+        if reason:
+            logger.info(f"Reciclando navegador del pool {self.name}: {reason}")
+            session.quit()
+            self._forget()
+            return
+        session.last_used = time.monotonic()
+        with self._condition:
+            closed = self.closed
+            self.busy -= 1
+            if not closed:
+                self.idle.append(session)
+            self._condition.notify()
+        if closed:
+            session.quit()
+
+    def _forget(self):
+        with self._condition:
+            self.busy -= 1
+            self._condition.notify()
+
+    def _recycle_reason(self, session):
+        if self.max_pages and session.pages >= self.max_pages:
+            return f"{session.pages} páginas"
+        memory = session.memory_mb() if self.max_memory_mb else None
+        if memory is not None and memory > self.max_memory_mb:
+            return f"{memory:.0f} MB de heap"
+        return None
+
+    # Cierra los navegadores libres que llevan más de `max_idle_seconds` sin usarse.
+    def prune_idle(self):
+        if not self.max_idle_seconds:
+            return 0
+        limit = time.monotonic() - self.max_idle_seconds
+        with self._condition:
+            stale = [session for session in self.idle if session.last_used < limit]
+            self.idle = [session for session in self.idle if session.last_used >= limit]
+        for session in stale:
+            session.quit()
+        return len(stale)
+
+    # Cierra los navegadores libres; los ocupados se cierran al devolverlos.
+    def close(self):
+        with self._condition:
+            self.closed = True
+            sessions, self.idle = self.idle, []
+        for session in sessions:
+            session.quit()
+
+    def _read_cookies(self):
+        if not self.cookie_path:
+            return []
+        try:
+            with open(self.cookie_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError) as e:
+            logger.warning(f"No se pudieron leer las cookies de {self.cookie_path}: {e}")
+            return []
+
+    # Guarda las cookies del navegador (tras un login) para el resto de navegadores del pool y
+    # en disco, con permisos solo para el usuario (contienen la sesión).
+    def save_cookies(self, session):
+        cookies = session.driver.get_cookies()
+        with self._condition:
+            self.cookies = cookies
+            self.cookie_version += 1
+            session.cookie_version = self.cookie_version
+        if not self.cookie_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cookie_path), exist_ok=True)
+            tmp_path = f"{self.cookie_path}.tmp"
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+            os.replace(tmp_path, self.cookie_path)
+        except OSError as e:
+            logger.warning(f"No se pudieron guardar las cookies en {self.cookie_path}: {e}")
+
+    # Borra las cookies guardadas (p.ej. si la sesión ha caducado).
+    def clear_cookies(self):
+        with self._condition:
+            self.cookies = []
+            self.cookie_version += 1
+        if self.cookie_path and os.path.exists(self.cookie_path):
+            os.remove(self.cookie_path)
+
+    # Carga en el navegador las cookies guardadas si tiene una versión anterior.
+    def _sync_cookies(self, session):
+        if not self.cookie_url or session.cookie_version == self.cookie_version:
+            return
+        cookies, version = self.cookies, self.cookie_version
+        session.logged_in = False
+        if cookies:
+            try:
+                session.driver.get(self.cookie_url)
+            except Exception as e:
+                logger.warning(f"No se pudieron cargar las cookies en el navegador: {e}")
+                return
+            for cookie in cookies:
+                try:
+                    session.driver.add_cookie(cookie)
+                except Exception as e:
+                    logger.debug(f"Cookie no copiada ({cookie.get('name')}): {e}")
+        session.cookie_version = version
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# Pool compartido del proceso para `name`; los argumentos solo se usan al crearlo.
+def get_browser_pool(name, **kwargs):
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = BrowserPool(name, **kwargs)
+        return _pools[name]
+
+
+# Cierra los navegadores libres que llevan demasiado tiempo sin usarse en todos los pools.
+def prune_browser_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return sum(pool.prune_idle() for pool in pools)
+
+
+# Cierra todos los navegadores y olvida los pools (al parar el worker).
+def close_browser_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
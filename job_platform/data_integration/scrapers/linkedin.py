@@ -2,27 +2,31 @@
 # Este script realiza scraping de ofertas de trabajo desde LinkedIn.
 # Extrae información como título, empresa y ubicación de las ofertas.
 # El proceso puede demorar varios minutos dependiendo del número de ofertas a extraer y las restricciones de LinkedIn.
-import re
 import time
 import logging
 import os
-import unicodedata
-from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 from django.utils import timezone
 from django.conf import settings
 from django.contrib import messages
 from django.shortcuts import render
 from rolepermissions.decorators import has_role_decorator
-from market_analysis.models import JobOffer, Skill
+from data_integration.incremental import SeenOfferIndex, is_incremental
+from data_integration.metrics import ScrapeMetrics
+from data_integration.models import ScrapeJob
+from data_integration.parsers import parse_linkedin_detail, parse_linkedin_search
+from data_integration.pipeline import OfferBatchWriter
+from data_integration.skills import get_skill_extractor
+from data_integration.snapshots import save_snapshot
 from .base_scraper import BaseScraper
+from .browser_pool import BrowserPool, create_chrome_driver, get_browser_pool
+from .utils import HostRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -51,12 +55,17 @@ def scrape_linkedin(request):
 # Clase que define el scraper de LinkedIn.
 # Hereda de BaseScraper y maneja la lógica de extracción de datos.
 # Utiliza Selenium para interactuar con la página web de LinkedIn de manera automatizada.
+# Las páginas de detalle se visitan con `workers` navegadores que comparten las cookies del
+# login y un limitador de peticiones por host. Los navegadores salen del pool compartido del
+# proceso (scrapers/browser_pool.py), que los mantiene arrancados y con la sesión iniciada entre
+# ejecuciones; con BROWSER_POOL_ENABLED=False se usa un pool propio que se cierra al terminar.
 class LinkedInScraper(BaseScraper):
-    def __init__(self):
-        # Inicializa el scraper con la URL base de LinkedIn y configura el navegador.
+    FEED_URL = "https://www.linkedin.com/feed/"
+
+    def __init__(self, workers=None, requests_per_minute=None, pool=None):
+        # Inicializa el scraper con la URL base de LinkedIn y el pool de navegadores.
         # Muestra advertencias sobre el uso del scraper debido a posibles violaciones de los Términos de Servicio.
-        # Configura el navegador en modo headless para evitar mostrar la interfaz gráfica.
-        # Utiliza ChromeDriverManager para gestionar la instalación del controlador de Chrome.
+        # Los navegadores se ejecutan en modo headless para evitar mostrar la interfaz gráfica.
         super().__init__("LinkedIn", "https://www.linkedin.com")
         logger.warning("\n" + "*" * 70)
         logger.warning("ADVERTENCIA: Scraping de LinkedIn en curso.")
@@ -65,17 +74,89 @@ class LinkedInScraper(BaseScraper):
         logger.warning("Ejecutando en modo headless (sin navegador visible).")
         logger.warning("*" * 70 + "\n")
 
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument(
-            "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        )
-        chrome_options.add_argument("--lang=en-US")  # Forzar idioma inglés
-
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+        self.workers = max(1, workers or getattr(settings, 'LINKEDIN_DETAIL_WORKERS', 1))
+        if requests_per_minute is None:
+            requests_per_minute = getattr(settings, 'LINKEDIN_REQUESTS_PER_MINUTE', 12)
+        self.rate_limiter = HostRateLimiter(requests_per_minute)
+        # Vocabulario de habilidades compilado una vez (los hilos del pool no consultan la BD)
+        self.skill_extractor = get_skill_extractor()
+        # Tiempos por etapa de la ejecución (data_integration/metrics.py)
+        self.metrics = ScrapeMetrics(self.source_name)
+        self.owns_pool = pool is None and not getattr(settings, 'BROWSER_POOL_ENABLED', True)
+        if pool is None:
+            options = {
+                'factory': self._create_driver,
+                'size': max(self.workers, getattr(settings, 'LINKEDIN_DETAIL_WORKERS', 1)),
+                'cookie_url': self.base_url,
+            }
+            if self.owns_pool:
+                pool = BrowserPool(self.source_name, **options)
+            else:
+                pool = get_browser_pool(self.source_name, **options)
+        self.pool = pool
+        self.sessions = []
+        self.driver = None
+
+    # Crea un navegador Chrome headless con la configuración del scraper.
+    @staticmethod
+    def _create_driver():
+        return create_chrome_driver()
+
+    # Toma un navegador del pool (esperando a que se libere uno si están todos ocupados) y lo
+    # usa como navegador principal (login y búsqueda).
+    def _acquire_main_session(self):
+        with self.metrics.stage('startup'):
+            session = self.pool.acquire(timeout=getattr(settings, 'BROWSER_POOL_ACQUIRE_TIMEOUT', 600))
+        if session is None:
+            raise RuntimeError("No hay navegadores libres en el pool.")
+        self.sessions.append(session)
+        self.driver = session.driver
+        return session
+
+    # Comprueba que el navegador tiene la sesión iniciada. Si el pool tiene cookies guardadas
+    # basta con abrir el feed; si han caducado (o no hay) se hace login y se guardan las nuevas.
+    def _ensure_logged_in(self, session, username, password):
+        if session.logged_in:
+            return
+        if self.pool.cookies:
+            with self.metrics.stage('fetch'):
+                session.driver.get(self.FEED_URL)
+            session.pages += 1
+            if "feed" in session.driver.current_url:
+                logger.info("Sesión de LinkedIn restaurada con las cookies guardadas.")
+                session.logged_in = True
+                return
+            logger.info("Las cookies guardadas de LinkedIn han caducado.")
+            self.pool.clear_cookies()
+        self.login(username, password)
+        session.logged_in = True
+        self.pool.save_cookies(session)
+
+    # Toma del pool los navegadores adicionales para los detalles sin esperar: si el pool no
+    # tiene más libres se trabaja con los que haya. Devuelve todos los navegadores disponibles.
+    def _acquire_worker_sessions(self, count):
+        while len(self.sessions) < count:
+            try:
+                with self.metrics.stage('startup'):
+                    session = self.pool.acquire(timeout=0)
+            except Exception as e:
+                logger.error(f"No se pudo arrancar un navegador adicional: {e}")
+                break
+            if session is None:
+                break
+            self.sessions.append(session)
+        logger.info(f"Pool de navegadores para detalles: {len(self.sessions)}")
+        return list(self.sessions)
+
+    # Devuelve los navegadores al pool (o los cierra si el pool es propio del scraper).
+    def _release_sessions(self):
+        for session in self.sessions:
+            self.pool.release(session)
+        self.sessions = []
+        self.driver = None
+        if self.owns_pool:
+            self.pool.close()
+            logger.info("Navegadores cerrados correctamente.")
 
     # Método para iniciar sesión en LinkedIn.
     # Utiliza las credenciales almacenadas en variables de entorno para acceder a la cuenta.
@@ -83,8 +164,9 @@ class LinkedInScraper(BaseScraper):
     # Captura y maneja errores durante el proceso de inicio de sesión.
     def login(self, username, password):
         logger.info("Iniciando sesión en LinkedIn...")
-        self.driver.get("https://www.linkedin.com/login")
-        time.sleep(2)
+        with self.metrics.stage('fetch'):
+            self.driver.get("https://www.linkedin.com/login")
+        self.metrics.sleep(2)
 
         try:
             email_field = self.driver.find_element(By.ID, "username")
@@ -94,13 +176,13 @@ class LinkedInScraper(BaseScraper):
             password_field.send_keys(password)
 
             self.driver.find_element(By.XPATH, "//button[@type='submit']").click()
-            time.sleep(5)
+            self.metrics.sleep(5)
 
             if "feed" in self.driver.current_url:
                 logger.info("Inicio de sesión exitoso.")
             else:
                 logger.error("Error al iniciar sesión. Puede haber CAPTCHA, 2FA o credenciales incorrectas.")
-                self.driver.save_screenshot("login_error.png")
+                self._save_screenshot(self.driver, 'login_error')
                 raise Exception("No se pudo iniciar sesión en LinkedIn.")
         except Exception as e:
             logger.error(f"Error durante el inicio de sesión: {e}")
@@ -110,15 +192,20 @@ class LinkedInScraper(BaseScraper):
     # Realiza una búsqueda basada en la consulta y ubicación proporcionadas, y maneja posibles CAPTCHA.
     # Implementa un sistema de reintentos para manejar CAPTCHA y otros problemas de carga de página.
     # Utiliza BeautifulSoup para analizar el HTML de la página y extraer URLs de ofertas de trabajo.
-    def fetch_offers(self, query="software developer", location="Spain", max_offers=10):
+    # `skip` es un callable opcional `skip(url)`: las URLs para las que devuelve True (ofertas ya
+    # vistas en el rastreo incremental) no cuentan para `max_offers` y se sigue desplazando.
+    def fetch_offers(self, query="software developer", location="Spain", max_offers=10, skip=None):
         if not query or not query.strip():
             logger.error("Query vacía o inválida proporcionada")
             return []
         
         logger.info(f"Buscando ofertas en LinkedIn: query='{query}', location='{location}', max_offers={max_offers}")
         search_url = f"https://www.linkedin.com/jobs/search/?keywords={query}&location={location}&sort=date"
-        self.driver.get(search_url)
-        time.sleep(5)
+        self.metrics.record('sleep', self.rate_limiter.wait(search_url))
+        with self.metrics.stage('fetch'):
+            self.driver.get(search_url)
+        self.metrics.count('pages')
+        self.metrics.sleep(5)
 
         soup = BeautifulSoup(self.driver.page_source, 'lxml')
         max_attempts = 3
@@ -133,217 +220,163 @@ class LinkedInScraper(BaseScraper):
             logger.warning(f"Intento {attempt + 1}/{max_attempts}: CAPTCHA o verificación detectada.")
             logger.warning(f"URL actual: {self.driver.current_url}")
             logger.warning(f"Fragmento de página: {soup.text[:200]}...")
-            self.driver.save_screenshot(f"captcha_detected_attempt_{attempt}.png")
+            self._save_screenshot(self.driver, 'captcha')
             logger.warning("Modo headless activo: no se puede resolver CAPTCHA manualmente. Saltando...")
             break
-            time.sleep(5)
+            self.metrics.sleep(5)
             self.driver.get(search_url)
-            time.sleep(5)
+            self.metrics.sleep(5)
             soup = BeautifulSoup(self.driver.page_source, 'lxml')
             attempt += 1
 
         try:
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            logger.debug("Página básica cargada.")
-            WebDriverWait(self.driver, 20).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/jobs/view/']"))
-            )
+            with self.metrics.stage('wait'):
+                WebDriverWait(self.driver, 20).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+                logger.debug("Página básica cargada.")
+                WebDriverWait(self.driver, 20).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='/jobs/view/']"))
+                )
             logger.debug("Ofertas de búsqueda cargadas correctamente.")
         except Exception as e:
             logger.error(f"Error al cargar la página de búsqueda: {e}")
-            self.driver.save_screenshot("search_error.png")
-            with open("linkedin_search.html", "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
+            self._save_screenshot(self.driver, 'search_error')
+            save_snapshot(self.driver.page_source, self.source_name, 'search_error', url=search_url)
             return []
 
         offer_urls = []
+        skipped = set()
         scroll_attempts = 0
         max_scrolls = 5
 
         while len(offer_urls) < max_offers and scroll_attempts < max_scrolls:
-            soup = BeautifulSoup(self.driver.page_source, 'lxml')
-            job_cards = soup.select('a[href*="/jobs/view/"]')
-            for card in job_cards:
-                href = card.get('href', '')
-                if href and href not in offer_urls and "/jobs/view/" in href:
-                    full_url = f"https://www.linkedin.com{href.split('?')[0]}"
+            with self.metrics.stage('parse'):
+                found_urls = parse_linkedin_search(self.driver.page_source)
+            for full_url in found_urls:
+                if full_url in skipped:
+                    continue
+                if skip and skip(full_url):
+                    skipped.add(full_url)
+                    continue
+                if full_url not in offer_urls:
                     offer_urls.append(full_url)
                     logger.debug(f"URL encontrada: {full_url}")
                     if len(offer_urls) >= max_offers:
                         break
 
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            self.metrics.sleep(3)
             scroll_attempts += 1
 
-        logger.info(f"Total URLs recolectadas: {len(offer_urls)}")
+        logger.info(f"Total URLs recolectadas: {len(offer_urls)} ({len(skipped)} ya vistas)")
         return offer_urls[:max_offers]
 
-    # Método para analizar los detalles de una oferta de trabajo específica.
-    # Extrae información como título, empresa, ubicación, descripción, habilidades, fecha de publicación y salario.
-    # Normaliza el texto extraído para asegurar consistencia en los datos.
-    # Verifica la presencia de datos esenciales antes de guardar la oferta en la base de datos.
-    def parse_offer_detail(self, url):
-        logger.info(f"Parseando detalle: {url}")
-        try:
-            self.driver.get(url)
-            WebDriverWait(self.driver, 20).until(
+    # Método para cargar la página de detalle de una oferta con el navegador indicado.
+    # Respeta el limitador de peticiones por host y espera al título en lugar de una pausa fija.
+    # Devuelve el HTML de la página.
+    def fetch_offer_page(self, url, driver=None):
+        driver = driver or self.driver
+        self.metrics.record('sleep', self.rate_limiter.wait(url))
+        with self.metrics.stage('fetch'):
+            driver.get(url)
+        self.metrics.count('pages')
+        with self.metrics.stage('wait'):
+            WebDriverWait(driver, 20).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            time.sleep(5)
-            job_id = url.split('/jobs/view/')[1].split('/')[0]
-            html_filename = f"job_detail_{job_id}.html"
-            with open(html_filename, "w", encoding="utf-8") as f:
-                f.write(self.driver.page_source)
-            logger.debug(f"HTML de detalle guardado en '{html_filename}'.")
-            soup = BeautifulSoup(self.driver.page_source, 'lxml')
-
-            data = {'url': url, 'source': "LinkedIn"}
-
-            # Normalizar texto extraído
-            def normalize_text(text):
-                if not text:
-                    return ""
-                return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('utf-8').strip()
-
-            # Título
-            title_tag = soup.select_one('h1.top-card-layout__title') or soup.select_one('.job-details-jobs-unified-top-card__job-title')
-            data['title'] = normalize_text(title_tag.get_text(strip=True)[:255]) if title_tag else "Sin título"
-            logger.debug(f"Título: {data['title']}")
-
-            # Empresa
-            company_tag = soup.select_one('a.topcard__org-name-link') or soup.select_one('.job-details-jobs-unified-top-card__company-name a')
-            data['company'] = normalize_text(company_tag.get_text(strip=True)[:255]) if company_tag else "Desconocida"
-            logger.debug(f"Empresa: {data['company']}")
-
-            # Ubicación
-            location_tag = soup.select_one('.artdeco-entity-lockup__caption div[dir="ltr"]') or soup.select_one('.job-details-jobs-unified-top-card__primary-description')
-            data['location'] = normalize_text(location_tag.get_text(strip=True)[:255]) if location_tag else "Ubicación no especificada"
-            logger.debug(f"Ubicación: {data['location']}")
-
-            # Descripción
-            description_tag = soup.select_one('div.jobs-description__content') or soup.select_one('.jobs-box__html-content')
-            description = normalize_text(description_tag.get_text(strip=True)[:2000]) if description_tag else "No especificada"
-            logger.debug(f"Descripción: {description[:100]}...")
-
-            # Habilidades
-            valid_skills = {
-                'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'node.js', 'django', 'flask',
-                'spring', 'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'docker', 'kubernetes', 'aws', 'azure',
-                'gcp', 'git', 'ci/cd', 'scrum', 'agile', 'linux', 'bash', 'php', 'ruby', 'go', 'c++', 'c#', '.net',
-                'html', 'css', 'sass', 'graphql', 'rest', 'terraform', 'ansible', 'jenkins', 'flutter', 'kotlin', 'swift'
-            }
-            skills_list = []
-
-            # Intento 1: Extraer habilidades desde la sección de habilidades
-            skills_section = soup.select_one('.job-details-skill-match-status__skill div')
-            if skills_section:
-                skills_text = normalize_text(skills_section.get_text(strip=True))
-                skills_list = [skill.strip().lower() for skill in skills_text.split(',') if skill.strip()]
-                skills_list = [skill for skill in skills_list if skill in valid_skills]
-                logger.debug(f"Habilidades extraídas de la sección: {skills_list}")
-
-            # Intento 2: Extraer habilidades desde el enlace de habilidades
-            if not skills_list:
-                skills_link = soup.select_one('a[href*="#HYM"][data-test-app-aware-link]')
-                if skills_link and "Skills:" in skills_link.get_text():
-                    skills_text = normalize_text(skills_link.get_text(strip=True).strip().replace("Skills:", ""))
-                    skills_list = [skill.strip().lower() for skill in skills_text.split(',') if skill.strip()]
-                    skills_list = [skill for skill in skills_list if skill in valid_skills]
-                    logger.debug(f"Habilidades extraídas del enlace: {skills_list}")
-
-            # Intento 3: Extraer habilidades desde la descripción
-            if not skills_list and description:
-                text = description.lower()
-                for skill in valid_skills:
-                    if skill == 'go':
-                        if re.search(r'\bgo\b|\bgolang\b', text):
-                            skills_list.append(skill)
-                    elif re.search(rf'\b{re.escape(skill)}\b', text) and skill not in skills_list:
-                        skills_list.append(skill)
-                logger.debug(f"Habilidades extraídas de la descripción: {skills_list}")
-
-            # Crear o obtener objetos Skill
-            skill_objects = []
-            for skill_name in set(skills_list):
-                if len(skill_name) > 2:
-                    skill_obj, created = Skill.objects.get_or_create(name=skill_name.lower())
-                    skill_objects.append(skill_obj)
-            data['required_skills'] = [skill.name for skill in skill_objects]
-            logger.debug(f"Habilidades finales guardadas: {data['required_skills']}")
-
-            # Fecha de publicación
-            date_tag = soup.select_one('time') or soup.select_one('span.jobs-unified-top-card__posted-date')
-            if date_tag:
-                date_text = normalize_text(date_tag.get_text(strip=True).lower())
-                logger.debug(f"Texto de fecha crudo: '{date_text}'")
-                if "ago" in date_text:
-                    match = re.search(r'(\d+)\s*(hour|day|week|month)', date_text)
-                    if match:
-                        value, unit = match.groups()
-                        value = int(value)
-                        now = datetime.now().date()
-                        if "hour" in unit:
-                            data['publication_date'] = now
-                        elif "day" in unit:
-                            data['publication_date'] = now - timedelta(days=value)
-                        elif "week" in unit:
-                            data['publication_date'] = now - timedelta(weeks=value)
-                        elif "month" in unit:
-                            data['publication_date'] = now - timedelta(days=value * 30)
-                        else:
-                            data['publication_date'] = now
-                    else:
-                        data['publication_date'] = datetime.now().date()
-                else:
-                    data['publication_date'] = datetime.now().date()
-            else:
-                data['publication_date'] = datetime.now().date()
-            logger.debug(f"Fecha: {data['publication_date']}")
-
-            # Salario
-            salary_tag = soup.select_one('#SALARY .jobs-details__salary-main-rail-card span') or soup.select_one('.jobs-unified-top-card__salary')
-            data['salary'] = normalize_text(salary_tag.get_text(strip=True)[:255]) if salary_tag else None
-            logger.debug(f"Salario: {data['salary']}")
-
-            # Validar datos requeridos
-            if not data.get('title') or not data.get('url') or data['title'] == "Sin título":
-                logger.warning(f"Oferta descartada por faltar título o URL válida: {url}")
-                return None
-
             try:
-                job_offer, created = JobOffer.objects.get_or_create(
-                    url=data['url'],
-                    defaults={
-                        'title': data['title'],
-                        'company': data['company'] or "Desconocida",
-                        'location': data['location'],
-                        'publication_date': data['publication_date'],
-                        'salary': data['salary'],
-                        'source': data['source'],
-                    }
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located(
+                        (By.CSS_SELECTOR, "h1.top-card-layout__title, .job-details-jobs-unified-top-card__job-title")
+                    )
                 )
-                if skill_objects:
-                    job_offer.skills.set(skill_objects)
-                    logger.debug(f"Habilidades asociadas a JobOffer: {[skill.name for skill in skill_objects]}")
-                logger.info(f"Guardado en JobOffer: {job_offer.title} {'(nueva)' if created else '(actualizada)'}")
-            except Exception as e:
-                logger.error(f"Error al guardar en JobOffer: {e}")
-                return None
+            except TimeoutException:
+                logger.debug(f"Título no encontrado tras la espera: {url}")
+        page_source = driver.page_source
+        with self.metrics.stage('persist'):
+            save_snapshot(page_source, self.source_name, 'detail', url=url)
+        return page_source
+
+    # Guarda una captura de pantalla del navegador en el archivo de capturas (depuración).
+    def _save_screenshot(self, driver, kind):
+        try:
+            png = driver.get_screenshot_as_png()
+        except Exception as e:
+            logger.debug(f"No se pudo hacer la captura de pantalla '{kind}': {e}")
+            return
+        save_snapshot(png, self.source_name, kind, url=driver.current_url, content_type='image/png')
+
+    # Método para analizar los detalles de una oferta de trabajo específica
+    # (data_integration/parsers.py). No accede a la base de datos, por lo que puede
+    # ejecutarse en los hilos del pool.
+    def extract_offer_data(self, html, url):
+        start = time.perf_counter()
+        try:
+            data = parse_linkedin_detail(html, url, self.skill_extractor)
+        except Exception as e:
+            logger.error(f"Error al parsear detalle: {e}")
+            self.metrics.count('failures')
+            return None
+        finally:
+            self.metrics.record('parse', time.perf_counter() - start)
+        if data is None:
+            logger.warning(f"Oferta descartada por faltar título o URL válida: {url}")
+            return None
+        logger.debug(f"Oferta extraída: {data['title']} ({data['company']}), habilidades: {data['required_skills']}")
+        return data
 
-            return data
+    # Método para guardar en la base de datos una oferta extraída y sus habilidades.
+    # Usa la etapa de persistencia por lotes con un lote de una sola oferta.
+    def save_offer(self, data):
+        try:
+            with OfferBatchWriter() as writer:
+                writer.add(data)
+            logger.info(f"Guardado en JobOffer: {data['title']}")
+        except Exception as e:
+            logger.error(f"Error al guardar en JobOffer: {e}")
+            return None
+        return data
 
+    # Método que carga, analiza y guarda una oferta de trabajo en un solo paso.
+    def parse_offer_detail(self, url, driver=None):
+        logger.info(f"Parseando detalle: {url}")
+        try:
+            html = self.fetch_offer_page(url, driver)
         except Exception as e:
             logger.error(f"Error al parsear detalle: {e}")
             return None
+        data = self.extract_offer_data(html, url)
+        if data:
+            return self.save_offer(data)
+        return None
+
+    # Carga y analiza una oferta usando un navegador libre del pool (se ejecuta en un hilo).
+    def _fetch_and_extract(self, url, sessions):
+        session = sessions.get()
+        try:
+            logger.info(f"Parseando detalle: {url}")
+            session.pages += 1
+            html = self.fetch_offer_page(url, session.driver)
+            return self.extract_offer_data(html, url)
+        finally:
+            sessions.put(session)
 
     # Método principal para ejecutar el proceso de scraping.
     # Inicia sesión, busca ofertas, analiza los detalles y guarda los datos extraídos.
-    # Maneja excepciones críticas y asegura el cierre adecuado del navegador.
-    def run(self, query="software developer", location="Spain", max_offers=10):
+    # Los detalles se cargan en paralelo con el pool de navegadores; el guardado se hace
+    # en el hilo principal, por lotes, a medida que llegan los resultados.
+    # Maneja excepciones críticas y devuelve siempre los navegadores al pool.
+    # `progress` es un callable opcional `progress(hechas, total)` que usa el worker de trabajos.
+    # En modo incremental (`incremental`, por defecto CRAWL_INCREMENTAL) no se abren las ofertas
+    # guardadas y vistas hace menos de CRAWL_REFRESH_DAYS días.
+    # Al terminar guarda los tiempos por etapa en un `ScrapeRun`; `metrics` permite pasar un
+    # ScrapeMetrics ya creado (p.ej. enlazado al trabajo).
+    def run(self, query="software developer", location="Spain", max_offers=10, progress=None, incremental=None,
+            metrics=None):
         logger.info(f"Iniciando scraping de LinkedIn: query='{query}', location='{location}', max_offers={max_offers}")
+        self.metrics = metrics or self.metrics
+        status = ScrapeJob.STATUS_COMPLETED
         try:
             username = os.getenv("LINKEDIN_EMAIL")
             password = os.getenv("LINKEDIN_PASSWORD")
@@ -352,25 +385,44 @@ class LinkedInScraper(BaseScraper):
                 logger.error("Las credenciales de LinkedIn (LINKEDIN_EMAIL y LINKEDIN_PASSWORD) no están configuradas en .env")
                 raise ValueError("Credenciales de LinkedIn no configuradas")
 
-            self.login(username, password)
-            offer_urls = self.fetch_offers(query, location, max_offers)
+            seen = SeenOfferIndex.load(self.source_name) if is_incremental(incremental) else None
+            session = self._acquire_main_session()
+            self._ensure_logged_in(session, username, password)
+            offer_urls = self.fetch_offers(query, location, max_offers, skip=seen.has_url if seen else None)
+            session.pages += 1
+            if not offer_urls:
+                return []
+
+            sessions = queue.Queue()
+            for worker_session in self._acquire_worker_sessions(min(self.workers, len(offer_urls))):
+                sessions.put(worker_session)
+
             all_offer_data = []
-            for url in offer_urls:
-                try:
-                    detail_data = self.parse_offer_detail(url)
-                    if detail_data:
-                        all_offer_data.append(detail_data)
-                except Exception as e:
-                    logger.error(f"Error al procesar {url}: {e}")
-                time.sleep(5)
+            writer = OfferBatchWriter()
+            with ThreadPoolExecutor(max_workers=sessions.qsize()) as executor:
+                futures = {executor.submit(self._fetch_and_extract, url, sessions): url for url in offer_urls}
+                for index, future in enumerate(as_completed(futures), start=1):
+                    url = futures[future]
+                    if progress:
+                        progress(index, len(offer_urls))
+                    try:
+                        detail_data = future.result()
+                        if detail_data:
+                            with self.metrics.stage('persist'):
+                                writer.add(detail_data)
+                            all_offer_data.append(detail_data)
+                    except Exception as e:
+                        logger.error(f"Error al procesar {url}: {e}")
+            with self.metrics.stage('persist'):
+                writer.finish()
+            self.metrics.count('offers', len(all_offer_data))
             logger.info(f"Total ofertas extraídas: {len(all_offer_data)}")
             return all_offer_data
         except Exception as e:
+            # Se propaga para que el trabajo (data_integration/jobs.py) quede como fallido
             logger.error(f"Error crítico en la ejecución: {e}")
-            return []
+            status = ScrapeJob.STATUS_FAILED
+            raise
         finally:
-            try:
-                self.driver.quit()
-                logger.info("Navegador cerrado correctamente.")
-            except Exception as e:
-                logger.error(f"Error al cerrar el navegador: {e}")
\ No newline at end of file
+            self.metrics.save(status=status)
+            self._release_sessions()
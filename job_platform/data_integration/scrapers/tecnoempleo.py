@@ -1,115 +1,291 @@
 # data_integration/scrapers/tecnoempleo.py
 from django.contrib import messages
 from django.shortcuts import render
+from django.utils import timezone
 from rolepermissions.decorators import has_role_decorator
-from market_analysis.models import JobOffer, Skill
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from data_integration.incremental import SeenOfferIndex, is_incremental
+from data_integration.metrics import ScrapeMetrics
+from data_integration.models import CrawledPage, ScrapeJob
+from data_integration.parsers import parse_tecnoempleo_page
+from data_integration.pipeline import OfferBatchWriter
+from data_integration.skills import get_skill_extractor
+from data_integration.snapshots import save_snapshot
 from datetime import datetime, timedelta
+from urllib.parse import urlencode
+import asyncio
+import hashlib
+import logging
+import queue
+import threading
 import time
-import os
-import re
 import random
-import requests
+import httpx
+from django.conf import settings
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # - Extrae 30 ofertas con título, empresa, ubicación, fecha y habilidades.
 # - Fechas correctas (11/04/2025 a 12/04/2025), sin fallback.
 # - Limpia salario (p.ej., '27.000€ - 33.000€ b/a') y texto ('Nueva', 'Actualizada') con regex.
 # - Muestra mensaje de rango ('Esta actualización incluye ofertas desde X hasta Y') y 'Se han extraído 30 ofertas'.
 # - Ubicaciones como 'Madrid y otras' y 'Barcelona (Híbrido)' bien parseadas.
-# - Usa tecnoempleo_debug.html para depuración.
-@has_role_decorator('admin')
-def scrape_tecnoempleo(request):
-    # URL de la página de ofertas de trabajo en Tecnoempleo
-    url = "https://www.tecnoempleo.com/ofertas-trabajo/?keyword=desarrollador&provincia=33"
-    # Encabezados para la solicitud HTTP
-    headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
-    try:
-        # Realizar la solicitud HTTP a la URL
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        # Manejar errores de conexión
-        messages.error(request, f"Error al conectar con Tecnoempleo: {e}")
-        return render(request, 'data_integration/scrape_results.html', {'offers': []})
+# - Guarda cada página de resultados en el archivo de capturas (data_integration/snapshots.py).
+# - El análisis del HTML está en data_integration/parsers.py.
+# - Rastreo incremental (CRAWL_INCREMENTAL): las páginas se piden con If-None-Match/If-Modified-Since
+#   y las que no han cambiado no se analizan; las ofertas ya vistas hace poco no se vuelven a guardar.
+# - Cada ejecución guarda sus tiempos por etapa (descarga, análisis, guardado) en `ScrapeRun`.
+# URL del buscador de ofertas de trabajo en Tecnoempleo
+TECNOEMPLEO_SEARCH_URL = "https://www.tecnoempleo.com/ofertas-trabajo/"
+# Encabezados para la solicitud HTTP
+TECNOEMPLEO_HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
+# Códigos HTTP que merecen un reintento con espera
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+# Construye la URL de búsqueda para una palabra clave, provincia (None = toda España) y página.
+def build_tecnoempleo_url(keyword, province=None, page=1):
+    params = {'keyword': keyword}
+    if province:
+        params['provincia'] = province
+    if page > 1:
+        params['pagina'] = page
+    return f"{TECNOEMPLEO_SEARCH_URL}?{urlencode(params)}"
 
-    # Guardar el HTML de la página para depuración
-    debug_path = os.path.join(os.getcwd(), "tecnoempleo_debug.html")
-    with open(debug_path, "w", encoding="utf-8") as f:
-        f.write(response.text)
 
-    # Analizar el HTML de la página
-    soup = BeautifulSoup(response.text, 'html.parser')
-    offers = []
+# Cabeceras de petición condicional a partir de los validadores guardados de una página.
+def _conditional_headers(previous):
+    headers = {}
+    if previous and previous.etag:
+        headers['If-None-Match'] = previous.etag
+    if previous and previous.last_modified:
+        headers['If-Modified-Since'] = previous.last_modified
+    return headers
+
+
+# Descarga una página con reintentos y espera exponencial (respeta la cabecera Retry-After).
+# El semáforo limita las peticiones simultáneas a Tecnoempleo.
+# Devuelve la respuesta, que puede ser un 304 si se han enviado cabeceras condicionales.
+# Cada intento fallido cuenta como fallo en `metrics`.
+async def _fetch_page(client, semaphore, url, retries, metrics, headers=None):
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url, headers=headers)
+                finally:
+                    metrics.record('fetch', time.perf_counter() - start)
+            if response.status_code == 304:
+                return response
+            if response.status_code not in RETRY_STATUS_CODES:
+                response.raise_for_status()
+                return response
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else 0.5 * 2 ** attempt
+            error = httpx.HTTPStatusError(
+                f"HTTP {response.status_code} en {url}", request=response.request, response=response
+            )
+        except httpx.TransportError as e:
+            delay = 0.5 * 2 ** attempt
+            error = e
+        metrics.count('failures')
+        if attempt < retries:
+            logger.warning(f"Reintentando {url} en {delay:.1f}s ({error})")
+            delay += random.uniform(0, 0.25)
+            await asyncio.sleep(delay)
+            metrics.record('sleep', delay)
+    raise error
+
+
+# Recorre las páginas de una búsqueda (palabra clave + provincia) hasta que no haya más ofertas
+# y entrega cada página a `emit` en cuanto llega, como diccionario con url, html, offers, dates,
+# cards, etag, last_modified, content_hash y unchanged. Una página sin cambios respecto a
+# `validators` (URL -> CrawledPage) llega con unchanged=True, sin HTML ni ofertas.
+async def _crawl_search(client, semaphore, keyword, province, max_pages, one_month_ago, emit, retries, validators,
+                        metrics):
+    for page in range(1, max_pages + 1):
+        url = build_tecnoempleo_url(keyword, province, page)
+        previous = validators.get(url)
+        response = await _fetch_page(client, semaphore, url, retries, metrics, _conditional_headers(previous))
+        if response.status_code == 304:
+            html = None
+            content_hash = previous.content_hash
+        else:
+            html = response.text
+            content_hash = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        unchanged = previous is not None and previous.content_hash == content_hash
+        if unchanged:
+            offers, date_list, cards = [], [], previous.cards
+        else:
+            with metrics.stage('parse'):
+                offers, date_list, cards = parse_tecnoempleo_page(html, one_month_ago)
+        emit({
+            'url': url,
+            'html': html,
+            'offers': offers,
+            'dates': date_list,
+            'cards': cards,
+            'etag': response.headers.get('ETag', previous.etag if previous else ''),
+            'last_modified': response.headers.get('Last-Modified', previous.last_modified if previous else ''),
+            'content_hash': content_hash,
+            'unchanged': unchanged,
+        })
+        if cards == 0:
+            break
+
+
+# Rastrea de forma concurrente todas las combinaciones palabra clave/provincia/página.
+# Usa un único cliente HTTP con pool de conexiones y como mucho `concurrency` peticiones a la vez.
+# `validators` (URL -> CrawledPage) activa las peticiones condicionales y `metrics`
+# (ScrapeMetrics) recoge los tiempos de descarga y análisis.
+async def crawl_tecnoempleo(keywords, provinces, max_pages, concurrency, emit, retries=3, transport=None,
+                            validators=None, metrics=None):
+    validators = validators or {}
+    metrics = metrics or ScrapeMetrics("Tecnoempleo")
     one_month_ago = datetime.now().date() - timedelta(days=30)
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=TECNOEMPLEO_HEADERS, limits=limits, timeout=20,
+                                 follow_redirects=True, transport=transport) as client:
+        searches = [
+            _crawl_search(client, semaphore, keyword, province, max_pages, one_month_ago, emit, retries, validators,
+                          metrics)
+            for keyword in keywords
+            for province in provinces
+        ]
+        results = await asyncio.gather(*searches, return_exceptions=True)
+    errors = [result for result in results if isinstance(result, Exception)]
+    for error in errors:
+        logger.error(f"Error al rastrear Tecnoempleo: {error}")
+    if errors and len(errors) == len(results):
+        raise errors[0]
+
+
+# Ejecuta el scraping de Tecnoempleo sin depender de una petición HTTP.
+# Lo usan tanto la vista (`scrape_tecnoempleo`) como el worker de trabajos en segundo plano.
+# El rastreo asíncrono corre en un hilo aparte y va entregando las páginas analizadas;
+# este hilo las guarda por lotes a medida que llegan (el ORM de Django es síncrono).
+# En modo incremental (`incremental`, por defecto CRAWL_INCREMENTAL) las páginas que no han
+# cambiado no se analizan y las ofertas vistas hace menos de CRAWL_REFRESH_DAYS días no se
+# vuelven a guardar.
+# Los tiempos por etapa se guardan al terminar en un `ScrapeRun` (data_integration/metrics.py);
+# `metrics` permite pasar un ScrapeMetrics ya creado (p.ej. enlazado al trabajo).
+# Devuelve la lista de ofertas guardadas y la lista de fechas de publicación encontradas.
+# Lanza `httpx.HTTPError` si no se puede conectar con Tecnoempleo.
+def run_tecnoempleo_scraper(progress=None, keywords=None, provinces=None, max_pages=None,
+                            concurrency=None, transport=None, incremental=None, metrics=None):
+    metrics = metrics or ScrapeMetrics("Tecnoempleo")
+    try:
+        offers, date_list = _run_tecnoempleo(progress, keywords, provinces, max_pages, concurrency, transport,
+                                             incremental, metrics)
+    except Exception:
+        metrics.save(status=ScrapeJob.STATUS_FAILED)
+        raise
+    metrics.count('offers', len(offers))
+    metrics.save()
+    return offers, date_list
+
+
+def _run_tecnoempleo(progress, keywords, provinces, max_pages, concurrency, transport, incremental, metrics):
+    keywords = keywords or getattr(settings, 'TECNOEMPLEO_KEYWORDS', ['desarrollador'])
+    provinces = provinces or getattr(settings, 'TECNOEMPLEO_PROVINCES', ['33'])
+    max_pages = max_pages or getattr(settings, 'TECNOEMPLEO_MAX_PAGES', 5)
+    concurrency = concurrency or getattr(settings, 'TECNOEMPLEO_CONCURRENCY', 8)
+    total_pages = len(keywords) * len(provinces) * max_pages
+    incremental = is_incremental(incremental)
+    validators = {}
+    seen = SeenOfferIndex()
+    if incremental:
+        urls = [build_tecnoempleo_url(keyword, province, page)
+                for keyword in keywords for province in provinces for page in range(1, max_pages + 1)]
+        validators = CrawledPage.objects.in_bulk(urls, field_name='url')
+        seen = SeenOfferIndex.load("Tecnoempleo")
+
+    pages = queue.Queue()
+    finished = object()
+
+    def crawl():
+        try:
+            asyncio.run(crawl_tecnoempleo(keywords, provinces, max_pages, concurrency, pages.put,
+                                          transport=transport, validators=validators, metrics=metrics))
+        except Exception as e:
+            pages.put(e)
+        finally:
+            pages.put(finished)
+
+    start = time.monotonic()
+    thread = threading.Thread(target=crawl, name="tecnoempleo-crawler", daemon=True)
+    thread.start()
+
+    writer = OfferBatchWriter()
+    skill_extractor = get_skill_extractor()
     date_list = []
+    crawled = []
+    pages_done = 0
+    pages_unchanged = 0
+    offers_skipped = 0
+    error = None
+    while True:
+        item = pages.get()
+        if item is finished:
+            break
+        if isinstance(item, Exception):
+            error = item
+            continue
+        metrics.count('pages')
+        with metrics.stage('persist'):
+            if not item['unchanged']:
+                save_snapshot(item['html'], "Tecnoempleo", 'search', url=item['url'])
+            for data in item['offers']:
+                if seen.has_offer(data):
+                    offers_skipped += 1
+                    continue
+                # Los alias de las etiquetas (p.ej. "Golang") se guardan con su nombre canónico
+                data['required_skills'] = skill_extractor.canonicalize(data['required_skills'])
+                writer.add(data)
+        crawled.append(CrawledPage(
+            url=item['url'],
+            etag=item['etag'][:255],
+            last_modified=item['last_modified'][:64],
+            content_hash=item['content_hash'],
+            cards=item['cards'],
+            fetched_at=timezone.now(),
+        ))
+        pages_done += 1
+        pages_unchanged += item['unchanged']
+        if progress:
+            progress(pages_done, total_pages)
+        date_list.extend(item['dates'])
+    thread.join()
+    if error and pages_done == 0:
+        raise error
 
-    # Iterar sobre cada oferta de trabajo en la página
-    for offer in soup.select('.col-10.col-md-9.col-lg-7'):
-        # Extraer elementos de título, empresa y ubicación
-        title_elem = offer.select_one('h3.fs-5.mb-2 a')
-        company_elem = offer.select_one('a.text-primary.link-muted')
-        location_elem = offer.select_one('span.d-block.d-lg-none.text-gray-800')
-        skills_elems = offer.select('span.badge.bg-gray-500')[:10]
-
-        if title_elem and company_elem and location_elem:
-            title = title_elem.text.strip()
-            company = company_elem.text.strip()
-            location_text = location_elem.text.strip()
-            date_text = None
-
-            # Extraer y limpiar la fecha de publicación
-            if ' - ' in location_text:
-                location, date_candidate = location_text.split(' - ', 1)
-                location = BeautifulSoup(location, 'html.parser').text.strip()
-                # Limpiar fecha con regex
-                date_candidate = date_candidate.replace('Actualizada', '').replace('Nueva', '').strip()
-                # Extraer solo la fecha (dd/mm/yyyy)
-                date_match = re.match(r'(\d{2}/\d{2}/\d{4})', date_candidate)
-                if date_match:
-                    date_text = date_match.group(1)
-                else:
-                    date_text = None
-            else:
-                location = location_text
-
-            try:
-                if date_text:
-                    pub_date = datetime.strptime(date_text, '%d/%m/%Y').date()
-                    date_list.append(pub_date)
-                else:
-                    pub_date = one_month_ago
-            except (ValueError, AttributeError):
-                pub_date = one_month_ago
-
-            if pub_date < one_month_ago:
-                continue
-
-            # Crear o actualizar la oferta de trabajo en la base de datos
-            job, created = JobOffer.objects.get_or_create(
-                title=title,
-                company=company,
-                source="Tecnoempleo",
-                defaults={
-                    'location': location,
-                    'publication_date': pub_date,
-                    'salary': None
-                }
+    with metrics.stage('persist'):
+        # Guardar las ofertas que queden en el último lote y actualizar los agregados diarios
+        writer.finish()
+        # Los validadores se guardan después de las ofertas: si el guardado falla, la página
+        # se vuelve a analizar en el siguiente rastreo
+        if crawled:
+            CrawledPage.objects.bulk_create(
+                crawled,
+                update_conflicts=True,
+                unique_fields=['url'],
+                update_fields=['etag', 'last_modified', 'content_hash', 'cards', 'fetched_at'],
             )
-            if created:
-                # Agregar habilidades a la oferta de trabajo
-                for skill_elem in skills_elems:
-                    skill_name = skill_elem.text.strip()
-                    skill, _ = Skill.objects.get_or_create(name=skill_name)
-                    job.skills.add(skill)
-            offers.append(job)
+    logger.info(f"Tecnoempleo: {pages_done} páginas ({pages_unchanged} sin cambios) y {len(writer.saved)} ofertas "
+                f"({offers_skipped} ya vistas) en {time.monotonic() - start:.1f}s")
+    return writer.saved, date_list
+
+
+@has_role_decorator('admin')
+def scrape_tecnoempleo(request):
+    try:
+        offers, date_list = run_tecnoempleo_scraper()
+    except httpx.HTTPError as e:
+        # Manejar errores de conexión
+        messages.error(request, f"Error al conectar con Tecnoempleo: {e}")
+        return render(request, 'data_integration/scrape_results.html', {'offers': []})
 
     # Calcular el rango de fechas de las ofertas extraídas
     if date_list:
@@ -125,4 +301,3 @@ def scrape_tecnoempleo(request):
         'num_offers': len(offers)
     }
     return render(request, 'data_integration/scrape_results.html', context)
-
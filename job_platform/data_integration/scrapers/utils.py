@@ -1,6 +1,9 @@
 # data_integration/scrapers/utils.py
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 import re
+import threading
+import time
 
 def parse_relative_date(date_text):
     """
@@ -21,4 +24,27 @@ def parse_relative_date(date_text):
                 return now - timedelta(weeks=value)
             elif "mes" in unit:
                 return now - timedelta(days=value * 30)
-    return now
\ No newline at end of file
+    return now
+
+
+class HostRateLimiter:
+    """
+    Limita las peticiones a cada host a un máximo de `requests_per_minute`.
+    Es seguro entre hilos: cada llamada a `wait(url)` reserva el siguiente hueco libre
+    del host y duerme solo lo necesario, así varios workers comparten el mismo presupuesto.
+    """
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute and requests_per_minute > 0 else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,148 @@
+# data_integration/skills.py
+# Extracción de habilidades a partir del texto de las ofertas, común a todos los scrapers.
+# El vocabulario se guarda en la base de datos (habilidades con `in_vocabulary=True` y sus
+# alias `SkillAlias`, editables desde el admin); si aún no se ha configurado se usa el
+# vocabulario por defecto de este módulo (`python manage.py load_skill_vocabulary` lo copia a la BD).
+#
+# Todos los términos (nombres y alias) se compilan en una única expresión regular con forma
+# de árbol de prefijos (trie): en cada posición del texto solo se prueban los términos que
+# empiezan por ese carácter, en vez de una búsqueda por habilidad. El extractor compilado se
+# cachea en el proceso y se reconstruye al cambiar el vocabulario o tras SKILL_VOCABULARY_TTL.
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from market_analysis.models import Skill, SkillAlias
+
+DEFAULT_VOCABULARY = [
+    'python', 'java', 'javascript', 'typescript', 'react', 'angular', 'vue', 'node.js', 'django', 'flask',
+    'spring', 'sql', 'nosql', 'mongodb', 'postgresql', 'mysql', 'docker', 'kubernetes', 'aws', 'azure',
+    'gcp', 'git', 'ci/cd', 'scrum', 'agile', 'linux', 'bash', 'php', 'ruby', 'go', 'c++', 'c#', '.net',
+    'html', 'css', 'sass', 'graphql', 'rest', 'terraform', 'ansible', 'jenkins', 'flutter', 'kotlin', 'swift',
+]
+
+DEFAULT_ALIASES = {
+    'golang': 'go',
+    'k8s': 'kubernetes',
+    'nodejs': 'node.js',
+    'postgres': 'postgresql',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'csharp': 'c#',
+    'dotnet': '.net',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'spring boot': 'spring',
+    'mongo': 'mongodb',
+    'html5': 'html',
+    'css3': 'css',
+    'restful': 'rest',
+}
+
+
+# Construye una expresión regular equivalente a la alternativa de todos los términos,
+# agrupada por prefijos comunes. Los cuantificadores son voraces, así que se prefiere
+# siempre el término más largo ("node.js" antes que "node").
+def _trie_pattern(terms):
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+
+    return build(trie)
+
+
+class SkillExtractor:
+    """
+    Busca las habilidades de un vocabulario en textos y normaliza nombres de habilidades.
+    `vocabulary` son los nombres canónicos y `aliases` un diccionario alias -> nombre canónico.
+    No accede a la base de datos, así que se puede usar desde los hilos de los scrapers.
+    """
+    def __init__(self, vocabulary, aliases=None):
+        self.canonical = {name.lower(): name for name in vocabulary}
+        for alias, name in (aliases or {}).items():
+            self.canonical.setdefault(alias.lower(), name)
+        terms = sorted(self.canonical, key=len, reverse=True)
+        # Un término debe empezar y terminar en un límite de palabra: no vale "go" dentro de "google"
+        self.pattern = re.compile(r'(?<!\w)' + _trie_pattern(terms) + r'(?!\w)', re.IGNORECASE) if terms else None
+
+    # Devuelve la lista ordenada de habilidades canónicas que aparecen en `text`.
+    def extract(self, text):
+        if not text or self.pattern is None:
+            return []
+        return sorted({self.canonical[match.lower()] for match in self.pattern.findall(text)})
+
+    # Devuelve el nombre canónico de `name` o None si no está en el vocabulario.
+    def lookup(self, name):
+        return self.canonical.get(name.strip().lower())
+
+    # Nombres canónicos de los elementos de `names` que están en el vocabulario.
+    def known(self, names):
+        return sorted({canonical for canonical in map(self.lookup, names) if canonical})
+
+    # Sustituye los alias por su nombre canónico y deja el resto de nombres como están.
+    def canonicalize(self, names):
+        result = []
+        for name in names:
+            name = name.strip()
+            canonical = self.lookup(name) or name
+            if name and canonical not in result:
+                result.append(canonical)
+        return result
+
+
+# Lee el vocabulario de la base de datos; si no hay ninguna habilidad marcada, el de por defecto.
+def load_vocabulary():
+    vocabulary = list(Skill.objects.filter(in_vocabulary=True).values_list('name', flat=True))
+    if not vocabulary:
+        return DEFAULT_VOCABULARY, DEFAULT_ALIASES
+    return vocabulary, dict(SkillAlias.objects.values_list('alias', 'skill__name'))
+
+
+_extractor = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+# Devuelve el extractor compilado del proceso (lo construye la primera vez o si ha caducado).
+# Debe llamarse desde un hilo con acceso a la base de datos, antes de repartir el trabajo.
+def get_skill_extractor():
+    global _extractor, _loaded_at
+    ttl = getattr(settings, 'SKILL_VOCABULARY_TTL', 300)
+    with _lock:
+        if _extractor is None or time.monotonic() - _loaded_at > ttl:
+            _extractor = SkillExtractor(*load_vocabulary())
+            _loaded_at = time.monotonic()
+        return _extractor
+
+
+def invalidate_skill_extractor():
+    global _extractor
+    with _lock:
+        _extractor = None
+
+
+@receiver(post_save, sender=SkillAlias)
+@receiver(post_delete, sender=SkillAlias)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def _vocabulary_changed(sender, **kwargs):
+    invalidate_skill_extractor()
@@ -0,0 +1,182 @@
+# data_integration/snapshots.py
+# Archivo de las páginas descargadas por los scrapers (HTML y capturas de pantalla), para
+# poder volver a pasarlas por los parsers sin conexión (pruebas de regresión, reanálisis).
+# Sustituye a los ficheros de depuración que se escribían en el directorio actual.
+#
+# Estructura de SNAPSHOT_DIR:
+#   objects/ab/abcdef...<códec>  contenido comprimido (market_analysis/compression.py); el nombre
+#                                es el sha256 del contenido original, así que una página que no
+#                                ha cambiado se guarda una sola vez
+#   index.jsonl                  una línea por captura: hash, fuente, tipo, URL, tamaños y fecha
+#
+# Las capturas se conservan SNAPSHOT_MAX_AGE_DAYS días y ocupan como mucho SNAPSHOT_MAX_BYTES
+# (comprimidas); `prune` borra las más antiguas. Lo ejecutan el worker de scraping cuando no
+# tiene trabajos y el comando `prune_snapshots`. Reescribe el índice, así que no debe
+# ejecutarse mientras otro proceso esté scrapeando.
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from market_analysis.compression import ZLIB, ZSTD, compress_bytes, decompress_bytes
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+class SnapshotStore:
+    def __init__(self, root):
+        self.root = str(root)
+        self.index_path = os.path.join(self.root, 'index.jsonl')
+
+    def _object_path(self, content_hash, codec):
+        return os.path.join(self.root, 'objects', content_hash[:2], f"{content_hash}.{codec}")
+
+    # Devuelve (códec, tamaño comprimido) si el contenido ya está guardado.
+    def _find_object(self, content_hash):
+        for codec in (ZSTD, ZLIB):
+            path = self._object_path(content_hash, codec)
+            if os.path.exists(path):
+                return codec, os.path.getsize(path)
+        return None
+
+    # Guarda una captura y devuelve su entrada del índice.
+    # `kind` indica qué página es (p.ej. 'detail', 'search', 'search_error', 'screenshot').
+    def put(self, content, source, kind, url='', content_type='text/html'):
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        content_hash = hashlib.sha256(content).hexdigest()
+        existing = self._find_object(content_hash)
+        if existing:
+            codec, stored_size = existing
+        else:
+            codec, data = compress_bytes(content)
+            path = self._object_path(content_hash, codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            stored_size = len(data)
+        entry = {
+            'hash': content_hash,
+            'codec': codec,
+            'source': source,
+            'kind': kind,
+            'url': url,
+            'content_type': content_type,
+            'size': len(content),
+            'stored_size': stored_size,
+            'captured_at': timezone.now().isoformat(),
+        }
+        with _lock, open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    # Entradas del índice, de la más antigua a la más reciente, filtradas por fuente, tipo o URL.
+    def entries(self, source=None, kind=None, url=None):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if source and entry['source'] != source:
+                    continue
+                if kind and entry['kind'] != kind:
+                    continue
+                if url and entry['url'] != url:
+                    continue
+                yield entry
+
+    def read(self, entry):
+        with open(self._object_path(entry['hash'], entry['codec']), 'rb') as f:
+            return decompress_bytes(entry['codec'], f.read())
+
+    def read_text(self, entry):
+        return self.read(entry).decode('utf-8')
+
+    # Borra las capturas anteriores a `max_age` (timedelta) y, si el archivo sigue ocupando más
+    # de `max_bytes`, las más antiguas hasta bajar de ese tamaño. Un contenido compartido por
+    # varias capturas solo se borra cuando se borra la última. Devuelve (capturas, bytes) borrados.
+    def prune(self, max_age=None, max_bytes=None):
+        with _lock:
+            entries = list(self.entries())
+            cutoff = timezone.now() - max_age if max_age else None
+            kept = [entry for entry in entries if not cutoff or parse_datetime(entry['captured_at']) >= cutoff]
+
+            references = {}
+            sizes = {}
+            for entry in kept:
+                references[entry['hash']] = references.get(entry['hash'], 0) + 1
+                sizes[entry['hash']] = entry['stored_size']
+            total = sum(sizes.values())
+            start = 0
+            while max_bytes is not None and total > max_bytes and start < len(kept):
+                entry = kept[start]
+                references[entry['hash']] -= 1
+                if not references[entry['hash']]:
+                    total -= sizes[entry['hash']]
+                start += 1
+            kept = kept[start:]
+            if len(kept) == len(entries):
+                return 0, 0
+
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in kept:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.index_path)
+
+            kept_hashes = {entry['hash'] for entry in kept}
+            freed = 0
+            for content_hash, codec in {(entry['hash'], entry['codec']) for entry in entries if entry['hash'] not in kept_hashes}:
+                path = self._object_path(content_hash, codec)
+                try:
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        removed = len(entries) - len(kept)
+        logger.info(f"Capturas borradas: {removed} ({freed} bytes).")
+        return removed, freed
+
+
+# Archivo configurado en los settings, o None si SNAPSHOTS_ENABLED es False.
+def get_snapshot_store():
+    if not getattr(settings, 'SNAPSHOTS_ENABLED', True):
+        return None
+    return SnapshotStore(settings.SNAPSHOT_DIR)
+
+
+# Guarda una captura en el archivo configurado. Un error de disco no debe interrumpir
+# el scraping: se registra y se devuelve None.
+def save_snapshot(content, source, kind, url='', content_type='text/html'):
+    store = get_snapshot_store()
+    if store is None or content is None:
+        return None
+    try:
+        return store.put(content, source, kind, url=url, content_type=content_type)
+    except OSError as e:
+        logger.warning(f"No se pudo guardar la captura {source}/{kind} ({url}): {e}")
+        return None
+
+
+# Aplica la retención configurada (SNAPSHOT_MAX_AGE_DAYS y SNAPSHOT_MAX_BYTES).
+def prune_snapshots():
+    store = get_snapshot_store()
+    if store is None:
+        return 0, 0
+    max_age_days = getattr(settings, 'SNAPSHOT_MAX_AGE_DAYS', 30)
+    return store.prune(
+        max_age=timedelta(days=max_age_days) if max_age_days else None,
+        max_bytes=getattr(settings, 'SNAPSHOT_MAX_BYTES', None),
+    )
@@ -1,3 +1,562 @@
-from django.test import TestCase
+# data_integration/tests.py
+from unittest import skipUnless
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from datetime import date, timedelta
+from io import StringIO
+import io
+import json
+import os
+import tempfile
+import httpx
+from django.core.management import call_command
+from unittest.mock import patch
+from market_analysis.models import JobOffer, Skill, MarketData, SkillDemandRollup
+from .metrics import ScrapeMetrics
+from .models import ScrapeJob, ScrapeRun
+from .jobs import enqueue_scrape_job, claim_next_job, execute_job
+from .pipeline import OfferBatchWriter
+from .scrapers.tecnoempleo import run_tecnoempleo_scraper
+from .export import export_offers
+from .snapshots import SnapshotStore
+from .skills import SkillExtractor, get_skill_extractor, invalidate_skill_extractor, DEFAULT_VOCABULARY, DEFAULT_ALIASES
+from market_analysis.models import OfferDescription, SkillAlias
+
+# Pruebas para la cola de trabajos de scraping en segundo plano.
+class ScrapeJobQueueTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            username='admin', password='12345', email='admin@example.com'
+        )
+
+    def test_enqueue_creates_pending_job(self):
+        """Encolar un trabajo lo deja pendiente sin ejecutar el scraper."""
+        job, created = enqueue_scrape_job(self.user, 'Tecnoempleo')
+        self.assertTrue(created)
+        self.assertEqual(job.status, ScrapeJob.STATUS_PENDING)
+        self.assertEqual(job.requested_by, self.user)
+
+    def test_enqueue_reuses_active_job(self):
+        """No se crean dos trabajos activos para la misma fuente."""
+        first, _ = enqueue_scrape_job(self.user, 'Tecnoempleo')
+        second, created = enqueue_scrape_job(self.user, 'Tecnoempleo')
+        self.assertFalse(created)
+        self.assertEqual(first.pk, second.pk)
+
+    def test_enqueue_unknown_source(self):
+        with self.assertRaises(ValueError):
+            enqueue_scrape_job(self.user, 'InfoJobs')
+
+    def test_claim_and_execute_job(self):
+        """El worker reclama el trabajo una sola vez y guarda progreso y resultado."""
+        job, _ = enqueue_scrape_job(self.user, 'Tecnoempleo')
+
+        claimed = claim_next_job()
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, ScrapeJob.STATUS_RUNNING)
+        self.assertIsNone(claim_next_job())
+
+        def fake_runner(job, progress):
+            progress(3, 3)
+            return 3, "Se han extraído 3 ofertas de Tecnoempleo."
+
+        with patch.dict('data_integration.jobs.SCRAPE_RUNNERS', {'Tecnoempleo': fake_runner}):
+            execute_job(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.STATUS_COMPLETED)
+        self.assertEqual(job.offers_count, 3)
+        self.assertEqual((job.progress, job.total), (3, 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_execute_job_records_failure(self):
+        job, _ = enqueue_scrape_job(self.user, 'LinkedIn')
+        claimed = claim_next_job()
+
+        def failing_runner(job, progress):
+            raise RuntimeError("Error de conexión")
+
+        with patch.dict('data_integration.jobs.SCRAPE_RUNNERS', {'LinkedIn': failing_runner}):
+            execute_job(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ScrapeJob.STATUS_FAILED)
+        self.assertEqual(job.error_message, "Error de conexión")
+
+    def test_view_enqueues_and_status_endpoint(self):
+        """La vista responde sin ejecutar el scraper y el endpoint devuelve el estado."""
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('data_integration:scrape_tecnoempleo'))
+        self.assertRedirects(response, reverse('data_integration:scrape_index'))
+        job = ScrapeJob.objects.get()
+
+        response = self.client.get(reverse('data_integration:scrape_job_status', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], ScrapeJob.STATUS_PENDING)
+
+        response = self.client.get(reverse('data_integration:scrape_index'))
+        self.assertContains(response, f"#{job.pk} Tecnoempleo")
+
+    def test_status_endpoint_requires_login(self):
+        job, _ = enqueue_scrape_job(self.user, 'Tecnoempleo')
+        response = self.client.get(reverse('data_integration:scrape_job_status', args=[job.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn(b'status', response.content)
+
+
+# Pruebas para la etapa de persistencia por lotes.
+class OfferBatchWriterTests(TestCase):
+    def offer(self, i, source="Tecnoempleo", skills=("Python", "Django")):
+        return {
+            'title': f"Desarrollador {i}",
+            'company': "TechCorp",
+            'location': "Madrid",
+            'source': source,
+            'publication_date': date(2025, 4, 12),
+            'salary': None,
+            'url': f"https://example.com/job/{i}" if source == "LinkedIn" else None,
+            'required_skills': list(skills),
+        }
+
+    def save(self, offers):
+        with CaptureQueriesContext(connection) as ctx:
+            with OfferBatchWriter() as writer:
+                for data in offers:
+                    writer.add(data)
+        return writer.saved, len(ctx.captured_queries)
+
+    def test_saves_offers_and_skills(self):
+        saved, _ = self.save([self.offer(1), self.offer(2, source="LinkedIn", skills=["python", "docker"])])
+        self.assertEqual(len(saved), 2)
+        self.assertEqual(Skill.objects.count(), 3)
+        offer = JobOffer.objects.get(url="https://example.com/job/2")
+        # Skill.name no distingue mayúsculas: "python" reutiliza la habilidad "Python"
+        self.assertEqual({name.lower() for name in offer.skills.values_list('name', flat=True)}, {"python", "docker"})
+
+    def test_query_count_does_not_grow_with_batch(self):
+        """El número de consultas por lote es constante, no proporcional a las ofertas."""
+        _, small = self.save([self.offer(i) for i in range(5)])
+        _, large = self.save([self.offer(i) for i in range(100, 200)])
+        self.assertEqual(small, large)
+
+    def test_upsert_updates_existing_offer(self):
+        self.save([self.offer(1)])
+        updated = {**self.offer(1, skills=["Java"]), 'location': "Oviedo"}
+        self.save([updated])
+        offer = JobOffer.objects.get(title="Desarrollador 1")
+        self.assertEqual(offer.location, "Oviedo")
+        # Las habilidades que ya no se extraen dejan de estar enlazadas (y de contar en la demanda)
+        self.assertEqual(list(offer.skills.values_list('name', flat=True)), ["Java"])
+        self.assertFalse(MarketData.objects.filter(skill__name="Django").exists())
+
+    def test_conflicting_offer_does_not_lose_batch(self):
+        """Una URL nueva con título/empresa/fuente repetidos no impide guardar el resto."""
+        self.save([self.offer(1, source="LinkedIn")])
+        clash = {**self.offer(1, source="LinkedIn"), 'url': "https://example.com/job/other"}
+        saved, _ = self.save([clash, self.offer(2, source="LinkedIn")])
+        self.assertEqual(len(saved), 1)
+        self.assertTrue(JobOffer.objects.filter(url="https://example.com/job/2").exists())
+
+    def test_finish_refreshes_market_data(self):
+        """Al terminar el lote se actualizan los agregados diarios de los días afectados."""
+        self.save([self.offer(1), self.offer(2)])
+        python = Skill.objects.get(name="Python")
+        self.assertEqual(
+            MarketData.objects.get(date=date(2025, 4, 12), skill=python, source="Tecnoempleo").demand_count, 2
+        )
+
+    def test_moved_offer_is_counted_once(self):
+        """Si una oferta cambia de fecha, el día anterior deja de contarla."""
+        self.save([{**self.offer(1), 'publication_date': date(2026, 10, 1)}])
+        self.save([{**self.offer(1), 'publication_date': date(2026, 10, 5)}])
+        python = Skill.objects.get(name="Python")
+        self.assertEqual(list(MarketData.objects.filter(skill=python).values_list('date', 'demand_count')),
+                         [(date(2026, 10, 5), 1)])
+        self.assertEqual(SkillDemandRollup.objects.get(granularity='month', skill=python).demand_count, 1)
+
+
+    def test_saves_compressed_description(self):
+        """La descripción se guarda comprimida aparte y no se reescribe si no cambia."""
+        text = "Buscamos desarrollador backend con experiencia en Django y PostgreSQL. " * 40
+        self.save([{**self.offer(1, source="LinkedIn"), 'description': text}])
+        offer = JobOffer.objects.get(url="https://example.com/job/1")
+        self.assertEqual(offer.description.text, text.strip())
+        self.assertLess(len(offer.description.content), len(text) // 4)
+        # Los listados de ofertas no leen la tabla de descripciones
+        with CaptureQueriesContext(connection) as ctx:
+            list(JobOffer.objects.all())
+        self.assertNotIn("offerdescription", ctx.captured_queries[0]['sql'])
+
+        _, queries = self.save([{**self.offer(1, source="LinkedIn"), 'description': text}])
+        _, without_description = self.save([self.offer(1, source="LinkedIn")])
+        self.assertEqual(queries, without_description + 1)
+        self.assertEqual(JobOffer.objects.get(url="https://example.com/job/1").description.length, len(text.strip()))
+
+# Pruebas para la caché del panel de control.
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class DashboardCacheTests(TestCase):
+    def save(self, *titles):
+        with self.captureOnCommitCallbacks(execute=True):
+            with OfferBatchWriter() as writer:
+                for title in titles:
+                    writer.add({
+                        'title': title, 'company': "TechCorp", 'location': "Gijón", 'source': "Tecnoempleo",
+                        'publication_date': date.today(), 'salary': None, 'url': None,
+                        'required_skills': ["Python"],
+                    })
+
+    def test_dashboard_is_cached_until_new_offers(self):
+        self.save("Desarrollador 1")
+        response = self.client.get(reverse('data_integration:data_dashboard'))
+        self.assertEqual(response.context['skills_data'], "[1]")
+
+        # La segunda visita no consulta la base de datos
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('data_integration:data_dashboard'))
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        # Al guardar nuevas ofertas se invalida la caché
+        self.save("Desarrollador 2")
+        response = self.client.get(reverse('data_integration:data_dashboard'))
+        self.assertEqual(response.context['skills_data'], "[2]")
+
+
+# Pruebas para la búsqueda de ofertas (`?search=`).
+class OfferSearchTests(TestCase):
+    def setUp(self):
+        with OfferBatchWriter() as writer:
+            for title, location, skills in [
+                ("Desarrollador backend", "Oviedo", ["Python", "Django"]),
+                ("Programador frontend", "Madrid", ["React", "Python"]),
+                ("Analista de datos", "Gijón", ["SQL"]),
+            ]:
+                writer.add({
+                    'title': title, 'company': "TechCorp", 'location': location, 'source': "Tecnoempleo",
+                    'publication_date': date.today(), 'salary': None, 'url': None, 'required_skills': skills,
+                })
+
+    def search(self, text):
+        response = self.client.get(reverse('data_integration:scrape_results'), {'search': text})
+        return [offer.title for offer in response.context['offers']]
+
+    def test_search_by_skill_without_duplicates(self):
+        self.assertCountEqual(self.search("python"), ["Desarrollador backend", "Programador frontend"])
+
+    def test_search_by_title_and_location(self):
+        self.assertEqual(self.search("Gijón"), ["Analista de datos"])
+        self.assertEqual(self.search("backend"), ["Desarrollador backend"])
+
+    @skipUnless(connection.vendor == 'postgresql', "La búsqueda de texto completo requiere PostgreSQL")
+    def test_full_text_search_ranks_and_stems(self):
+        # 'desarrolladores' coincide con 'Desarrollador' gracias al stemming en español
+        self.assertEqual(self.search("desarrolladores"), ["Desarrollador backend"])
+        # La coincidencia en título y habilidad puntúa más que solo en habilidad
+        self.assertEqual(self.search("python backend")[0], "Desarrollador backend")
+
+
+# Pruebas para la exportación de ofertas.
+class OfferExportTests(TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user(username='manager', password='12345', role='manager'))
+        with OfferBatchWriter() as writer:
+            for i in range(5):
+                writer.add({
+                    'title': f"Desarrollador {i}", 'company': "TechCorp", 'location': "Oviedo",
+                    'source': "LinkedIn" if i % 2 else "Tecnoempleo", 'publication_date': date(2025, 4, 12),
+                    'salary': None, 'url': None, 'required_skills': ["Python", "Django"],
+                })
+
+    def export(self, export_format, **params):
+        response = self.client.get(reverse('data_integration:export_offers', args=[export_format]), params)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_csv_export(self):
+        lines = self.export('csv').decode().splitlines()
+        self.assertEqual(lines[0], "id,title,company,location,source,publication_date,salary,url,skills")
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(lines[1].endswith(",2025-04-12,,,Django|Python"))
+
+    def test_jsonl_export_with_filters(self):
+        rows = [json.loads(line) for line in self.export('jsonl', source="LinkedIn").decode().splitlines()]
+        self.assertEqual([row['title'] for row in rows], ["Desarrollador 1", "Desarrollador 3"])
+        self.assertEqual(rows[0]['skills'], ["Django", "Python"])
+
+    def test_parquet_export(self):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(io.BytesIO(self.export('parquet')))
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(table.column('skills')[0].as_py(), ["Django", "Python"])
+
+    def test_query_count_is_per_chunk(self):
+        """Una consulta de ofertas (cursor), una de habilidades y una de relaciones por bloque."""
+        with CaptureQueriesContext(connection) as ctx:
+            list(export_offers(JobOffer.objects.all(), 'jsonl', chunk_size=2))
+        self.assertEqual(len(ctx.captured_queries), 2 + 3)
+
+    def test_unknown_format_and_invalid_date(self):
+        url = reverse('data_integration:export_offers', args=['xml'])
+        self.assertEqual(self.client.get(url).status_code, 400)
+        url = reverse('data_integration:export_offers', args=['csv'])
+        self.assertEqual(self.client.get(url, {'since': "2025-02-30"}).status_code, 400)
+
+    def test_export_requires_staff_or_role(self):
+        url = reverse('data_integration:export_offers', args=['csv'])
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 302)
+        collaborator = get_user_model().objects.create_user(username='collaborator', password='12345')
+        self.client.force_login(collaborator)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        collaborator.is_staff = True
+        collaborator.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_command_writes_file(self):
+        path = os.path.join(tempfile.mkdtemp(), "ofertas.csv")
+        call_command('export_offers', format='csv', output=path, since="2025-04-01", stderr=StringIO())
+        with open(path, encoding='utf-8') as f:
+            self.assertEqual(len(f.read().splitlines()), 6)
+
+
+# Pruebas para el listado de resultados paginado por clave (fecha de publicación, id).
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ScrapeResultsPaginationTests(TestCase):
+    def setUp(self):
+        with OfferBatchWriter() as writer:
+            for i in range(30):
+                writer.add({
+                    'title': f"Desarrollador {i:02d}", 'company': "TechCorp", 'location': "Oviedo",
+                    'source': "Tecnoempleo", 'publication_date': date.today() - timedelta(days=i % 3),
+                    'salary': None, 'url': None, 'required_skills': ["Python", f"Skill{i}"],
+                })
+
+    @patch('data_integration.views.RESULTS_PAGE_SIZE', 10)
+    def test_pages_cover_all_offers_without_repeats(self):
+        titles, after = [], None
+        for _ in range(3):
+            params = {'after': after} if after else {}
+            response = self.client.get(reverse('data_integration:scrape_results'), params)
+            titles += [offer.title for offer in response.context['offers']]
+            after = response.context['next_cursor']
+        self.assertIsNone(after)
+        self.assertEqual(len(titles), 30)
+        self.assertEqual(len(set(titles)), 30)
+        self.assertEqual(response.context['num_offers'], 30)
+
+    def test_skills_are_prefetched(self):
+        """El número de consultas no depende del número de ofertas de la página."""
+        self.client.get(reverse('data_integration:scrape_results'))  # llena la caché del total
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('data_integration:scrape_results'))
+        self.assertEqual(len(response.context['offers']), 24)
+        self.assertContains(response, "Skill0")
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+    @patch('data_integration.views.RESULTS_PAGE_SIZE', 20)
+    def test_json_api(self):
+        first = self.client.get(reverse('data_integration:scrape_results_api')).json()
+        self.assertEqual(len(first['results']), 20)
+        self.assertIn("Python", first['results'][0]['skills'])
+        second = self.client.get(reverse('data_integration:scrape_results_api'), {'after': first['next']}).json()
+        self.assertEqual(len(second['results']), 10)
+        self.assertIsNone(second['next'])
+
+
+# Pruebas para la extracción de habilidades con el vocabulario compilado.
+class SkillExtractorTests(TestCase):
+    def setUp(self):
+        self.extractor = SkillExtractor(DEFAULT_VOCABULARY, DEFAULT_ALIASES)
+
+    def test_extract_with_aliases_and_symbols(self):
+        text = "Buscamos dev Golang con K8s, C++ y C#, experiencia en Node.js y .NET; valorable reactjs."
+        self.assertEqual(
+            self.extractor.extract(text),
+            [".net", "c#", "c++", "go", "kubernetes", "node.js", "react"],
+        )
+
+    def test_whole_words_only(self):
+        self.assertEqual(self.extractor.extract("Trabajo en Google con javascript y gitlab"), ["javascript"])
+
+    def test_canonicalize_keeps_unknown_names(self):
+        self.assertEqual(self.extractor.canonicalize(["Golang", "Go", "Odoo "]), ["go", "Odoo"])
+        self.assertEqual(self.extractor.known(["Python ", "Odoo", "k8s"]), ["kubernetes", "python"])
+
+    def test_database_vocabulary_and_invalidation(self):
+        """El vocabulario de la BD sustituye al de por defecto y los cambios invalidan la caché."""
+        # El extractor se cachea en el proceso: no dejar el de esta prueba a las siguientes
+        self.addCleanup(invalidate_skill_extractor)
+        elixir = Skill.objects.create(name="elixir", in_vocabulary=True)
+        self.assertEqual(get_skill_extractor().extract("Python y Elixir"), ["elixir"])
+        SkillAlias.objects.create(alias="ex", skill=elixir)
+        self.assertEqual(get_skill_extractor().extract("Proyecto en ex"), ["elixir"])
+        call_command('load_skill_vocabulary', stdout=StringIO())
+        self.assertEqual(get_skill_extractor().extract("Python y Elixir"), ["elixir", "python"])
+
+
+# Pruebas de la reextracción de habilidades sobre las ofertas guardadas.
+class ReextractSkillsTests(TestCase):
+    def setUp(self):
+        self.addCleanup(invalidate_skill_extractor)
+        self.k8s = Skill.objects.create(name="k8s")
+        self.odoo = Skill.objects.create(name="Odoo")
+        self.offer = JobOffer.objects.create(
+            title="Desarrollador Python", company="ACME", source="Tecnoempleo",
+            publication_date=date(2025, 3, 1),
+        )
+        self.offer.skills.add(self.k8s, self.odoo)
+        self.untouched = JobOffer.objects.create(
+            title="Administrativo", company="ACME", source="Tecnoempleo",
+            publication_date=date(2025, 3, 2),
+        )
+        self.checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+
+    def test_reextract_applies_vocabulary(self):
+        """Los alias se sustituyen, se añaden las habilidades del texto y se conservan las demás."""
+        out = StringIO()
+        call_command('reextract_skills', checkpoint=self.checkpoint, chunk_size=1, stdout=out)
+        self.assertEqual(
+            sorted(self.offer.skills.values_list('name', flat=True), key=str.lower),
+            ["kubernetes", "Odoo", "python"],
+        )
+        self.assertFalse(self.untouched.skills.exists())
+        self.assertEqual(
+            MarketData.objects.filter(date=date(2025, 3, 1)).count(), 3
+        )
+        self.assertFalse(os.path.exists(self.checkpoint))
+        self.assertIn("1 de 2 ofertas modificadas", out.getvalue())
+
+    def test_reextract_reads_stored_description(self):
+        OfferDescription.objects.bulk_create([OfferDescription.from_text(self.untouched.id, "Uso de Terraform y AWS")])
+        call_command('reextract_skills', checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertEqual(sorted(self.untouched.skills.values_list('name', flat=True)), ["aws", "terraform"])
+
+    def test_dry_run_does_not_write(self):
+        call_command('reextract_skills', checkpoint=self.checkpoint, dry_run=True, stdout=StringIO())
+        self.assertEqual(self.offer.skills.count(), 2)
+
+    def test_resumes_from_checkpoint(self):
+        """Con un punto de control del mismo vocabulario solo se procesan las ofertas posteriores."""
+        from .reextraction import vocabulary_fingerprint
+        fingerprint = vocabulary_fingerprint(SkillExtractor(DEFAULT_VOCABULARY, DEFAULT_ALIASES))
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'vocabulary': fingerprint, 'last_id': self.offer.id, 'dates': [],
+                       'offers': 1, 'changed': 0, 'added': 0, 'removed': 0}, f)
+        call_command('reextract_skills', checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertEqual(self.offer.skills.count(), 2)
+
+        call_command('reextract_skills', checkpoint=self.checkpoint, restart=True, stdout=StringIO())
+        self.assertEqual(self.offer.skills.count(), 3)
+
+
+# Pruebas del archivo de capturas de páginas de los scrapers.
+class SnapshotStoreTests(TestCase):
+    def setUp(self):
+        self.store = SnapshotStore(tempfile.mkdtemp())
+
+    def objects(self):
+        return [name for _, _, names in os.walk(os.path.join(self.store.root, 'objects')) for name in names]
+
+    def test_put_deduplicates_content(self):
+        html = "<html><body>" + "<p>Oferta</p>" * 500 + "</body></html>"
+        first = self.store.put(html, "LinkedIn", 'detail', url="https://example.com/1")
+        self.store.put(html, "LinkedIn", 'detail', url="https://example.com/2")
+        self.store.put(b"\x89PNG", "LinkedIn", 'screenshot', content_type='image/png')
+        self.assertEqual(len(self.objects()), 2)
+        self.assertLess(first['stored_size'], first['size'] // 10)
+        entries = list(self.store.entries(kind='detail'))
+        self.assertEqual([entry['url'] for entry in entries], ["https://example.com/1", "https://example.com/2"])
+        self.assertEqual(self.store.read_text(entries[1]), html)
+
+    def test_prune_by_age_and_size(self):
+        """Se borran las capturas antiguas y después las más viejas hasta bajar del tamaño máximo."""
+        with patch('data_integration.snapshots.timezone.now', return_value=timezone.now() - timedelta(days=40)):
+            self.store.put("pagina antigua", "Tecnoempleo", 'search')
+        shared = self.store.put("pagina repetida", "Tecnoempleo", 'search')
+        self.store.put("pagina nueva", "Tecnoempleo", 'search')
+        self.store.put("pagina repetida", "Tecnoempleo", 'search')
+
+        removed, freed = self.store.prune(max_age=timedelta(days=30))
+        self.assertEqual(removed, 1)
+        self.assertGreater(freed, 0)
+        self.assertEqual(len(self.objects()), 2)
+
+        # La primera captura de "pagina repetida" se borra, pero su contenido sigue en uso
+        removed, _ = self.store.prune(max_bytes=shared['stored_size'])
+        self.assertEqual(removed, 2)
+        self.assertEqual([self.store.read_text(entry) for entry in self.store.entries()], ["pagina repetida"])
+        self.assertEqual(len(self.objects()), 1)
+
+
+# Página de resultados de Tecnoempleo con una sola oferta.
+TECNOEMPLEO_PAGE = """<html><body><div class="col-10 col-md-9 col-lg-7">
+<h3 class="fs-5 mb-2"><a href="#">Python Developer</a></h3>
+<a class="text-primary link-muted" href="#">Empresa</a>
+<span class="d-block d-lg-none text-gray-800">Oviedo</span>
+</div></body></html>"""
+
+# Pruebas de las métricas por etapa de los scrapers.
+class ScrapeMetricsTests(TestCase):
+    def test_stage_summary_and_failures(self):
+        metrics = ScrapeMetrics("Tecnoempleo")
+        for seconds in range(1, 21):
+            metrics.record('fetch', seconds / 10)
+        with self.assertRaises(ValueError):
+            with metrics.stage('parse'):
+                raise ValueError("HTML inesperado")
+        metrics.count('pages', 20)
+        summary = metrics.stage_summary()
+        self.assertEqual(summary['fetch']['count'], 20)
+        self.assertEqual(summary['fetch']['p50'], 1.0)
+        self.assertEqual(summary['fetch']['p95'], 1.9)
+        self.assertEqual(summary['fetch']['max'], 2.0)
+        self.assertEqual(summary['parse']['count'], 1)
+        self.assertNotIn('persist', summary)
+
+        run = metrics.save()
+        self.assertEqual((run.pages, run.failures), (20, 1))
+        self.assertAlmostEqual(run.failure_rate, 0.05)
+
+    @override_settings(SNAPSHOT_DIR=tempfile.mkdtemp())
+    def test_job_run_is_recorded_and_exposed(self):
+        def handler(request):
+            if request.url.params.get('pagina'):
+                return httpx.Response(200, text="<html></html>")
+            return httpx.Response(200, text=TECNOEMPLEO_PAGE)
+
+        run_tecnoempleo_scraper(keywords=["python"], provinces=["33"], max_pages=3,
+                                transport=httpx.MockTransport(handler))
+        run = ScrapeRun.objects.get()
+        self.assertEqual((run.source, run.status, run.pages, run.offers), ("Tecnoempleo", 'completed', 2, 1))
+        self.assertEqual(run.stages['fetch']['count'], 2)
+        self.assertEqual(set(run.stages), {'fetch', 'parse', 'persist'})
+
+        with override_settings(METRICS_TOKEN="secreto"):
+            response = self.client.get(reverse('data_integration:metrics'), HTTP_AUTHORIZATION="Bearer secreto")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('scrape_runs_total{source="Tecnoempleo",status="completed"} 1', text)
+        self.assertIn('scrape_pages_total{source="Tecnoempleo"} 2', text)
+        self.assertIn('scrape_stage_seconds{source="Tecnoempleo",stage="fetch",quantile="0.95"}', text)
+        self.assertIn('scrape_stage_seconds_count{source="Tecnoempleo",stage="parse"} 2', text)
+
+    @override_settings(METRICS_TOKEN="secreto", METRICS_ALLOWED_IPS=['10.0.0.9'])
+    def test_metrics_access(self):
+        """Localhost (p.ej. un proxy inverso) no basta: hace falta token, staff o IP permitida."""
+        url = reverse('data_integration:metrics')
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer otro").status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION="Bearer secreto").status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.0.0.9').status_code, 200)
+        user = get_user_model().objects.create_user(username='collaborator', password='12345')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
 
-# Create your tests here.
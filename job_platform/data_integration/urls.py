@@ -8,6 +8,10 @@ urlpatterns = [
     path('', views.scrape_index, name='scrape_index'),
     path('linkedin/', views.scrape_linkedin_view, name='scrape_linkedin'),
     path('tecnoempleo/', views.scrape_tecnoempleo_view, name='scrape_tecnoempleo'),
+    path('jobs/<int:job_id>/', views.scrape_job_status, name='scrape_job_status'),
     path('scrape-results/', views.scrape_results, name='scrape_results'),
+    path('scrape-results/api/', views.scrape_results_api, name='scrape_results_api'),
+    path('export/<str:export_format>/', views.export_offers_view, name='export_offers'),
+    path('metrics/', views.metrics_view, name='metrics'),
     path('data-dashboard/', views.dashboard_view, name='data_dashboard'),  # Renombrado según tu instrucción
 ]
\ No newline at end of file
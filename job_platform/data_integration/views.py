@@ -1,56 +1,79 @@
 # data_integration/views.py
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
 from django.contrib import messages
-from django.http import HttpResponseRedirect
-from .scrapers.linkedin import scrape_linkedin
-from .scrapers.tecnoempleo import scrape_tecnoempleo
-from market_analysis.models import JobOffer
-from django.db.models import Count
+from django.contrib.auth.decorators import login_required
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, HttpResponseRedirect, JsonResponse, StreamingHttpResponse,
+)
+from django.utils.dateparse import parse_date
+from .export import EXPORT_FORMATS, export_offers, offers_for_export
+from .jobs import enqueue_scrape_job
+from .metrics import render_prometheus
+from .pagination import keyset_page
+from .models import ScrapeJob
+from market_analysis.models import JobOffer, MarketData, Skill
+from market_analysis.dashboard_cache import cached_block
+from market_analysis.search import search_offers
+from django.db.models import Count, Prefetch, Sum
 from datetime import datetime, timedelta
+import hashlib
+import hmac
 import json
-from django.db.models import Q
 
 # Vista para la página principal de scraping.
-# Muestra la página de inicio para iniciar el scraping.
+# Muestra la página de inicio para iniciar el scraping y los últimos trabajos encolados.
 def scrape_index(request):
+    recent_jobs = ScrapeJob.objects.all()[:5]
     # Renderiza la plantilla de la página de inicio del scraping.
-    return render(request, 'data_integration/scrape_index.html', {})
+    return render(request, 'data_integration/scrape_index.html', {'recent_jobs': recent_jobs})
+
+# Encola un trabajo de scraping para la fuente indicada y avisa al usuario.
+# El scraping lo ejecuta el worker en segundo plano (`python manage.py run_scrape_worker`),
+# así que la petición responde de inmediato.
+def _enqueue_from_request(request, source):
+    try:
+        job, created = enqueue_scrape_job(request.user, source)
+        if created:
+            messages.success(request, f'Actualización de {source} encolada (trabajo #{job.pk}). Los resultados aparecerán al terminar.')
+        else:
+            messages.info(request, f'Ya hay una actualización de {source} en curso (trabajo #{job.pk}).')
+    except Exception as e:
+        # Muestra un mensaje de error si no se puede encolar el trabajo.
+        messages.error(request, f'Error al actualizar {source}: {e}')
+    return redirect('data_integration:scrape_index')
 
 # Vista para iniciar el scraping de LinkedIn.
-# Realiza el scraping cuando se recibe una solicitud POST y redirige a los resultados.
+# Encola el trabajo cuando se recibe una solicitud POST y redirige a la página de scrapers.
 def scrape_linkedin_view(request):
     if request.method == 'POST':
-        try:
-            # Llama a la función de scraping de LinkedIn y muestra un mensaje de éxito.
-            scrape_linkedin(request)
-            messages.success(request, 'Datos de LinkedIn actualizados correctamente.')
-            return redirect('data_integration:scrape_results')
-        except Exception as e:
-            # Muestra un mensaje de error si ocurre una excepción durante el scraping.
-            messages.error(request, f'Error al actualizar LinkedIn: {e}')
-            return redirect('data_integration:scrape_index')
+        return _enqueue_from_request(request, 'LinkedIn')
     # Renderiza la plantilla de la página de inicio del scraping si no es una solicitud POST.
-    return render(request, 'data_integration/scrape_index.html', {})
+    return scrape_index(request)
 
 # Vista para iniciar el scraping de Tecnoempleo.
-# Realiza el scraping cuando se recibe una solicitud POST y redirige a los resultados.
+# Encola el trabajo cuando se recibe una solicitud POST y redirige a la página de scrapers.
 def scrape_tecnoempleo_view(request):
     if request.method == 'POST':
-        try:
-            # Llama a la función de scraping de Tecnoempleo y muestra un mensaje de éxito.
-            scrape_tecnoempleo(request)
-            messages.success(request, 'Datos de Tecnoempleo actualizados correctamente.')
-            return redirect('data_integration:scrape_results')
-        except Exception as e:
-            # Muestra un mensaje de error si ocurre una excepción durante el scraping.
-            messages.error(request, f'Error al actualizar Tecnoempleo: {e}')
-            return redirect('data_integration:scrape_index')
+        return _enqueue_from_request(request, 'Tecnoempleo')
     # Renderiza la plantilla de la página de inicio del scraping si no es una solicitud POST.
-    return render(request, 'data_integration/scrape_index.html', {})
+    return scrape_index(request)
 
-# Vista para mostrar los resultados del scraping.
-# Muestra las ofertas de trabajo extraídas en los últimos 30 días.
-def scrape_results(request):
+# Endpoint de consulta del estado de un trabajo de scraping.
+# Devuelve JSON con el estado y el progreso para que la interfaz lo consulte periódicamente.
+# Requiere sesión, como el encolado de trabajos.
+@login_required
+def scrape_job_status(request, job_id):
+    job = get_object_or_404(ScrapeJob, pk=job_id)
+    return JsonResponse(job.to_dict())
+
+# Ofertas por página del listado de resultados.
+RESULTS_PAGE_SIZE = 24
+
+# Devuelve (ofertas de la página, cursor siguiente, texto buscado, fecha de inicio) del listado
+# de resultados. Solo se cargan las columnas que se muestran y las habilidades de toda la
+# página con una única consulta adicional.
+def _results_page(request):
     # Calcula la fecha de hace un mes para filtrar las ofertas recientes.
     one_month_ago = datetime.now().date() - timedelta(days=30)
     
@@ -58,68 +81,121 @@ def scrape_results(request):
     search_query = request.GET.get('search', '')
     
     # Filtra las ofertas de trabajo publicadas en el último mes
-    offers = JobOffer.objects.filter(publication_date__gte=one_month_ago)
-    
-    # Aplicar filtro de búsqueda si existe
-    if search_query:
-        offers = offers.filter(
-            Q(title__icontains=search_query) |
-            Q(company__icontains=search_query) |
-            Q(location__icontains=search_query) |
-            Q(skills__name__icontains=search_query)
-        ).distinct()
+    offers = JobOffer.objects.filter(publication_date__gte=one_month_ago).only(
+        'id', 'title', 'company', 'location', 'publication_date', 'url'
+    ).prefetch_related(Prefetch('skills', queryset=Skill.objects.only('id', 'name').order_by('name')))
     
-    # Ordenar por fecha de publicación
-    offers = offers.order_by('-publication_date')
+    # Aplicar filtro de búsqueda si existe (texto completo en PostgreSQL)
+    offers = search_offers(offers, search_query)
     
-    num_offers = offers.count()
+    # Página ordenada por fecha de publicación, a partir del cursor ?after=
+    page, next_cursor = keyset_page(offers, request.GET.get('after'), RESULTS_PAGE_SIZE)
+    return page, next_cursor, search_query, one_month_ago
+
+# Vista para mostrar los resultados del scraping.
+# Muestra las ofertas de trabajo extraídas en los últimos 30 días, por páginas.
+def scrape_results(request):
+    offers, next_cursor, search_query, one_month_ago = _results_page(request)
+
+    # Total de ofertas (cacheado hasta que se guarden nuevas ofertas)
+    search_key = hashlib.md5(search_query.encode('utf-8')).hexdigest()
+    num_offers = cached_block(
+        f'results_count:{search_key}', one_month_ago,
+        lambda: search_offers(JobOffer.objects.filter(publication_date__gte=one_month_ago), search_query).count()
+    )
     context = {
         'offers': offers,
         'num_offers': num_offers,
         'search_query': search_query,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('after'),
     }
     # Renderiza la plantilla con los resultados del scraping.
     return render(request, 'data_integration/scrape_results.html', context)
 
-# Vista para el panel de control.
-# Muestra gráficos de las ofertas de trabajo por fuente en los últimos 30 días.
-def dashboard_view(request):
-    # Calcula la fecha de hace un mes para filtrar las ofertas recientes.
-    one_month_ago = datetime.now().date() - timedelta(days=30)
-    
+# API JSON del listado de resultados para el scroll infinito.
+# Admite los mismos parámetros (?search=, ?after=) y devuelve la página y el cursor siguiente.
+def scrape_results_api(request):
+    offers, next_cursor, _, _ = _results_page(request)
+    return JsonResponse({
+        'results': [
+            {
+                'id': offer.id,
+                'title': offer.title,
+                'company': offer.company,
+                'location': offer.location,
+                'publication_date': offer.publication_date.isoformat(),
+                'url': offer.url,
+                'skills': [skill.name for skill in offer.skills.all()],
+            }
+            for offer in offers
+        ],
+        'next': next_cursor,
+    })
+
+# Roles que pueden exportar ofertas (además del personal de administración, `is_staff`).
+EXPORT_ROLES = ('admin', 'manager')
+
+# Vista de exportación de ofertas en CSV, JSON Lines o Parquet.
+# Admite los filtros ?source=, ?since=AAAA-MM-DD y ?search= y envía el fichero por bloques
+# (StreamingHttpResponse), sin cargar todas las ofertas en memoria. Una exportación completa
+# recorre toda la tabla, así que solo está disponible para administradores y gestores.
+@login_required
+def export_offers_view(request, export_format):
+    if not (request.user.is_staff or request.user.role in EXPORT_ROLES):
+        return HttpResponseForbidden("No tienes permiso para exportar ofertas.")
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f"Formato no soportado. Usa: {', '.join(EXPORT_FORMATS)}.")
+    since = request.GET.get('since', '')
+    try:
+        since_date = parse_date(since)
+    except ValueError:
+        since_date = None
+    if since and not since_date:
+        return HttpResponseBadRequest("El parámetro 'since' debe ser una fecha válida con el formato AAAA-MM-DD.")
+
+    offers = offers_for_export(
+        source=request.GET.get('source'),
+        since=since_date,
+        search=request.GET.get('search', ''),
+    )
+    _, content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(export_offers(offers, export_format), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="ofertas.{extension}"'
+    return response
+
+# Calcula los datos de los gráficos del panel de control (listas y cadenas JSON cacheables).
+def _dashboard_blocks(one_month_ago):
     # Datos para gráficos de fuentes
-    sources_count = JobOffer.objects.filter(publication_date__gte=one_month_ago).values('source').annotate(count=Count('id')).order_by('-count')
+    sources_count = list(JobOffer.objects.filter(publication_date__gte=one_month_ago).values('source').annotate(count=Count('id')).order_by('-count'))
     sources_labels = json.dumps([source['source'] for source in sources_count])
     sources_data = json.dumps([source['count'] for source in sources_count])
     
-    # Datos para gráfico de habilidades más demandadas
-    skills_data = JobOffer.objects.filter(
-        publication_date__gte=one_month_ago,
-        skills__isnull=False
-    ).values('skills__name').annotate(count=Count('id')).order_by('-count')[:10]
+    # Datos para gráfico de habilidades más demandadas (desde los agregados diarios de MarketData)
+    skills_data = MarketData.objects.filter(
+        date__gte=one_month_ago
+    ).values('skill__name').annotate(count=Sum('demand_count')).order_by('-count')[:10]
     
-    skills_labels = json.dumps([skill['skills__name'] for skill in skills_data])
+    skills_labels = json.dumps([skill['skill__name'] for skill in skills_data])
     skills_data = json.dumps([skill['count'] for skill in skills_data])
     
     # Datos para gráfico de habilidades futuras (últimos 7 días)
-    seven_days_ago = datetime.now().date() - timedelta(days=7)
-    future_skills_data = JobOffer.objects.filter(
-        publication_date__gte=seven_days_ago,
-        skills__isnull=False
-    ).values('skills__name').annotate(count=Count('id')).order_by('-count')[:5]
+    seven_days_ago = one_month_ago + timedelta(days=23)  # hace 7 días
+    future_skills_data = MarketData.objects.filter(
+        date__gte=seven_days_ago
+    ).values('skill__name').annotate(count=Sum('demand_count')).order_by('-count')[:5]
     
-    future_skills_labels = json.dumps([skill['skills__name'] for skill in future_skills_data])
+    future_skills_labels = json.dumps([skill['skill__name'] for skill in future_skills_data])
     future_skills_data = json.dumps([skill['count'] for skill in future_skills_data])
     
     # Datos para comparación entre plataformas
     platform_comparison = {}
     for source in ['LinkedIn', 'Tecnoempleo']:
-        skills = JobOffer.objects.filter(
-            publication_date__gte=one_month_ago,
-            source=source,
-            skills__isnull=False
-        ).values('skills__name').annotate(count=Count('id')).order_by('-count')[:5]
-        platform_comparison[source] = [{'name': s['skills__name'], 'count': s['count']} for s in skills]
+        skills = MarketData.objects.filter(
+            date__gte=one_month_ago,
+            source=source
+        ).values('skill__name').annotate(count=Sum('demand_count')).order_by('-count')[:5]
+        platform_comparison[source] = [{'name': s['skill__name'], 'count': s['count']} for s in skills]
     
     # Preparar datos para el gráfico de comparación
     all_skills = set()
@@ -143,7 +219,7 @@ def dashboard_view(request):
             'fill': False
         })
     
-    context = {
+    return {
         'sources_count': sources_count,
         'sources_labels': sources_labels,
         'sources_data': sources_data,
@@ -154,4 +230,31 @@ def dashboard_view(request):
         'platform_comparison': platform_comparison,
         'comparison_data': json.dumps(comparison_data),
     }
-    return render(request, 'data_integration/dashboard.html', context)
\ No newline at end of file
+
+# Vista para el panel de control.
+# Muestra gráficos de las ofertas de trabajo por fuente en los últimos 30 días.
+def dashboard_view(request):
+    # Calcula la fecha de hace un mes para filtrar las ofertas recientes.
+    one_month_ago = datetime.now().date() - timedelta(days=30)
+    
+    # Los gráficos se sirven desde la caché hasta que se guarden nuevas ofertas
+    context = cached_block('data_integration', one_month_ago, lambda: _dashboard_blocks(one_month_ago))
+    return render(request, 'data_integration/dashboard.html', context)
+
+
+# Métricas de los scrapers en formato de texto de Prometheus (data_integration/metrics.py).
+# Responde a peticiones con el token de METRICS_TOKEN (el servidor de Prometheus, con
+# `authorization: {credentials: ...}`), al personal con sesión (`is_staff`) y a las IPs de
+# METRICS_ALLOWED_IPS. Localhost no se permite implícitamente: detrás de un proxy inverso
+# todas las peticiones llegan desde 127.0.0.1.
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    allowed = (
+        (token and hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()))
+        or request.user.is_staff
+        or request.META.get('REMOTE_ADDR') in getattr(settings, 'METRICS_ALLOWED_IPS', [])
+    )
+    if not allowed:
+        return HttpResponseForbidden("No tienes permiso para leer las métricas.")
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
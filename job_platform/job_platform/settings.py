@@ -147,6 +147,71 @@ AUTH_USER_MODEL = 'users.CustomUser'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caché (bloques calculados de los dashboards). El backend de ficheros lo comparten
+# el servidor web y el worker de scraping, que la invalida al guardar nuevas ofertas.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / '.django_cache')),
+    }
+}
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 3600))  # Segundos
+
+# Worker de trabajos de scraping (`python manage.py run_scrape_worker`)
+SCRAPE_WORKER_CONCURRENCY = int(os.getenv('SCRAPE_WORKER_CONCURRENCY', 2))  # Scrapers simultáneos
+SCRAPE_WORKER_POLL_INTERVAL = 5  # Segundos entre consultas a la cola
+
+# Scraper de LinkedIn: navegadores en paralelo para las páginas de detalle y presupuesto de peticiones
+LINKEDIN_DETAIL_WORKERS = int(os.getenv('LINKEDIN_DETAIL_WORKERS', 3))
+LINKEDIN_REQUESTS_PER_MINUTE = int(os.getenv('LINKEDIN_REQUESTS_PER_MINUTE', 12))
+
+# Pool de navegadores de los scrapers (data_integration/scrapers/browser_pool.py): los navegadores
+# siguen abiertos y con la sesión iniciada entre ejecuciones del worker y se reciclan tras
+# BROWSER_POOL_MAX_PAGES páginas, BROWSER_POOL_MAX_MEMORY_MB de heap o el tiempo máximo sin uso.
+# Las cookies de la sesión se guardan en BROWSER_COOKIE_DIR.
+BROWSER_POOL_ENABLED = os.getenv('BROWSER_POOL_ENABLED', 'True') == 'True'
+BROWSER_POOL_MAX_PAGES = int(os.getenv('BROWSER_POOL_MAX_PAGES', 200))
+BROWSER_POOL_MAX_MEMORY_MB = int(os.getenv('BROWSER_POOL_MAX_MEMORY_MB', 512))
+BROWSER_POOL_MAX_IDLE_SECONDS = int(os.getenv('BROWSER_POOL_MAX_IDLE_SECONDS', 1800))
+BROWSER_POOL_ACQUIRE_TIMEOUT = 600  # Segundos de espera máxima por un navegador libre
+BROWSER_COOKIE_DIR = os.getenv('BROWSER_COOKIE_DIR', str(BASE_DIR / '.browser_sessions'))
+
+# Rastreador de Tecnoempleo: combinaciones palabra clave/provincia (vacío = toda España) y páginas
+TECNOEMPLEO_KEYWORDS = os.getenv('TECNOEMPLEO_KEYWORDS', 'desarrollador').split(',')
+TECNOEMPLEO_PROVINCES = os.getenv('TECNOEMPLEO_PROVINCES', '33').split(',')
+TECNOEMPLEO_MAX_PAGES = int(os.getenv('TECNOEMPLEO_MAX_PAGES', 5))
+TECNOEMPLEO_CONCURRENCY = int(os.getenv('TECNOEMPLEO_CONCURRENCY', 8))  # Peticiones simultáneas
+
+# Rastreo incremental (data_integration/incremental.py): no se vuelven a descargar las ofertas
+# vistas hace menos de CRAWL_REFRESH_DAYS días y las páginas se piden con cabeceras condicionales
+CRAWL_INCREMENTAL = os.getenv('CRAWL_INCREMENTAL', 'True') == 'True'
+CRAWL_REFRESH_DAYS = int(os.getenv('CRAWL_REFRESH_DAYS', 7))
+
+# Acceso a /data-integration/metrics/ (Prometheus): con la cabecera "Authorization: Bearer
+# <METRICS_TOKEN>", con sesión de staff o desde las IPs de METRICS_ALLOWED_IPS. Localhost no se
+# permite por defecto: detrás de un proxy inverso todas las peticiones llegan desde 127.0.0.1.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip for ip in os.getenv('METRICS_ALLOWED_IPS', '').split(',') if ip]
+
+# Ofertas duplicadas entre fuentes (market_analysis/dedup.py): similitud mínima de los títulos
+# y diferencia máxima en días entre las fechas de publicación
+DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'True') == 'True'
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.7))
+DEDUP_WINDOW_DAYS = int(os.getenv('DEDUP_WINDOW_DAYS', 30))
+
+# Archivo de páginas descargadas por los scrapers (data_integration/snapshots.py):
+# directorio, días que se conservan y tamaño máximo en bytes (comprimido)
+SNAPSHOTS_ENABLED = os.getenv('SNAPSHOTS_ENABLED', 'True') == 'True'
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', str(BASE_DIR / '.snapshots'))
+SNAPSHOT_MAX_AGE_DAYS = int(os.getenv('SNAPSHOT_MAX_AGE_DAYS', 30))
+SNAPSHOT_MAX_BYTES = int(os.getenv('SNAPSHOT_MAX_BYTES', 1024 ** 3))
+
+# Vocabulario de habilidades de los scrapers: segundos que se reutiliza el extractor compilado
+SKILL_VOCABULARY_TTL = 300
+
+# Recomendador de tareas: segundos que se reutiliza el índice tareas x habilidades (ai_module/recommendations.py)
+RECOMMENDER_INDEX_TTL = 300
+
 LOGIN_REDIRECT_URL = '/'  # Redirige a home tras login
 LOGOUT_REDIRECT_URL = '/'  # Redirige a home tras logout
 
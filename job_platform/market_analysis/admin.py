@@ -1,5 +1,33 @@
 from django.contrib import admin
-from .models import JobOffer, Skill
+from .models import Company, JobOffer, OfferDescription, OfferDuplicate, OfferSalary, Place, Skill, SkillAlias
 
 admin.site.register(JobOffer)
 admin.site.register(Skill)
+admin.site.register(SkillAlias)
+admin.site.register(OfferDuplicate)
+
+
+@admin.register(Company)
+class CompanyAdmin(admin.ModelAdmin):
+    list_display = ('name', 'canonical_name')
+    search_fields = ('name', 'canonical_name')
+
+
+@admin.register(Place)
+class PlaceAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'region')
+    list_filter = ('region',)
+
+
+@admin.register(OfferSalary)
+class OfferSalaryAdmin(admin.ModelAdmin):
+    list_display = ('offer', 'salary_min', 'salary_max', 'currency', 'period', 'annual_mid')
+    list_filter = ('currency', 'period')
+
+
+# Las descripciones se guardan comprimidas: el admin muestra el texto, de solo lectura.
+@admin.register(OfferDescription)
+class OfferDescriptionAdmin(admin.ModelAdmin):
+    list_display = ('offer', 'length', 'codec')
+    fields = ('offer', 'length', 'codec', 'content_hash', 'text')
+    readonly_fields = fields
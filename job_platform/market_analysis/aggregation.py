@@ -0,0 +1,83 @@
+# market_analysis/aggregation.py
+# Este módulo mantiene la tabla agregada `MarketData`: número de ofertas por día
+# (fecha de publicación), habilidad y fuente, con y sin las ofertas duplicadas de otras
+# fuentes (`unique_count`, ver market_analysis/dedup.py).
+# Los dashboards leen de esta tabla pequeña en lugar de agrupar la unión JobOffer-Skill
+# en cada carga de página. Se actualiza de forma incremental: solo se recalculan los días
+# que han cambiado (tras cada scrape) o los últimos N días (comando `aggregate_market_data`).
+# Con la misma consulta se reescriben las series por región de `SkillDemandRollup` de esos
+# días, y después las semanas y meses que los contienen (market_analysis/rollups.py).
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .dashboard_cache import invalidate_dashboard_cache_on_commit
+from .models import JobOffer, MarketData, SkillDemandRollup
+from .rollups import DAY, refresh_period_rollups
+
+logger = logging.getLogger(__name__)
+
+# Días que se recalculan en cada consulta agrupada.
+DATES_PER_CHUNK = 31
+
+
+# Recalcula `MarketData` para las fechas indicadas y devuelve el número de filas escritas.
+# Es idempotente: borra los agregados de esos días y los vuelve a insertar en una transacción.
+def refresh_market_data(dates):
+    dates = sorted(set(dates))
+    written = 0
+    for i in range(0, len(dates), DATES_PER_CHUNK):
+        chunk = dates[i:i + DATES_PER_CHUNK]
+        rows = JobOffer.objects.filter(
+            publication_date__in=chunk,
+            skills__isnull=False,
+        ).values('publication_date', 'skills', 'source', 'place__region').annotate(
+            count=Count('id'),
+            unique_count=Count('id', filter=Q(duplicate__isnull=True)),
+        ).order_by()
+        # Filas por región para las series; MarketData es su suma por (día, habilidad, fuente)
+        rollups = []
+        totals = {}
+        for row in rows:
+            rollups.append(SkillDemandRollup(
+                granularity=DAY,
+                period_start=row['publication_date'],
+                skill_id=row['skills'],
+                source=row['source'],
+                region=row['place__region'] or '',
+                demand_count=row['count'],
+                unique_count=row['unique_count'],
+            ))
+            key = (row['publication_date'], row['skills'], row['source'])
+            counts = totals.setdefault(key, [0, 0])
+            counts[0] += row['count']
+            counts[1] += row['unique_count']
+        objects = [
+            MarketData(
+                date=day,
+                skill_id=skill_id,
+                source=source,
+                demand_count=count,
+                unique_count=unique_count,
+            )
+            for (day, skill_id, source), (count, unique_count) in totals.items()
+        ]
+        with transaction.atomic():
+            MarketData.objects.filter(date__in=chunk).delete()
+            MarketData.objects.bulk_create(objects, batch_size=1000)
+            SkillDemandRollup.objects.filter(granularity=DAY, period_start__in=chunk).delete()
+            SkillDemandRollup.objects.bulk_create(rollups, batch_size=1000)
+        written += len(objects)
+    if dates:
+        refresh_period_rollups(dates)
+        invalidate_dashboard_cache_on_commit()
+        logger.info(f"MarketData actualizado: {len(dates)} días, {written} filas.")
+    return written
+
+
+# Recalcula todos los días entre `start` y `end` (ambos incluidos).
+def refresh_market_data_range(start, end):
+    days = (end - start).days
+    return refresh_market_data(start + timedelta(days=offset) for offset in range(days + 1))
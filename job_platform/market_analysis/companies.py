@@ -0,0 +1,75 @@
+# market_analysis/companies.py
+# Empresas de las ofertas. `JobOffer.company` es el nombre tal como lo publica la fuente
+# ("Acme S.L.", "ACME SL", "Acme, s. l."...); `canonical_company_name` lo reduce a un nombre
+# canónico (sin acentos, mayúsculas, puntuación ni forma jurídica) y cada nombre canónico es
+# una fila de `Company`. Las ofertas se enlazan con su empresa (`JobOffer.employer`), así que
+# los dashboards agrupan por un entero y cuentan juntas las variantes del mismo nombre.
+#
+# Los scrapers repiten las mismas empresas en cada lote: el nombre canónico de cada texto se
+# cachea en el proceso (LRU) y los ids se obtienen con dos consultas por lote
+# (`resolve_companies`).
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import groupby
+
+from .models import Company
+
+# Formas jurídicas que se quitan del final del nombre ("s l u" se une antes en "slu").
+LEGAL_FORMS = {
+    'sl', 'slu', 'sll', 'slne', 'sa', 'sau', 'scoop', 'sccl', 'cb', 'sc', 'srl', 'sas', 'sarl', 'spa',
+    'inc', 'ltd', 'llc', 'llp', 'lp', 'plc', 'gmbh', 'ag', 'bv', 'nv', 'corp', 'corporation', 'limited', 'co',
+}
+LEGAL_FORM_PHRASES = ['sociedad limitada', 'sociedad anonima', 'sociedad cooperativa']
+# Nombres que publican las fuentes cuando la empresa no se conoce; no tienen fila en `Company`.
+UNKNOWN_COMPANIES = {'', 'desconocida', 'confidencial', 'empresa confidencial'}
+
+COMPANY_CACHE_SIZE = 50000
+
+
+# Nombre canónico de una empresa ("" si es desconocida):
+#   "Acme S.L." / "ACME SL" / "Acme, s. l." -> "acme"; "Telefónica, S.A.U." -> "telefonica";
+#   "AT&T" / "AT & T" -> "at&t"; "A. B. C." / "A B C" -> "abc".
+@lru_cache(maxsize=COMPANY_CACHE_SIZE)
+def canonical_company_name(name):
+    text = unicodedata.normalize('NFKD', name or "").encode('ascii', 'ignore').decode('ascii').lower()
+    # "&" forma parte de la palabra, con o sin espacios alrededor
+    text = re.sub(r' ?& ?', '&', re.sub(r'[^a-z0-9&]+', ' ', text.replace('.', '')))
+    # Cada serie de letras sueltas ("s a u" de "S. A. U.", "a b c") forma una sola sigla
+    words = []
+    for single, group in groupby(text.split(), key=lambda word: len(word) == 1 and word.isalpha()):
+        words += ["".join(group)] if single else list(group)
+    name = " ".join(words)
+    # Se quitan las formas jurídicas del final, sin dejar el nombre vacío
+    changed = True
+    while changed:
+        changed = False
+        for phrase in LEGAL_FORM_PHRASES:
+            if name.endswith(f" {phrase}"):
+                name = name[:-len(phrase) - 1]
+                changed = True
+        words = name.split()
+        if len(words) > 1 and words[-1] in LEGAL_FORMS:
+            name = " ".join(words[:-1])
+            changed = True
+    return "" if name in UNKNOWN_COMPANIES else name[:255]
+
+
+# Crea las empresas que falten y devuelve un diccionario nombre publicado -> id de `Company`
+# (las empresas desconocidas no aparecen). Dos consultas como máximo: un `bulk_create` que
+# ignora las que ya existen y la lectura de los ids. Una empresa nueva se guarda con el
+# primer nombre publicado con el que aparece.
+def resolve_companies(names):
+    canonical = {name: canonical_company_name(name) for name in dict.fromkeys(names)}
+    display_names = {}
+    for name, key in canonical.items():
+        if key:
+            display_names.setdefault(key, name[:255])
+    if not display_names:
+        return {}
+    Company.objects.bulk_create(
+        [Company(name=name, canonical_name=key) for key, name in display_names.items()],
+        ignore_conflicts=True,
+    )
+    ids = dict(Company.objects.filter(canonical_name__in=list(display_names)).values_list('canonical_name', 'id'))
+    return {name: ids[key] for name, key in canonical.items() if key in ids}
@@ -0,0 +1,42 @@
+# market_analysis/compression.py
+# Compresión de los textos largos de las ofertas (descripciones) y de las capturas de
+# páginas de los scrapers antes de guardarlos.
+# Se usa zstandard (requirements.txt); si no está instalado se recurre a zlib de la
+# biblioteca estándar. El códec se guarda junto a los datos para poder leerlos siempre.
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+ZSTD = 'zstd'
+ZLIB = 'zlib'
+ZSTD_LEVEL = 9
+ZLIB_LEVEL = 9
+
+
+# Devuelve (códec, bytes comprimidos).
+def compress_bytes(data):
+    if zstandard is not None:
+        return ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return ZLIB, zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress_bytes(codec, data):
+    data = bytes(data)
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Hace falta el paquete zstandard para leer datos comprimidos con zstd.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == ZLIB:
+        return zlib.decompress(data)
+    raise ValueError(f"Códec de compresión desconocido: {codec}")
+
+
+def compress_text(text):
+    return compress_bytes(text.encode('utf-8'))
+
+
+def decompress_text(codec, data):
+    return decompress_bytes(codec, data).decode('utf-8')
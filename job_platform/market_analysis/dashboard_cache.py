@@ -0,0 +1,51 @@
+# market_analysis/dashboard_cache.py
+# Caché de los bloques calculados de los dashboards (gráficos, rankings, totales).
+# Los datos solo cambian cuando se guarda un scrape, así que cada bloque se guarda en la
+# caché de Django con una clave por ventana de fechas y una "versión de datos".
+# Al confirmarse cambios en JobOffer o MarketData se cambia la versión y todas las
+# entradas anteriores dejan de usarse (caducan solas con el timeout de la caché).
+#
+# La versión se guarda en la propia caché: con el backend de ficheros (el de por defecto
+# en settings) la comparten el servidor web y el worker de scraping.
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = 'market_analysis:dashboard:data_version'
+
+
+# Devuelve la versión actual de los datos; si no existe (caché vacía) la crea.
+# Se usa una marca de tiempo en lugar de un contador para que una versión perdida
+# nunca vuelva a coincidir con entradas antiguas.
+def get_data_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+# Cambia la versión de los datos: los bloques cacheados hasta ahora dejan de servirse.
+def invalidate_dashboard_cache():
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+# Invalida la caché cuando se confirme la transacción en curso (o al momento si no hay ninguna).
+def invalidate_dashboard_cache_on_commit():
+    transaction.on_commit(invalidate_dashboard_cache)
+
+
+# Devuelve el bloque `name` para la ventana que empieza en `window_start`, calculándolo
+# con `compute()` solo si no está en caché para la versión actual de los datos.
+# `compute` debe devolver datos serializables (listas, diccionarios, números, cadenas).
+def cached_block(name, window_start, compute):
+    key = f"market_analysis:dashboard:{name}:{window_start.isoformat()}"
+    version = get_data_version()
+    value = cache.get(key, version=version)
+    if value is None:
+        value = compute()
+        cache.set(key, value, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 3600), version=version)
+    return value
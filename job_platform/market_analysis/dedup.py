@@ -0,0 +1,229 @@
+# market_analysis/dedup.py
+# Detección de ofertas duplicadas entre fuentes: la misma vacante publicada en LinkedIn y en
+# Tecnoempleo se guarda dos veces (la fuente forma parte de la clave única). Cada oferta
+# duplicada se enlaza con su oferta canónica (`OfferDuplicate`); las canónicas no tienen
+# enlace, así que filtrar por `duplicate__isnull=True` cuenta cada vacante una sola vez.
+#
+# Para no comparar todas las parejas de ofertas:
+#   1. Cada oferta se convierte en un conjunto de "shingles": trigramas de caracteres del título
+#      normalizado y la ciudad.
+#   2. Se calcula su firma MinHash (NUM_PERM funciones hash, numpy): la probabilidad de que dos
+#      firmas coincidan en una posición es la similitud de Jaccard de sus conjuntos.
+#   3. LSH por bandas: la firma se divide en BANDS bandas de ROWS valores y dos ofertas son
+#      candidatas si coinciden en alguna banda completa (umbral aproximado (1/BANDS)^(1/ROWS)).
+#      La empresa normalizada (market_analysis/companies.py) forma parte de la clave de cada banda: solo
+#      se comparan ofertas de la misma empresa, y los títulos genéricos ("Desarrollador Java")
+#      no generan parejas entre empresas distintas.
+#   4. Las candidatas se comprueban con los conjuntos exactos: fuentes distintas, publicadas con
+#      menos de DEDUP_WINDOW_DAYS días de diferencia, misma empresa y títulos con una similitud
+#      de al menos DEDUP_THRESHOLD.
+#   5. Los grupos (union-find) toman como canónica la oferta más antigua (menor id).
+import logging
+import re
+import unicodedata
+import zlib
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .companies import canonical_company_name
+from .models import JobOffer, OfferDuplicate
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+# Ofertas que se firman a la vez (la matriz intermedia es NUM_PERM x shingles del bloque)
+SIGNATURE_CHUNK = 2000
+# Un cubo LSH con más ofertas que esto es un título genérico: se ignora para no generar
+# un número cuadrático de parejas candidatas
+MAX_BUCKET_SIZE = 500
+SEED = 20250412
+
+UNKNOWN_VALUES = {'', 'desconocida', 'ubicacion no especificada'}
+
+
+def _normalize(text):
+    text = unicodedata.normalize('NFKD', text or "").encode('ascii', 'ignore').decode('ascii').lower()
+    return " ".join(re.sub(r'[^a-z0-9+#]+', ' ', text).split())
+
+
+# Primer tramo de la ubicación ("Madrid, Comunidad de Madrid, Espana" -> "madrid", "Barcelona (Hibrido)" -> "barcelona").
+def normalize_city(location):
+    city = _normalize(re.split(r'[,(/-]', location or "", maxsplit=1)[0])
+    return "" if city in UNKNOWN_VALUES else city
+
+
+def title_shingles(title, k=3):
+    text = f" {_normalize(title)} "
+    return {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+
+
+# Conjunto de shingles de una oferta; el prefijo evita que se mezclen los campos.
+def offer_shingles(title, location):
+    shingles = {f"t:{shingle}" for shingle in title_shingles(title)}
+    city = normalize_city(location)
+    if city:
+        shingles.add(f"l:{city}")
+    return shingles
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+# Firmas MinHash (matriz ofertas x NUM_PERM, uint64) de una lista de conjuntos de shingles.
+# Los shingles se resumen con crc32 y cada permutación es un hash multiply-shift
+# ((a * x + b) mod 2^64) >> 32, que numpy calcula con desbordamiento.
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, seed=SEED):
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for start in range(0, len(shingle_sets), SIGNATURE_CHUNK):
+        chunk = [shingles or {""} for shingles in shingle_sets[start:start + SIGNATURE_CHUNK]]
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingles in chunk for shingle in shingles),
+            dtype=np.uint64,
+        )
+        offsets = np.cumsum([0] + [len(shingles) for shingles in chunk[:-1]])
+        with np.errstate(over='ignore'):
+            permuted = (a[:, None] * hashes[None, :] + b[:, None]) >> np.uint64(32)
+        signatures[start:start + len(chunk)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+    return signatures
+
+
+# Parejas (i, j) de índices de filas cuyas firmas coinciden en alguna banda.
+# `blocks` (un entero por fila, opcional) se añade a la clave: filas de bloques distintos
+# nunca son candidatas.
+def lsh_candidates(signatures, blocks=None, bands=BANDS, rows=ROWS, max_bucket_size=MAX_BUCKET_SIZE):
+    rng = np.random.default_rng(SEED + 1)
+    if blocks is None:
+        blocks = np.zeros(len(signatures), dtype=np.uint64)
+    pairs = set()
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows]
+        # Cada banda se resume en un entero; una colisión solo añade una candidata de más
+        multipliers = rng.integers(1, 2 ** 63, size=rows + 1, dtype=np.uint64) | np.uint64(1)
+        with np.errstate(over='ignore'):
+            keys = (block * multipliers[:-1]).sum(axis=1, dtype=np.uint64) + blocks * multipliers[-1]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for bucket in np.split(order, boundaries):
+            if len(bucket) < 2:
+                continue
+            if len(bucket) > max_bucket_size:
+                logger.debug(f"Cubo LSH de {len(bucket)} ofertas ignorado (banda {band}).")
+                continue
+            members = sorted(bucket.tolist())
+            for x, i in enumerate(members):
+                for j in members[x + 1:]:
+                    pairs.add((i, j))
+    return pairs
+
+
+def _find(parents, i):
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+# Calcula la oferta canónica de cada oferta.
+# `offers` es una lista de tuplas (id, title, company, location, source, publication_date).
+# Devuelve un diccionario id -> id de la canónica (None si la oferta es canónica).
+def find_duplicates(offers, threshold=None, window_days=None):
+    threshold = threshold if threshold is not None else getattr(settings, 'DEDUP_THRESHOLD', 0.7)
+    window_days = window_days if window_days is not None else getattr(settings, 'DEDUP_WINDOW_DAYS', 30)
+    window = timedelta(days=window_days)
+    if not offers:
+        return {}
+
+    companies = [canonical_company_name(company) for _, _, company, _, _, _ in offers]
+    # Las ofertas sin empresa conocida no se pueden emparejar: no se firman
+    known = [i for i, company in enumerate(companies) if company]
+    titles = {i: title_shingles(offers[i][1]) for i in known}
+    cities = {i: normalize_city(offers[i][3]) for i in known}
+    signatures = minhash_signatures([offer_shingles(offers[i][1], offers[i][3]) for i in known])
+    blocks = np.fromiter((zlib.crc32(companies[i].encode('utf-8')) for i in known), dtype=np.uint64, count=len(known))
+
+    parents = list(range(len(offers)))
+    matches = 0
+    for x, y in lsh_candidates(signatures, blocks):
+        i, j = known[x], known[y]
+        if offers[i][4] == offers[j][4] or abs(offers[i][5] - offers[j][5]) > window:
+            continue
+        if companies[i] != companies[j]:
+            continue
+        if cities[i] and cities[j] and cities[i] != cities[j]:
+            continue
+        if jaccard(titles[i], titles[j]) < threshold:
+            continue
+        matches += 1
+        root_i, root_j = _find(parents, i), _find(parents, j)
+        if root_i != root_j:
+            parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    # La raíz de cada grupo es el menor índice; se elige como canónica la de menor id
+    groups = {}
+    for i in range(len(offers)):
+        groups.setdefault(_find(parents, i), []).append(offers[i][0])
+    canonical = {}
+    for ids in groups.values():
+        first = min(ids)
+        for offer_id in ids:
+            canonical[offer_id] = None if offer_id == first else first
+    logger.info(f"Deduplicación: {len(offers)} ofertas, {matches} parejas duplicadas, "
+                f"{sum(1 for value in canonical.values() if value)} duplicadas.")
+    return canonical
+
+
+# Recalcula los enlaces a la oferta canónica de las ofertas publicadas entre `date_from` y
+# `date_to` (None = sin límite). Se cargan también las ofertas de DEDUP_WINDOW_DAYS días
+# antes y después para encontrar sus duplicadas, pero solo se modifican las del periodo.
+# Devuelve un diccionario con el número de ofertas revisadas, duplicadas y modificadas y las
+# fechas de publicación de las modificadas (para recalcular MarketData).
+def deduplicate_offers(date_from=None, date_to=None, threshold=None, window_days=None, dry_run=False):
+    window_days = window_days if window_days is not None else getattr(settings, 'DEDUP_WINDOW_DAYS', 30)
+    offers = JobOffer.objects.all()
+    if date_from:
+        offers = offers.filter(publication_date__gte=date_from - timedelta(days=window_days))
+    if date_to:
+        offers = offers.filter(publication_date__lte=date_to + timedelta(days=window_days))
+    rows = list(offers.order_by('id').values_list(
+        'id', 'title', 'company', 'location', 'source', 'publication_date', 'duplicate__canonical_id'
+    ).iterator(chunk_size=5000))
+    canonical = find_duplicates([row[:6] for row in rows], threshold=threshold, window_days=window_days)
+
+    changed = []
+    dates = set()
+    checked = duplicates = 0
+    for offer_id, _, _, _, _, publication_date, current in rows:
+        if (date_from and publication_date < date_from) or (date_to and publication_date > date_to):
+            continue
+        checked += 1
+        duplicates += canonical[offer_id] is not None
+        if canonical[offer_id] == current:
+            continue
+        changed.append(offer_id)
+        dates.add(publication_date)
+    if changed and not dry_run:
+        with transaction.atomic():
+            OfferDuplicate.objects.filter(offer_id__in=changed).delete()
+            OfferDuplicate.objects.bulk_create([
+                OfferDuplicate(offer_id=offer_id, canonical_id=canonical[offer_id])
+                for offer_id in changed
+                if canonical[offer_id] is not None
+            ], batch_size=1000)
+    return {
+        'offers': checked,
+        'duplicates': duplicates,
+        'changed': len(changed),
+        'dates': dates,
+    }
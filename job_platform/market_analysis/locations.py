@@ -0,0 +1,154 @@
+# market_analysis/locations.py
+# Normalización de las ubicaciones de las ofertas. `JobOffer.location` es el texto tal como lo
+# publica la fuente ("Madrid y otras", "Barcelona (Híbrido)", "Gijón, Principado de Asturias,
+# España", "Greater Madrid Metropolitan Area"...); `resolve_location` lo convierte en una
+# provincia o comunidad autónoma (`Place`) y una modalidad de trabajo (presencial, híbrido o
+# remoto), que se guardan en `JobOffer.place` y `JobOffer.work_mode` para agrupar por región
+# en SQL con un índice en lugar de buscar subcadenas.
+#
+# Los ids de `Place` son los códigos del INE: el de la provincia (1-52) o 100 + el de la
+# comunidad autónoma para las ubicaciones que solo indican la comunidad ("Cataluña, España").
+# Así la resolución no necesita la base de datos: el diccionario de búsqueda (nombres,
+# variantes y ciudades principales -> id) se construye una vez por proceso a partir de las
+# tablas de este módulo, y los resultados de cada texto se cachean porque se repiten mucho.
+import re
+import unicodedata
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+# Comunidades autónomas por código del INE.
+REGIONS = {
+    1: "Andalucía",
+    2: "Aragón",
+    3: "Principado de Asturias",
+    4: "Illes Balears",
+    5: "Canarias",
+    6: "Cantabria",
+    7: "Castilla y León",
+    8: "Castilla-La Mancha",
+    9: "Cataluña",
+    10: "Comunitat Valenciana",
+    11: "Extremadura",
+    12: "Galicia",
+    13: "Comunidad de Madrid",
+    14: "Región de Murcia",
+    15: "Comunidad Foral de Navarra",
+    16: "País Vasco",
+    17: "La Rioja",
+    18: "Ceuta",
+    19: "Melilla",
+}
+
+# Provincias por código del INE: (nombre, código de la comunidad autónoma).
+PROVINCES = {
+    1: ("Araba/Álava", 16), 2: ("Albacete", 8), 3: ("Alicante/Alacant", 10), 4: ("Almería", 1),
+    5: ("Ávila", 7), 6: ("Badajoz", 11), 7: ("Illes Balears", 4), 8: ("Barcelona", 9),
+    9: ("Burgos", 7), 10: ("Cáceres", 11), 11: ("Cádiz", 1), 12: ("Castellón/Castelló", 10),
+    13: ("Ciudad Real", 8), 14: ("Córdoba", 1), 15: ("A Coruña", 12), 16: ("Cuenca", 8),
+    17: ("Girona", 9), 18: ("Granada", 1), 19: ("Guadalajara", 8), 20: ("Gipuzkoa", 16),
+    21: ("Huelva", 1), 22: ("Huesca", 2), 23: ("Jaén", 1), 24: ("León", 7),
+    25: ("Lleida", 9), 26: ("La Rioja", 17), 27: ("Lugo", 12), 28: ("Madrid", 13),
+    29: ("Málaga", 1), 30: ("Murcia", 14), 31: ("Navarra", 15), 32: ("Ourense", 12),
+    33: ("Asturias", 3), 34: ("Palencia", 7), 35: ("Las Palmas", 5), 36: ("Pontevedra", 12),
+    37: ("Salamanca", 7), 38: ("Santa Cruz de Tenerife", 5), 39: ("Cantabria", 6), 40: ("Segovia", 7),
+    41: ("Sevilla", 1), 42: ("Soria", 7), 43: ("Tarragona", 9), 44: ("Teruel", 2),
+    45: ("Toledo", 8), 46: ("Valencia/València", 10), 47: ("Valladolid", 7), 48: ("Bizkaia", 16),
+    49: ("Zamora", 7), 50: ("Zaragoza", 2), 51: ("Ceuta", 18), 52: ("Melilla", 19),
+}
+
+# Id de `Place` de las ubicaciones que solo indican la comunidad autónoma.
+REGION_PLACE_OFFSET = 100
+
+# Otros nombres de provincias y comunidades y ciudades principales -> id de `Place`.
+# Los nombres oficiales (y cada variante separada por "/") se añaden automáticamente.
+ALIASES = {
+    # Variantes y nombres en inglés
+    'alava': 1, 'vitoria': 1, 'vitoria gasteiz': 1, 'alicante': 3, 'elche': 3, 'benidorm': 3,
+    'baleares': 7, 'islas baleares': 7, 'balearic islands': 7, 'mallorca': 7, 'palma': 7,
+    'palma de mallorca': 7, 'ibiza': 7, 'menorca': 7, 'castellon de la plana': 12,
+    'la coruna': 15, 'coruna': 15, 'santiago de compostela': 15, 'ferrol': 15,
+    'gerona': 17, 'guipuzcoa': 20, 'san sebastian': 20, 'donostia': 20, 'lerida': 25,
+    'logrono': 26, 'orense': 32, 'navarre': 31, 'pamplona': 31, 'iruna': 31,
+    'gijon': 33, 'oviedo': 33, 'aviles': 33, 'las palmas de gran canaria': 35, 'gran canaria': 35,
+    'lanzarote': 35, 'fuerteventura': 35, 'vigo': 36, 'tenerife': 38, 'santander': 39,
+    'seville': 41, 'dos hermanas': 41, 'vizcaya': 48, 'biscay': 48, 'bilbao': 48, 'barakaldo': 48,
+    'getxo': 48, 'saragossa': 50, 'jerez de la frontera': 11, 'algeciras': 11, 'marbella': 29,
+    'cartagena': 30, 'ponferrada': 24, 'reus': 43, 'talavera de la reina': 45,
+    # Área metropolitana de Madrid
+    'alcobendas': 28, 'las rozas': 28, 'las rozas de madrid': 28, 'pozuelo de alarcon': 28,
+    'tres cantos': 28, 'getafe': 28, 'leganes': 28, 'alcorcon': 28, 'mostoles': 28,
+    'fuenlabrada': 28, 'alcala de henares': 28, 'torrejon de ardoz': 28, 'majadahonda': 28,
+    'boadilla del monte': 28, 'san sebastian de los reyes': 28,
+    # Área metropolitana de Barcelona
+    'hospitalet de llobregat': 8, 'l hospitalet de llobregat': 8, 'badalona': 8, 'terrassa': 8,
+    'sabadell': 8, 'sant cugat del valles': 8, 'mataro': 8, 'cornella de llobregat': 8,
+    'el prat de llobregat': 8, 'granollers': 8,
+    # Comunidades con una sola provincia
+    'asturias': 33, 'principality of asturias': 33, 'comunidad de madrid': 28, 'community of madrid': 28,
+    'region de murcia': 30, 'region of murcia': 30, 'comunidad foral de navarra': 31,
+    # Comunidades con varias provincias
+    'andalusia': 101, 'aragon': 102, 'canary islands': 105, 'islas canarias': 105,
+    'castilla y leon': 107, 'castile and leon': 107, 'castilla la mancha': 108, 'castile la mancha': 108,
+    'cataluna': 109, 'catalunya': 109, 'catalonia': 109, 'comunidad valenciana': 110,
+    'valencian community': 110, 'basque country': 116, 'euskadi': 116,
+}
+
+# Modalidad de trabajo; se comprueba en este orden ("híbrido, 2 días en remoto" es híbrido).
+WORK_MODE_ONSITE = 'onsite'
+WORK_MODE_HYBRID = 'hybrid'
+WORK_MODE_REMOTE = 'remote'
+WORK_MODES = [
+    (WORK_MODE_HYBRID, re.compile(r'\b(?:hibrido|hibrida|hybrid|semipresencial|mixto)\b')),
+    (WORK_MODE_REMOTE, re.compile(r'\b(?:remoto|remota|remote|teletrabajo|en casa|from home)\b')),
+    (WORK_MODE_ONSITE, re.compile(r'\b(?:presencial|on site|onsite|in office)\b')),
+]
+
+ResolvedLocation = namedtuple('ResolvedLocation', ['place_id', 'work_mode'])
+
+
+def normalize_text(text):
+    text = unicodedata.normalize('NFKD', text or "").encode('ascii', 'ignore').decode('ascii').lower()
+    return " ".join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+# Filas de la tabla `Place`: (id, nombre, comunidad autónoma). Las comunidades con una sola
+# provincia no tienen fila propia: su nombre se resuelve a la provincia.
+def place_rows():
+    provinces_per_region = Counter(region for _, region in PROVINCES.values())
+    rows = [(code, name, REGIONS[region]) for code, (name, region) in PROVINCES.items()]
+    rows += [
+        (REGION_PLACE_OFFSET + code, name, name)
+        for code, name in REGIONS.items()
+        if provinces_per_region[code] > 1
+    ]
+    return rows
+
+
+# Diccionario de búsqueda texto normalizado -> id de `Place` y número máximo de palabras de
+# sus claves. Se construye una sola vez por proceso.
+@lru_cache(maxsize=1)
+def _lookup():
+    lookup = {}
+    for place_id, name, _ in place_rows():
+        for variant in name.split('/'):
+            lookup[normalize_text(variant)] = place_id
+    lookup.update({normalize_text(alias): place_id for alias, place_id in ALIASES.items()})
+    return lookup, max(len(key.split()) for key in lookup)
+
+
+# Convierte el texto de una ubicación en (id de Place o None, modalidad de trabajo o "").
+# Recorre las palabras de izquierda a derecha y se queda con la primera coincidencia, la más
+# larga en cada posición: "Comunidad de Madrid" antes que "Madrid", "Castilla y León" antes
+# que "León"; en "Madrid y otras" o "Madrid, Community of Madrid, Spain" manda la primera.
+@lru_cache(maxsize=20000)
+def resolve_location(text):
+    normalized = normalize_text(text)
+    work_mode = next((mode for mode, pattern in WORK_MODES if pattern.search(normalized)), "")
+    lookup, max_words = _lookup()
+    words = normalized.split()
+    for start in range(len(words)):
+        for size in range(min(max_words, len(words) - start), 0, -1):
+            place_id = lookup.get(" ".join(words[start:start + size]))
+            if place_id is not None:
+                return ResolvedLocation(place_id, work_mode)
+    return ResolvedLocation(None, work_mode)
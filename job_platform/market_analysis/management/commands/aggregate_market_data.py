@@ -0,0 +1,41 @@
+# market_analysis/management/commands/aggregate_market_data.py
+# Rellena la tabla agregada `MarketData` (ofertas por día, habilidad y fuente) y las series por
+# día, semana y mes de `SkillDemandRollup` (market_analysis/rollups.py).
+# Los scrapers ya la actualizan al terminar; este comando sirve para la carga inicial
+# o para recalcular un periodo tras cambios manuales en las ofertas.
+#
+# Uso:
+#   python manage.py aggregate_market_data              # últimos 30 días
+#   python manage.py aggregate_market_data --days 90
+#   python manage.py aggregate_market_data --all        # todo el histórico
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from market_analysis.aggregation import refresh_market_data_range
+from market_analysis.models import JobOffer
+
+
+class Command(BaseCommand):
+    help = "Recalcula los agregados diarios de demanda de habilidades (MarketData)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Número de días hacia atrás a recalcular.")
+        parser.add_argument('--all', action='store_true', help="Recalcula todo el histórico de ofertas.")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            bounds = JobOffer.objects.aggregate(start=Min('publication_date'), end=Max('publication_date'))
+            if not bounds['start']:
+                self.stdout.write("No hay ofertas que agregar.")
+                return
+            start, end = bounds['start'], bounds['end']
+        else:
+            end = datetime.now().date()
+            start = end - timedelta(days=options['days'])
+
+        written = refresh_market_data_range(start, end)
+        self.stdout.write(self.style.SUCCESS(
+            f"MarketData recalculado del {start:%d/%m/%Y} al {end:%d/%m/%Y}: {written} filas."
+        ))
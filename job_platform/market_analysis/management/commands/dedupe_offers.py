@@ -0,0 +1,38 @@
+# market_analysis/management/commands/dedupe_offers.py
+# Enlaza las ofertas duplicadas entre fuentes con su oferta canónica (market_analysis/dedup.py)
+# y recalcula los agregados de los días afectados. Los scrapers ya lo hacen con las ofertas
+# que guardan; este comando sirve para la carga inicial o tras cambiar el umbral.
+#
+# Uso:
+#   python manage.py dedupe_offers                  # últimos 30 días
+#   python manage.py dedupe_offers --days 90
+#   python manage.py dedupe_offers --all            # todo el histórico
+#   python manage.py dedupe_offers --threshold 0.8 --dry-run
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+
+from market_analysis.aggregation import refresh_market_data
+from market_analysis.dedup import deduplicate_offers
+
+
+class Command(BaseCommand):
+    help = "Detecta las ofertas duplicadas entre fuentes y las enlaza con su oferta canónica."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Número de días hacia atrás a revisar.")
+        parser.add_argument('--all', action='store_true', help="Revisa todo el histórico de ofertas.")
+        parser.add_argument('--threshold', type=float, default=None,
+                            help="Similitud mínima de los títulos (por defecto DEDUP_THRESHOLD).")
+        parser.add_argument('--dry-run', action='store_true', help="Muestra el resultado sin guardar nada.")
+
+    def handle(self, *args, **options):
+        date_from = None if options['all'] else datetime.now().date() - timedelta(days=options['days'])
+        result = deduplicate_offers(date_from=date_from, threshold=options['threshold'], dry_run=options['dry_run'])
+        if result['dates'] and not options['dry_run']:
+            refresh_market_data(result['dates'])
+        prefix = "[simulación] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result['offers']} ofertas revisadas, {result['duplicates']} duplicadas, "
+            f"{result['changed']} enlaces modificados."
+        ))
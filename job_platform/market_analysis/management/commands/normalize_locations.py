@@ -0,0 +1,65 @@
+# market_analysis/management/commands/normalize_locations.py
+# Asigna provincia/región (`JobOffer.place`) y modalidad de trabajo (`JobOffer.work_mode`) a las
+# ofertas ya guardadas a partir de su ubicación (market_analysis/locations.py). Los scrapers ya
+# lo hacen con las ofertas que guardan; este comando sirve para la carga inicial o tras añadir
+# nombres al diccionario de ubicaciones.
+# Las ubicaciones se repiten mucho, así que se resuelve cada texto distinto una vez y se hace
+# un UPDATE por grupo de textos con el mismo resultado. Las series por región
+# (`SkillDemandRollup`) y `MarketData` de los días con ofertas que cambian de provincia se
+# recalculan en la misma transacción.
+#
+# Uso:
+#   python manage.py normalize_locations          # ofertas aún sin provincia ni modalidad
+#   python manage.py normalize_locations --all    # vuelve a procesar todas
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from market_analysis.aggregation import refresh_market_data
+from market_analysis.dashboard_cache import invalidate_dashboard_cache_on_commit
+from market_analysis.locations import place_rows, resolve_location
+from market_analysis.models import JobOffer, Place
+
+# Ubicaciones por UPDATE (`location IN (...)`)
+LOCATIONS_PER_UPDATE = 500
+
+
+class Command(BaseCommand):
+    help = "Asigna provincia, región y modalidad de trabajo a las ofertas guardadas según su ubicación."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Vuelve a procesar todas las ofertas, no solo las que no tienen provincia ni modalidad.")
+
+    def handle(self, *args, **options):
+        # Las provincias y comunidades que falten (p.ej. añadidas al diccionario tras la migración)
+        Place.objects.bulk_create(
+            [Place(id=place_id, name=name, region=region) for place_id, name, region in place_rows()],
+            ignore_conflicts=True,
+        )
+        offers = JobOffer.objects.all()
+        if not options['all']:
+            offers = offers.filter(place__isnull=True, work_mode='')
+
+        groups = {}
+        locations = offers.values_list('location', flat=True).distinct().order_by()
+        for location in locations.iterator(chunk_size=5000):
+            groups.setdefault(resolve_location(location), []).append(location)
+
+        updated = 0
+        dates = set()
+        with transaction.atomic():
+            for (place_id, work_mode), texts in groups.items():
+                for i in range(0, len(texts), LOCATIONS_PER_UPDATE):
+                    chunk = offers.filter(location__in=texts[i:i + LOCATIONS_PER_UPDATE])
+                    moved = chunk.filter(place__isnull=False) if place_id is None else chunk.exclude(place_id=place_id)
+                    dates.update(moved.values_list('publication_date', flat=True).distinct().order_by())
+                    updated += chunk.update(place_id=place_id, work_mode=work_mode)
+            dates.discard(None)
+            refresh_market_data(dates)
+            invalidate_dashboard_cache_on_commit()
+
+        resolved = sum(len(texts) for (place_id, _), texts in groups.items() if place_id is not None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} ofertas actualizadas; {resolved} de {sum(map(len, groups.values()))} ubicaciones distintas "
+            f"asignadas a una provincia o región; {len(dates)} días de agregados recalculados."
+        ))
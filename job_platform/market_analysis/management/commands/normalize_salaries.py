@@ -0,0 +1,50 @@
+# market_analysis/management/commands/normalize_salaries.py
+# Rellena `OfferSalary` (salario numérico, moneda y periodo, ver market_analysis/salary.py) a
+# partir del texto de `JobOffer.salary` de las ofertas ya guardadas. Los scrapers ya lo hacen
+# con las ofertas que guardan; este comando sirve para la carga inicial o tras cambiar el parser.
+# Recorre las ofertas por lotes ordenados por id, sin cargarlas todas en memoria.
+#
+# Uso:
+#   python manage.py normalize_salaries                 # ofertas con salario aún sin normalizar
+#   python manage.py normalize_salaries --all           # vuelve a procesar todas
+#   python manage.py normalize_salaries --batch-size 5000
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from market_analysis.dashboard_cache import invalidate_dashboard_cache_on_commit
+from market_analysis.models import JobOffer
+from market_analysis.salary import store_offer_salaries
+
+
+class Command(BaseCommand):
+    help = "Normaliza el salario de las ofertas guardadas en rangos numéricos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help="Vuelve a procesar todas las ofertas, no solo las que no están normalizadas.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Ofertas por lote.")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            # También las que ya no tienen salario pero conservan un rango antiguo
+            offers = JobOffer.objects.filter(Q(salary__gt='') | Q(salary_range__isnull=False))
+        else:
+            offers = JobOffer.objects.filter(salary__gt='', salary_range__isnull=True)
+
+        processed = saved = 0
+        last_id = 0
+        while True:
+            rows = list(offers.filter(id__gt=last_id).order_by('id').values_list('id', 'salary')[:options['batch_size']])
+            if not rows:
+                break
+            saved += store_offer_salaries(dict(rows))
+            processed += len(rows)
+            last_id = rows[-1][0]
+            self.stdout.write(f"{processed} ofertas procesadas...")
+
+        if saved:
+            invalidate_dashboard_cache_on_commit()
+        self.stdout.write(self.style.SUCCESS(
+            f"{processed} ofertas procesadas, {saved} salarios normalizados, "
+            f"{processed - saved} sin importe reconocible."
+        ))
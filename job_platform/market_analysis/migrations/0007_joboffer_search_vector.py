@@ -0,0 +1,61 @@
+# Índice de texto completo para la búsqueda de ofertas (solo PostgreSQL).
+# En otras bases de datos se añade la columna pero no el índice GIN ni el cálculo del vector.
+# El índice no forma parte del estado de los modelos: si estuviera, SQLite lo recrearía cada
+# vez que una migración posterior rehace la tabla.
+
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+
+def create_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS "joboffer_search_vector_gin" '
+            'ON "market_analysis_joboffer" USING gin ("search_vector")'
+        )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS "joboffer_search_vector_gin"')
+
+
+# Calcula el vector de las ofertas existentes (copia de `search_vector_expression` de
+# market_analysis/search.py al crear la migración).
+def fill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    JobOffer = apps.get_model('market_analysis', 'JobOffer')
+    skill_names = Subquery(
+        JobOffer.skills.through.objects.filter(joboffer_id=OuterRef('pk')).values('joboffer_id').annotate(
+            names=StringAgg('skill__name', delimiter=' ')
+        ).values('names')[:1]
+    )
+    JobOffer.objects.using(schema_editor.connection.alias).update(search_vector=(
+        SearchVector('title', config='spanish', weight='A')
+        + SearchVector('title', config='english', weight='A')
+        + SearchVector(Coalesce(skill_names, Value(''), output_field=TextField()), config='simple', weight='A')
+        + SearchVector('company', config='simple', weight='B')
+        + SearchVector('location', config='simple', weight='C')
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0006_alter_skill_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joboffer',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+    ]
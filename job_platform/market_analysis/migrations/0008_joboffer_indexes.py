@@ -0,0 +1,45 @@
+# Índices de JobOffer alineados con las consultas de los dashboards y listados:
+# fecha de publicación (con y sin fuente), orden descendente por fecha y búsqueda
+# por subcadena en la ubicación (trigramas, solo PostgreSQL).
+# El índice de trigramas no forma parte del estado de los modelos: si estuviera, SQLite
+# intentaría recrearlo cada vez que una migración posterior rehace la tabla.
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+import django.db.models.functions.text
+
+LOCATION_TRGM_INDEX = django.contrib.postgres.indexes.GinIndex(
+    django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('location'), name='gin_trgm_ops'),
+    name='joboffer_location_trgm',
+)
+
+
+def create_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('market_analysis', 'JobOffer'), LOCATION_TRGM_INDEX)
+
+
+def drop_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('market_analysis', 'JobOffer'), LOCATION_TRGM_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0007_joboffer_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['source', 'publication_date'], name='joboffer_source_pubdate_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['-publication_date'], include=('company',), name='joboffer_pubdate_desc_idx'),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(create_trgm_index, drop_trgm_index),
+    ]
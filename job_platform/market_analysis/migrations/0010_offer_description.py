@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0009_skill_vocabulary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferDescription',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='description', serialize=False, to='market_analysis.joboffer')),
+                ('codec', models.CharField(max_length=10)),
+                ('content', models.BinaryField()),
+                ('length', models.PositiveIntegerField()),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+            ],
+        ),
+    ]
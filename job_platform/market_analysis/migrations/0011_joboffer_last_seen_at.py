@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0010_offer_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='joboffer',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Aún no hay duplicados enlazados: las ofertas únicas son todas las ofertas.
+def copy_demand_count(apps, schema_editor):
+    MarketData = apps.get_model('market_analysis', 'MarketData')
+    MarketData.objects.using(schema_editor.connection.alias).update(unique_count=models.F('demand_count'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0011_joboffer_last_seen_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marketdata',
+            name='unique_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='OfferDuplicate',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='duplicate', serialize=False, to='market_analysis.joboffer')),
+                ('canonical', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicates', to='market_analysis.joboffer')),
+            ],
+        ),
+        migrations.RunPython(copy_demand_count, migrations.RunPython.noop),
+    ]
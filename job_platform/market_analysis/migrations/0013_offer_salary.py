@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0012_offer_duplicate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSalary',
+            fields=[
+                ('offer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='salary_range', serialize=False, to='market_analysis.joboffer')),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('currency', models.CharField(max_length=3)),
+                ('period', models.CharField(choices=[('hour', 'Hora'), ('day', 'Día'), ('week', 'Semana'), ('month', 'Mes'), ('year', 'Año')], max_length=5)),
+                ('annual_min', models.PositiveIntegerField(blank=True, null=True)),
+                ('annual_max', models.PositiveIntegerField(blank=True, null=True)),
+                ('annual_mid', models.PositiveIntegerField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['currency', 'annual_mid'], name='offersalary_currency_mid_idx'), models.Index(fields=['currency', 'annual_min', 'annual_max'], name='offersalary_currency_range_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,113 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Provincias y comunidades autónomas (ids del INE, ver market_analysis/locations.py):
+# (id, nombre, comunidad autónoma). Copia fija de `place_rows()` al crear la migración.
+PLACES = [
+    (1, 'Araba/Álava', 'País Vasco'),
+    (2, 'Albacete', 'Castilla-La Mancha'),
+    (3, 'Alicante/Alacant', 'Comunitat Valenciana'),
+    (4, 'Almería', 'Andalucía'),
+    (5, 'Ávila', 'Castilla y León'),
+    (6, 'Badajoz', 'Extremadura'),
+    (7, 'Illes Balears', 'Illes Balears'),
+    (8, 'Barcelona', 'Cataluña'),
+    (9, 'Burgos', 'Castilla y León'),
+    (10, 'Cáceres', 'Extremadura'),
+    (11, 'Cádiz', 'Andalucía'),
+    (12, 'Castellón/Castelló', 'Comunitat Valenciana'),
+    (13, 'Ciudad Real', 'Castilla-La Mancha'),
+    (14, 'Córdoba', 'Andalucía'),
+    (15, 'A Coruña', 'Galicia'),
+    (16, 'Cuenca', 'Castilla-La Mancha'),
+    (17, 'Girona', 'Cataluña'),
+    (18, 'Granada', 'Andalucía'),
+    (19, 'Guadalajara', 'Castilla-La Mancha'),
+    (20, 'Gipuzkoa', 'País Vasco'),
+    (21, 'Huelva', 'Andalucía'),
+    (22, 'Huesca', 'Aragón'),
+    (23, 'Jaén', 'Andalucía'),
+    (24, 'León', 'Castilla y León'),
+    (25, 'Lleida', 'Cataluña'),
+    (26, 'La Rioja', 'La Rioja'),
+    (27, 'Lugo', 'Galicia'),
+    (28, 'Madrid', 'Comunidad de Madrid'),
+    (29, 'Málaga', 'Andalucía'),
+    (30, 'Murcia', 'Región de Murcia'),
+    (31, 'Navarra', 'Comunidad Foral de Navarra'),
+    (32, 'Ourense', 'Galicia'),
+    (33, 'Asturias', 'Principado de Asturias'),
+    (34, 'Palencia', 'Castilla y León'),
+    (35, 'Las Palmas', 'Canarias'),
+    (36, 'Pontevedra', 'Galicia'),
+    (37, 'Salamanca', 'Castilla y León'),
+    (38, 'Santa Cruz de Tenerife', 'Canarias'),
+    (39, 'Cantabria', 'Cantabria'),
+    (40, 'Segovia', 'Castilla y León'),
+    (41, 'Sevilla', 'Andalucía'),
+    (42, 'Soria', 'Castilla y León'),
+    (43, 'Tarragona', 'Cataluña'),
+    (44, 'Teruel', 'Aragón'),
+    (45, 'Toledo', 'Castilla-La Mancha'),
+    (46, 'Valencia/València', 'Comunitat Valenciana'),
+    (47, 'Valladolid', 'Castilla y León'),
+    (48, 'Bizkaia', 'País Vasco'),
+    (49, 'Zamora', 'Castilla y León'),
+    (50, 'Zaragoza', 'Aragón'),
+    (51, 'Ceuta', 'Ceuta'),
+    (52, 'Melilla', 'Melilla'),
+    (101, 'Andalucía', 'Andalucía'),
+    (102, 'Aragón', 'Aragón'),
+    (105, 'Canarias', 'Canarias'),
+    (107, 'Castilla y León', 'Castilla y León'),
+    (108, 'Castilla-La Mancha', 'Castilla-La Mancha'),
+    (109, 'Cataluña', 'Cataluña'),
+    (110, 'Comunitat Valenciana', 'Comunitat Valenciana'),
+    (111, 'Extremadura', 'Extremadura'),
+    (112, 'Galicia', 'Galicia'),
+    (116, 'País Vasco', 'País Vasco'),
+]
+
+
+def load_places(apps, schema_editor):
+    Place = apps.get_model('market_analysis', 'Place')
+    Place.objects.using(schema_editor.connection.alias).bulk_create(
+        [Place(id=place_id, name=name, region=region) for place_id, name, region in PLACES],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0013_offer_salary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Place',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100)),
+                ('region', models.CharField(db_index=True, max_length=100)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='work_mode',
+            field=models.CharField(blank=True, choices=[('', 'Sin especificar'), ('onsite', 'Presencial'), ('hybrid', 'Híbrido'), ('remote', 'Remoto')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='place',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_offers', to='market_analysis.place'),
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['place', 'publication_date'], name='joboffer_place_pubdate_idx'),
+        ),
+        migrations.RunPython(load_places, migrations.RunPython.noop),
+    ]
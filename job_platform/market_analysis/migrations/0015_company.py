@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0014_place'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Company',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('canonical_name', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'companies',
+            },
+        ),
+        migrations.AddField(
+            model_name='joboffer',
+            name='employer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_offers', to='market_analysis.company'),
+        ),
+        migrations.RemoveIndex(
+            model_name='joboffer',
+            name='joboffer_pubdate_desc_idx',
+        ),
+        migrations.AddIndex(
+            model_name='joboffer',
+            index=models.Index(fields=['-publication_date'], include=('company', 'employer'), name='joboffer_pubdate_desc_idx'),
+        ),
+    ]
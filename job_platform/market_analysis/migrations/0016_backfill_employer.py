@@ -0,0 +1,81 @@
+# Crea las empresas (Company) de las ofertas ya guardadas y rellena `JobOffer.employer`
+# (market_analysis/companies.py). Se calcula el nombre canónico de cada nombre distinto una
+# vez y se actualizan las ofertas con un UPDATE por bloque de nombres.
+#
+# La normalización es una copia fija de `canonical_company_name` al crear la migración: los
+# cambios posteriores del módulo no deben cambiar lo que hace la migración.
+import re
+import unicodedata
+from itertools import groupby
+
+from django.db import migrations
+from django.db.models import Case, IntegerField, When
+
+# Nombres publicados por UPDATE (`company IN (...)` con un CASE por nombre)
+NAMES_PER_UPDATE = 500
+
+LEGAL_FORMS = {
+    'sl', 'slu', 'sll', 'slne', 'sa', 'sau', 'scoop', 'sccl', 'cb', 'sc', 'srl', 'sas', 'sarl', 'spa',
+    'inc', 'ltd', 'llc', 'llp', 'lp', 'plc', 'gmbh', 'ag', 'bv', 'nv', 'corp', 'corporation', 'limited', 'co',
+}
+LEGAL_FORM_PHRASES = ['sociedad limitada', 'sociedad anonima', 'sociedad cooperativa']
+UNKNOWN_COMPANIES = {'', 'desconocida', 'confidencial', 'empresa confidencial'}
+
+
+def canonical_company_name(name):
+    text = unicodedata.normalize('NFKD', name or "").encode('ascii', 'ignore').decode('ascii').lower()
+    text = re.sub(r' ?& ?', '&', re.sub(r'[^a-z0-9&]+', ' ', text.replace('.', '')))
+    words = []
+    for single, group in groupby(text.split(), key=lambda word: len(word) == 1 and word.isalpha()):
+        words += ["".join(group)] if single else list(group)
+    name = " ".join(words)
+    changed = True
+    while changed:
+        changed = False
+        for phrase in LEGAL_FORM_PHRASES:
+            if name.endswith(f" {phrase}"):
+                name = name[:-len(phrase) - 1]
+                changed = True
+        words = name.split()
+        if len(words) > 1 and words[-1] in LEGAL_FORMS:
+            name = " ".join(words[:-1])
+            changed = True
+    return "" if name in UNKNOWN_COMPANIES else name[:255]
+
+
+def backfill_employers(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    JobOffer = apps.get_model('market_analysis', 'JobOffer')
+    Company = apps.get_model('market_analysis', 'Company')
+
+    names = JobOffer.objects.using(db_alias).values_list('company', flat=True).distinct().order_by('company')
+    canonical = {name: canonical_company_name(name) for name in names.iterator(chunk_size=5000)}
+    display_names = {}
+    for name, key in canonical.items():
+        if key:
+            display_names.setdefault(key, name)
+    Company.objects.using(db_alias).bulk_create(
+        [Company(name=name, canonical_name=key) for key, name in display_names.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    ids = dict(Company.objects.using(db_alias).values_list('canonical_name', 'id'))
+
+    known = [(name, ids[key]) for name, key in canonical.items() if key in ids]
+    for i in range(0, len(known), NAMES_PER_UPDATE):
+        chunk = known[i:i + NAMES_PER_UPDATE]
+        JobOffer.objects.using(db_alias).filter(company__in=[name for name, _ in chunk]).update(
+            employer_id=Case(*[When(company=name, then=company_id) for name, company_id in chunk],
+                             output_field=IntegerField()),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0015_company'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_employers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:59
+
+# Series de demanda por día, semana y mes (market_analysis/rollups.py). La tabla se rellena con
+# el histórico de ofertas ya guardadas para que las predicciones (ai_module/predictions.py), que
+# solo leen de ella, no dependan de ejecutar antes `aggregate_market_data`.
+#
+# El relleno es una copia fija del cálculo de market_analysis/aggregation.py y rollups.py al
+# crear la migración: una consulta agrupada por (día, habilidad, fuente, región) y las semanas
+# ISO y meses sumando las filas diarias en memoria.
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def backfill_rollups(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    JobOffer = apps.get_model('market_analysis', 'JobOffer')
+    SkillDemandRollup = apps.get_model('market_analysis', 'SkillDemandRollup')
+
+    rows = JobOffer.objects.using(db_alias).filter(
+        publication_date__isnull=False,
+        skills__isnull=False,
+    ).values('publication_date', 'skills', 'source', 'place__region').annotate(
+        count=Count('id'),
+        unique_count=Count('id', filter=Q(duplicate__isnull=True)),
+    ).order_by()
+
+    days, periods = [], {}
+    for row in rows.iterator(chunk_size=5000):
+        day, region = row['publication_date'], row['place__region'] or ''
+        days.append(SkillDemandRollup(
+            granularity='day', period_start=day, skill_id=row['skills'], source=row['source'],
+            region=region, demand_count=row['count'], unique_count=row['unique_count'],
+        ))
+        for granularity, start in (('week', day - timedelta(days=day.weekday())), ('month', day.replace(day=1))):
+            counts = periods.setdefault((granularity, start, row['skills'], row['source'], region), [0, 0])
+            counts[0] += row['count']
+            counts[1] += row['unique_count']
+        if len(days) >= BATCH_SIZE:
+            SkillDemandRollup.objects.using(db_alias).bulk_create(days)
+            days = []
+    SkillDemandRollup.objects.using(db_alias).bulk_create(days)
+    SkillDemandRollup.objects.using(db_alias).bulk_create([
+        SkillDemandRollup(
+            granularity=granularity, period_start=start, skill_id=skill_id, source=source,
+            region=region, demand_count=count, unique_count=unique_count,
+        )
+        for (granularity, start, skill_id, source, region), (count, unique_count) in periods.items()
+    ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_analysis', '0016_backfill_employer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillDemandRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Día'), ('week', 'Semana'), ('month', 'Mes')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('source', models.CharField(max_length=50)),
+                ('region', models.CharField(blank=True, default='', max_length=100)),
+                ('demand_count', models.PositiveIntegerField()),
+                ('unique_count', models.PositiveIntegerField(default=0)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demand_rollups', to='market_analysis.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'skill', 'period_start'], name='rollup_skill_period_idx')],
+                'unique_together': {('granularity', 'period_start', 'skill', 'source', 'region')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -3,24 +3,83 @@
 
 # Modelo que representa una habilidad específica.
 # Almacena el nombre de la habilidad de manera única y sensible a mayúsculas/minúsculas.
+import hashlib
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 
+from .compression import compress_text, decompress_text
+
 
 
 
 
+# `in_vocabulary` marca las habilidades que los scrapers buscan en el texto de las ofertas
+# (ver data_integration/skills.py).
 class Skill(models.Model):
     name = models.CharField(
         max_length=100,
         unique=True,
         db_collation='fr-CI-x-icu'
     )
+    in_vocabulary = models.BooleanField(default=False)
     def __str__(self): return self.name
 
+# Modelo que representa un nombre alternativo de una habilidad (p.ej. golang -> go, k8s -> kubernetes).
+# Los scrapers guardan siempre la habilidad canónica.
+class SkillAlias(models.Model):
+    alias = models.CharField(
+        max_length=100,
+        unique=True,
+        db_collation='fr-CI-x-icu'
+    )
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+
+    def __str__(self):
+        return f"{self.alias} -> {self.skill.name}"
+
+# Provincia o comunidad autónoma a la que se asigna la ubicación de una oferta
+# (market_analysis/locations.py). El id es el código del INE de la provincia, o 100 + el de la
+# comunidad para las ubicaciones que solo indican la comunidad; `region` es siempre el nombre
+# de la comunidad autónoma, para agrupar por región.
+class Place(models.Model):
+    id = models.PositiveSmallIntegerField(primary_key=True)
+    name = models.CharField(max_length=100)
+    region = models.CharField(max_length=100, db_index=True)
+
+    def __str__(self):
+        return self.name if self.name == self.region else f"{self.name} ({self.region})"
+
+# Empresa de las ofertas (market_analysis/companies.py). `canonical_name` es el nombre
+# normalizado que identifica a la empresa; `name`, el primer nombre publicado con el que apareció.
+class Company(models.Model):
+    name = models.CharField(max_length=255)
+    canonical_name = models.CharField(max_length=255, unique=True)
+
+    class Meta:
+        verbose_name_plural = 'companies'
+
+    def __str__(self):
+        return self.name
+
 # Modelo que representa una oferta de trabajo.
 # Almacena detalles como título, empresa, ubicación, fuente, fecha de publicación, salario y URL.
 # Relaciona las ofertas con las habilidades requeridas.
+# `search_vector` es el índice de texto completo (título, empresa, ubicación y habilidades)
+# que mantiene `market_analysis.search`; solo se rellena en PostgreSQL.
+# `last_seen_at` es la última vez que un scraper encontró la oferta; el rastreo incremental
+# (data_integration/incremental.py) no vuelve a descargar las vistas hace poco.
+# `place` y `work_mode` se obtienen de `location` al guardar la oferta (market_analysis/locations.py).
+# `employer` es la empresa normalizada a partir de `company` (market_analysis/companies.py);
+# es nula si la empresa es desconocida.
 class JobOffer(models.Model):
+    WORK_MODE_CHOICES = [
+        ('', 'Sin especificar'),
+        ('onsite', 'Presencial'),
+        ('hybrid', 'Híbrido'),
+        ('remote', 'Remoto'),
+    ]
+
     title = models.CharField(max_length=255)
     company = models.CharField(max_length=255)
     location = models.CharField(max_length=255, blank=True)
@@ -29,23 +88,142 @@ class JobOffer(models.Model):
     salary = models.CharField(max_length=100, blank=True, null=True)
     url = models.URLField(max_length=500, unique=True, blank=True, null=True)
     skills = models.ManyToManyField(Skill, related_name='job_offers')
+    search_vector = SearchVectorField(null=True, editable=False)
+    last_seen_at = models.DateTimeField(null=True, blank=True, editable=False)
+    place = models.ForeignKey(Place, null=True, blank=True, on_delete=models.SET_NULL, related_name='job_offers')
+    work_mode = models.CharField(max_length=10, blank=True, default='', choices=WORK_MODE_CHOICES)
+    employer = models.ForeignKey(Company, null=True, blank=True, on_delete=models.SET_NULL, related_name='job_offers')
 
+    # Los índices GIN de `search_vector` (`joboffer_search_vector_gin`) y de trigramas de
+    # `location` (`joboffer_location_trgm`) solo existen en PostgreSQL: los crean las migraciones
+    # 0007 y 0008 fuera del estado de los modelos.
     class Meta:
         unique_together = ('title', 'company', 'source')
+        indexes = [
+            # Filtros por fecha (y fuente) de los dashboards y listados, ordenados por fecha descendente
+            models.Index(fields=['source', 'publication_date'], name='joboffer_source_pubdate_idx'),
+            models.Index(fields=['-publication_date'], include=['company', 'employer'], name='joboffer_pubdate_desc_idx'),
+            # Ofertas por provincia o región en una ventana de fechas (dashboard)
+            models.Index(fields=['place', 'publication_date'], name='joboffer_place_pubdate_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.company} ({self.source})"
 
+# Modelo que guarda la descripción completa de una oferta, comprimida (market_analysis/compression.py).
+# Está en una tabla aparte para que los listados de ofertas no la lean nunca: solo se carga
+# al acceder a `offer.description`. `content_hash` (sha256 del texto) permite detectar
+# descripciones repetidas sin descomprimirlas.
+class OfferDescription(models.Model):
+    offer = models.OneToOneField(JobOffer, on_delete=models.CASCADE, primary_key=True, related_name='description')
+    codec = models.CharField(max_length=10)
+    content = models.BinaryField()
+    length = models.PositiveIntegerField()
+    content_hash = models.CharField(max_length=64, db_index=True)
+
+    @classmethod
+    def from_text(cls, offer_id, text):
+        codec, content = compress_text(text)
+        return cls(
+            offer_id=offer_id,
+            codec=codec,
+            content=content,
+            length=len(text),
+            content_hash=hashlib.sha256(text.encode('utf-8')).hexdigest(),
+        )
+
+    @property
+    def text(self):
+        return decompress_text(self.codec, self.content)
+
+    def __str__(self):
+        return f"Descripción de la oferta {self.offer_id} ({self.length} caracteres)"
+
+# Enlace de una oferta duplicada con su oferta canónica: la misma vacante publicada en otra
+# fuente (market_analysis/dedup.py). Las ofertas canónicas no tienen fila, así que
+# `JobOffer.objects.filter(duplicate__isnull=True)` cuenta cada vacante una sola vez.
+# Está en una tabla aparte para no ensanchar JobOffer, que se escribe en cada scrape.
+class OfferDuplicate(models.Model):
+    offer = models.OneToOneField(JobOffer, on_delete=models.CASCADE, primary_key=True, related_name='duplicate')
+    canonical = models.ForeignKey(JobOffer, on_delete=models.CASCADE, related_name='duplicates')
+
+    def __str__(self):
+        return f"Oferta {self.offer_id} duplicada de {self.canonical_id}"
+
+# Salario de una oferta normalizado a partir del texto de `JobOffer.salary`
+# (market_analysis/salary.py): rango en la moneda y el periodo publicados (con céntimos) y
+# rango anualizado (en unidades de la moneda).
+# `annual_mid` (punto medio anual, o el único límite conocido) se usa para agrupar por bandas
+# salariales. Las ofertas sin salario o con un texto que no se puede leer no tienen fila.
+# Está en una tabla aparte para no ensanchar JobOffer, que se escribe en cada scrape.
+class OfferSalary(models.Model):
+    PERIOD_CHOICES = [
+        ('hour', 'Hora'),
+        ('day', 'Día'),
+        ('week', 'Semana'),
+        ('month', 'Mes'),
+        ('year', 'Año'),
+    ]
+
+    offer = models.OneToOneField(JobOffer, on_delete=models.CASCADE, primary_key=True, related_name='salary_range')
+    salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    currency = models.CharField(max_length=3)
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    annual_min = models.PositiveIntegerField(null=True, blank=True)
+    annual_max = models.PositiveIntegerField(null=True, blank=True)
+    annual_mid = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            # Bandas salariales y filtros por rango anual del dashboard
+            models.Index(fields=['currency', 'annual_mid'], name='offersalary_currency_mid_idx'),
+            models.Index(fields=['currency', 'annual_min', 'annual_max'], name='offersalary_currency_range_idx'),
+        ]
+
+    def __str__(self):
+        return f"Oferta {self.offer_id}: {self.salary_min}-{self.salary_max} {self.currency}/{self.period}"
+
 # Modelo que representa datos de mercado para una habilidad en una fecha específica.
 # Almacena la cantidad de demanda de la habilidad y la fuente de los datos.
+# `unique_count` cuenta solo las ofertas canónicas (sin duplicados de otras fuentes).
 class MarketData(models.Model):
     date = models.DateField()
     skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
     demand_count = models.PositiveIntegerField()
+    unique_count = models.PositiveIntegerField(default=0)
     source = models.CharField(max_length=50)
 
     class Meta:
         unique_together = ('date', 'skill', 'source')
 
     def __str__(self):
-        return f"{self.skill.name} - {self.demand_count} ({self.source}, {self.date})"
\ No newline at end of file
+        return f"{self.skill.name} - {self.demand_count} ({self.source}, {self.date})"
+
+# Demanda de habilidades por periodo (día, semana ISO o mes), habilidad, fuente y región
+# (market_analysis/rollups.py). `period_start` es el primer día del periodo y `region` el
+# nombre de la comunidad autónoma de las ofertas ("" si no tienen provincia asignada).
+class SkillDemandRollup(models.Model):
+    GRANULARITY_CHOICES = [
+        ('day', 'Día'),
+        ('week', 'Semana'),
+        ('month', 'Mes'),
+    ]
+
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    period_start = models.DateField()
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='demand_rollups')
+    source = models.CharField(max_length=50)
+    region = models.CharField(max_length=100, blank=True, default='')
+    demand_count = models.PositiveIntegerField()
+    unique_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('granularity', 'period_start', 'skill', 'source', 'region')
+        indexes = [
+            # Serie de una habilidad (predicciones, gráficos por habilidad)
+            models.Index(fields=['granularity', 'skill', 'period_start'], name='rollup_skill_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.skill.name} - {self.demand_count} ({self.source}, {self.granularity} {self.period_start})"
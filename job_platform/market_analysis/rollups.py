@@ -0,0 +1,113 @@
+# market_analysis/rollups.py
+# Series temporales de demanda de habilidades: número de ofertas por periodo (día, semana ISO
+# o mes), habilidad, fuente y región, con y sin las ofertas duplicadas de otras fuentes.
+# Se guardan ya agregadas en `SkillDemandRollup`, así que un gráfico de varios años lee unas
+# pocas filas por periodo en lugar de agrupar la unión JobOffer-Skill.
+#
+# Se mantienen de forma incremental junto con `MarketData` (market_analysis/aggregation.py):
+# al recalcular unos días se reescriben sus filas diarias y después las semanas y meses que
+# los contienen, sumando las filas diarias (`refresh_period_rollups`).
+#
+# Consultas (`skill_demand`), p.ej. ofertas por mes de cada habilidad en Cataluña:
+#   skill_demand('period_start', 'skill__name', granularity=MONTH, region="Cataluña")
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import SkillDemandRollup
+
+DAY = 'day'
+WEEK = 'week'
+MONTH = 'month'
+GRANULARITIES = (DAY, WEEK, MONTH)
+
+# Granularidades que se calculan a partir de las filas diarias
+PERIOD_TRUNCS = {WEEK: TruncWeek, MONTH: TruncMonth}
+
+
+# Primer día del periodo que contiene `day`: el propio día, el lunes de su semana ISO o el
+# día 1 de su mes.
+def period_start(day, granularity):
+    if granularity == WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == MONTH:
+        return day.replace(day=1)
+    return day
+
+
+# Primer día del periodo siguiente.
+def next_period_start(start, granularity):
+    if granularity == WEEK:
+        return start + timedelta(days=7)
+    if granularity == MONTH:
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+# Recalcula las semanas y meses que contienen `dates` a partir de las filas diarias, con una
+# consulta agrupada por granularidad. Devuelve el número de filas escritas.
+def refresh_period_rollups(dates):
+    dates = set(dates)
+    written = 0
+    for granularity, trunc in PERIOD_TRUNCS.items():
+        starts = sorted({period_start(day, granularity) for day in dates})
+        if not starts:
+            continue
+        rows = SkillDemandRollup.objects.filter(
+            granularity=DAY,
+            period_start__gte=starts[0],
+            period_start__lt=next_period_start(starts[-1], granularity),
+        ).annotate(period=trunc('period_start')).filter(period__in=starts).values(
+            'period', 'skill', 'source', 'region'
+        ).annotate(
+            demand=Sum('demand_count'),
+            unique=Sum('unique_count'),
+        ).order_by()
+        objects = [
+            SkillDemandRollup(
+                granularity=granularity,
+                period_start=row['period'],
+                skill_id=row['skill'],
+                source=row['source'],
+                region=row['region'],
+                demand_count=row['demand'],
+                unique_count=row['unique'],
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            SkillDemandRollup.objects.filter(granularity=granularity, period_start__in=starts).delete()
+            SkillDemandRollup.objects.bulk_create(objects, batch_size=1000)
+        written += len(objects)
+    return written
+
+
+# Filas de `SkillDemandRollup` de una granularidad, filtradas por periodo (fechas de inicio
+# de periodo entre `start` y `end`, ambas incluidas), habilidades, fuentes y región
+# (nombre de la comunidad autónoma, "" = ofertas sin región).
+def demand_rollups(granularity=DAY, start=None, end=None, skill_ids=None, sources=None, region=None):
+    rollups = SkillDemandRollup.objects.filter(granularity=granularity)
+    if start is not None:
+        rollups = rollups.filter(period_start__gte=period_start(start, granularity))
+    if end is not None:
+        rollups = rollups.filter(period_start__lte=end)
+    if skill_ids is not None:
+        rollups = rollups.filter(skill_id__in=skill_ids)
+    if sources is not None:
+        rollups = rollups.filter(source__in=sources)
+    if region is not None:
+        rollups = rollups.filter(region=region)
+    return rollups
+
+
+# Número de ofertas (`count`) agrupado por los campos indicados ('period_start', 'skill',
+# 'skill__name', 'source', 'region'), ordenado por esos campos. Con `unique` cada vacante
+# publicada en varias fuentes cuenta una sola vez. El resto de argumentos son los filtros de
+# `demand_rollups`.
+def skill_demand(*fields, granularity=DAY, unique=False, **filters):
+    count_field = 'unique_count' if unique else 'demand_count'
+    return demand_rollups(granularity, **filters).values(*fields).annotate(
+        count=Sum(count_field)
+    ).order_by(*fields)
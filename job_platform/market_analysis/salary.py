@@ -0,0 +1,251 @@
+# market_analysis/salary.py
+# Normalización de los salarios de las ofertas. `JobOffer.salary` es el texto tal como lo
+# publica la fuente ("27.000€ - 33.000€ b/a", "€40K/yr - €50K/yr", "1.800 € brutos/mes"...);
+# `parse_salary` lo convierte en un rango numérico con moneda y periodo, y `OfferSalary`
+# guarda además el rango anualizado para poder agrupar por bandas salariales en SQL.
+# Los importes publicados se guardan con sus céntimos ("12,50 €/hora"); el rango anual se
+# calcula con ellos y se redondea después a euros.
+#
+# Los scrapers lo rellenan al guardar las ofertas (data_integration/pipeline.py); las ofertas
+# ya guardadas se procesan con `python manage.py normalize_salaries`.
+import logging
+import re
+import unicodedata
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Case, Count, IntegerField, Value, When
+
+from .models import OfferSalary
+
+logger = logging.getLogger(__name__)
+
+# Importes de un rango (Decimal, con céntimos); `salary_min` o `salary_max` es None en
+# "desde X" / "hasta X".
+SalaryRange = namedtuple('SalaryRange', ['salary_min', 'salary_max', 'currency', 'period'])
+
+DEFAULT_CURRENCY = 'EUR'
+# "€" y "£" se sustituyen por "eur" y "gbp" antes de normalizar el texto a ASCII. El "$" solo
+# es USD si no lleva delante el prefijo de otro dólar ("CA$", "A$").
+CURRENCIES = [
+    ('EUR', re.compile(r'\beur\b|\beuros?\b')),
+    ('CAD', re.compile(r'\bca?\$|\bcad\b')),
+    ('AUD', re.compile(r'\ba\$|\baud\b')),
+    ('USD', re.compile(r'(?<![a-z])\$|\bus\$|\busd\b|\bdolares\b|\bdollars?\b')),
+    ('GBP', re.compile(r'\bgbp\b|\blibras\b|\bpounds?\b')),
+]
+SYMBOLS = {'€': ' eur ', '£': ' gbp ', '–': '-', '—': '-'}
+PERIODS = [
+    ('hour', re.compile(r'/\s*(?:h|hr|hora|hour)\b|\bpor hora\b|\bper hour\b|\bhourly\b|\ba la hora\b')),
+    ('day', re.compile(r'/\s*(?:d|dia|day)\b|\bpor dia\b|\bper day\b|\bdaily\b|\bal dia\b')),
+    ('week', re.compile(r'/\s*(?:sem|semana|wk|week)\b|\bsemanal(?:es)?\b|\bpor semana\b|\ba la semana\b|\bper week\b|\bweekly\b')),
+    ('month', re.compile(r'/\s*(?:m|mo|mes|month)\b|\bb/m\b|\bmensual(?:es)?\b|\bal mes\b|\bpor mes\b|\bper month\b|\bmonthly\b')),
+    ('year', re.compile(r'/\s*(?:a|yr|ano|year)\b|\bb/a\b|\banual(?:es)?\b|\bal ano\b|\bpor ano\b|\bper year\b|\byearly\b|\bannual\b')),
+]
+# Multiplicador para anualizar cada periodo (220 jornadas de 8 horas al año)
+PERIOD_FACTORS = {'hour': 1760, 'day': 220, 'week': 52, 'month': 12, 'year': 1}
+# Salarios anuales fuera de este rango son errores de lectura ("2 años de experiencia", ids...)
+ANNUAL_LIMITS = (8000, 1000000)
+# Bandas salariales del dashboard (límites inferiores del salario anual, en la moneda de la oferta)
+SALARY_BANDS = [0, 20000, 30000, 40000, 50000, 60000, 80000]
+CENTS = Decimal('0.01')
+
+NUMBER_RE = re.compile(r'(\d+(?:[.,\s]\d{3})*(?:[.,]\d{1,2})?)\s*(k|mil)?(?![a-z])')
+UPPER_BOUND_RE = re.compile(r'\b(?:hasta|up to|max(?:imo)?)\b')
+LOWER_BOUND_RE = re.compile(r'\b(?:desde|from|min(?:imo)?|a partir de)\b')
+# Números que no son importes: "14 pagas", "23 días de vacaciones", "2 años de experiencia"...
+COUNT_RE = re.compile(r'\s*(?:pagas|dias|anos|years?|days?|horas|hours|meses|months?)\b')
+# Moneda justo antes o después de un número
+CURRENCY_BEFORE_RE = re.compile(r'(?:\$|\b(?:eur|usd|gbp|cad|aud))\s*$')
+CURRENCY_AFTER_RE = re.compile(r'\s*(?:[a-z]{0,2}\$|(?:eur|euros?|usd|gbp|cad|aud|dolares|dollars?|libras|pounds?)\b)')
+# Texto entre los dos importes de un rango ("27.000 € - 33.000 €", "30 a 40 mil", "$40/hr to $50/hr")
+RANGE_RE = re.compile(r'\s*(?:[^\s\d]+\s*)?(?:-|\ba\b|\bto\b|\bhasta\b)\s*(?:[^\s\d]+\s*)?')
+
+
+def _normalize(text):
+    for symbol, replacement in SYMBOLS.items():
+        text = text.replace(symbol, replacement)
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+# Convierte "27.000", "120,000.00", "1.500,50" o "40" (+ "k") en un Decimal.
+def _parse_number(digits, suffix):
+    digits = digits.replace(' ', '')
+    if '.' in digits and ',' in digits:
+        decimal = '.' if digits.rfind('.') > digits.rfind(',') else ','
+        digits = digits.replace(',' if decimal == '.' else '.', '').replace(decimal, '.')
+    else:
+        for separator in '.,':
+            if separator in digits:
+                groups = digits.split(separator)
+                # "27.000" o "1,500,000" son separadores de miles; "40.5" o "12,50" decimales
+                if all(len(group) == 3 for group in groups[1:]):
+                    digits = digits.replace(separator, '')
+                else:
+                    digits = digits.replace(separator, '.')
+    value = Decimal(digits)
+    if suffix:
+        value *= 1000
+    return value.quantize(CENTS)
+
+
+def _detect(patterns, text):
+    for name, pattern in patterns:
+        if pattern.search(text):
+            return name
+    return None
+
+
+# Periodo indicado más cerca después del importe (en "1.800 €/mes, 40 horas semanales" es el
+# mes); si no hay ninguno detrás, el primero del texto.
+def _detect_period(text, start):
+    for position in (start, 0):
+        found = [(match.start(), name) for name, pattern in PERIODS if (match := pattern.search(text, position))]
+        if found:
+            return min(found)[1]
+    return None
+
+
+# Números del importe: el primero que lleva moneda o "k"/"mil" (con el siguiente si forman un
+# rango) o, si ninguno la lleva, el primero (o el primer rango). Se descartan los recuentos.
+def _salary_matches(text):
+    matches = [match for match in NUMBER_RE.finditer(text) if not COUNT_RE.match(text, match.end())]
+
+    def marked(match):
+        return bool(match.group(2) or CURRENCY_BEFORE_RE.search(text, 0, match.start())
+                    or CURRENCY_AFTER_RE.match(text, match.end()))
+
+    def with_range(i):
+        following = matches[i + 1] if i + 1 < len(matches) else None
+        if following and RANGE_RE.fullmatch(text, matches[i].end(), following.start()):
+            return [matches[i], following]
+        return [matches[i]]
+
+    for i, match in enumerate(matches):
+        candidates = with_range(i)
+        if marked(match) or marked(candidates[-1]):
+            return candidates
+    return with_range(0) if matches else []
+
+
+# Periodo por el orden de magnitud cuando el texto no lo indica (p.ej. "30000-40000 EUR").
+def _guess_period(amount):
+    if amount < 200:
+        return 'hour'
+    if amount < 10000:
+        return 'month'
+    return 'year'
+
+
+# Convierte el texto del salario en un SalaryRange, o None si no contiene un importe válido.
+def parse_salary(text):
+    if not text:
+        return None
+    text = _normalize(text)
+    matches = _salary_matches(text)
+    # En "30 a 40 mil" o "35-45k" el multiplicador del segundo importe vale para los dos
+    thousands = any(match.group(2) for match in matches)
+    numbers = [_parse_number(match.group(1), match.group(2) or ('k' if thousands and len(match.group(1)) <= 3 else ''))
+               for match in matches]
+    numbers = [number for number in numbers if number > 0]
+    if not numbers:
+        return None
+    low, high = min(numbers), max(numbers)
+    if len(numbers) == 1:
+        if UPPER_BOUND_RE.search(text):
+            low = None
+        elif LOWER_BOUND_RE.search(text):
+            high = None
+
+    period = _detect_period(text, matches[0].start()) or _guess_period(high or low)
+    factor = PERIOD_FACTORS[period]
+    for amount in (low, high):
+        if amount is not None and not ANNUAL_LIMITS[0] <= amount * factor <= ANNUAL_LIMITS[1]:
+            return None
+    return SalaryRange(
+        salary_min=low,
+        salary_max=high,
+        currency=_detect(CURRENCIES, text) or DEFAULT_CURRENCY,
+        period=period,
+    )
+
+
+# Fila de OfferSalary para una oferta (sin guardar), o None si el salario no se puede leer.
+def build_offer_salary(offer_id, text):
+    parsed = parse_salary(text)
+    if parsed is None:
+        return None
+    # Se anualiza el importe exacto y se redondea al final: "12,50 €/hora" son 22.000 € al año
+    factor = PERIOD_FACTORS[parsed.period]
+    annual_min = parsed.salary_min * factor if parsed.salary_min is not None else None
+    annual_max = parsed.salary_max * factor if parsed.salary_max is not None else None
+    known = [amount for amount in (annual_min, annual_max) if amount is not None]
+    return OfferSalary(
+        offer_id=offer_id,
+        salary_min=parsed.salary_min,
+        salary_max=parsed.salary_max,
+        currency=parsed.currency,
+        period=parsed.period,
+        annual_min=round(annual_min) if annual_min is not None else None,
+        annual_max=round(annual_max) if annual_max is not None else None,
+        annual_mid=round(sum(known) / len(known)),
+    )
+
+
+# Guarda los salarios normalizados de un diccionario id de oferta -> texto del salario con
+# dos consultas como máximo: un upsert de los que se pueden leer y un borrado de los demás
+# (ofertas cuyo salario ha desaparecido o ha dejado de tener un importe válido).
+# Devuelve el número de salarios guardados.
+def store_offer_salaries(texts):
+    rows = []
+    unparsed = []
+    for offer_id, text in texts.items():
+        row = build_offer_salary(offer_id, text)
+        if row is None:
+            unparsed.append(offer_id)
+        else:
+            rows.append(row)
+    with transaction.atomic():
+        if unparsed:
+            OfferSalary.objects.filter(offer_id__in=unparsed).delete()
+        if rows:
+            OfferSalary.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['offer'],
+                update_fields=['salary_min', 'salary_max', 'currency', 'period', 'annual_min', 'annual_max', 'annual_mid'],
+                batch_size=1000,
+            )
+    return len(rows)
+
+
+def _band_label(index):
+    low = SALARY_BANDS[index] // 1000
+    if index + 1 == len(SALARY_BANDS):
+        return f"≥ {low}k"
+    high = SALARY_BANDS[index + 1] // 1000
+    return f"< {high}k" if low == 0 else f"{low}k - {high}k"
+
+
+# Número de ofertas y salario medio anual por banda salarial, con una sola consulta agrupada.
+# `salaries` es un queryset de OfferSalary ya filtrado (fechas, fuente, duplicados...).
+def salary_band_counts(salaries, currency=DEFAULT_CURRENCY):
+    band = Case(
+        *[When(annual_mid__gte=low, then=Value(index)) for index, low in reversed(list(enumerate(SALARY_BANDS)))],
+        output_field=IntegerField(),
+    )
+    rows = {
+        row['band']: row
+        for row in salaries.filter(currency=currency).annotate(band=band).values('band').annotate(
+            count=Count('offer'), average=Avg('annual_mid'),
+        ).order_by('band')
+    }
+    return [
+        {
+            'label': _band_label(index),
+            'count': rows[index]['count'] if index in rows else 0,
+            'average': round(rows[index]['average']) if index in rows else None,
+        }
+        for index in range(len(SALARY_BANDS))
+    ]
@@ -0,0 +1,74 @@
+# market_analysis/search.py
+# Búsqueda de ofertas para el parámetro `?search=` de las vistas.
+# En PostgreSQL usa el índice de texto completo `JobOffer.search_vector` (GIN), que combina:
+#   - título con las configuraciones 'spanish' y 'english' (peso A),
+#   - nombres de las habilidades (peso A), empresa (peso B) y ubicación (peso C) sin stemming,
+# y ordena los resultados por relevancia. El vector se recalcula por lotes al guardar ofertas
+# (`update_search_vectors`), así que la búsqueda no recorre la tabla ni la unión con habilidades.
+# En otras bases de datos (SQLite en desarrollo) se mantiene la búsqueda con `icontains`,
+# resolviendo las habilidades con una subconsulta en lugar de un JOIN + `distinct()`.
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+from .models import JobOffer
+
+SEARCH_CONFIGS = ['spanish', 'english', 'simple']
+
+
+def full_text_search_enabled():
+    return connection.vendor == 'postgresql'
+
+
+# Expresión que calcula el vector de búsqueda de cada oferta (la migración 0007 tiene una
+# copia: si cambia, las ofertas existentes se recalculan con `update_search_vectors()`).
+def search_vector_expression():
+    skill_names = Subquery(
+        JobOffer.skills.through.objects.filter(joboffer_id=OuterRef('pk')).values('joboffer_id').annotate(
+            names=StringAgg('skill__name', delimiter=' ')
+        ).values('names')[:1]
+    )
+    return (
+        SearchVector('title', config='spanish', weight='A')
+        + SearchVector('title', config='english', weight='A')
+        + SearchVector(Coalesce(skill_names, Value(''), output_field=TextField()), config='simple', weight='A')
+        + SearchVector('company', config='simple', weight='B')
+        + SearchVector('location', config='simple', weight='C')
+    )
+
+
+# Recalcula el vector de búsqueda de las ofertas indicadas (o de todas) con una sola consulta.
+def update_search_vectors(offer_ids=None):
+    if not full_text_search_enabled():
+        return 0
+    offers = JobOffer.objects.all()
+    if offer_ids is not None:
+        offers = offers.filter(id__in=list(offer_ids))
+    return offers.update(search_vector=search_vector_expression())
+
+
+# Filtra `queryset` por el texto buscado.
+# En PostgreSQL devuelve las ofertas ordenadas por relevancia (y después por fecha).
+def search_offers(queryset, text):
+    text = text.strip()
+    if not text:
+        return queryset
+    if full_text_search_enabled():
+        query = SearchQuery(text, config=SEARCH_CONFIGS[0], search_type='websearch')
+        for config in SEARCH_CONFIGS[1:]:
+            query |= SearchQuery(text, config=config, search_type='websearch')
+        return queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).order_by('-rank', '-publication_date')
+
+    matching_skills = JobOffer.skills.through.objects.filter(
+        skill__name__icontains=text
+    ).values('joboffer_id')
+    return queryset.filter(
+        Q(title__icontains=text) |
+        Q(company__icontains=text) |
+        Q(location__icontains=text) |
+        Q(id__in=matching_skills)
+    )
@@ -0,0 +1,34 @@
+# market_analysis/signals.py
+# Invalida la caché de los dashboards y recalcula el vector de búsqueda cuando se guardan
+# o borran ofertas una a una (admin, update_or_create...). Las escrituras por lotes
+# (`bulk_create`) no emiten señales: de ellas se encarga `OfferBatchWriter`. Los cambios en
+# MarketData los invalida `refresh_market_data` (no se conectan señales a MarketData para no
+# impedir sus borrados rápidos).
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .dashboard_cache import invalidate_dashboard_cache_on_commit
+from .models import JobOffer
+from .search import update_search_vectors
+
+
+@receiver(post_save, sender=JobOffer)
+@receiver(post_delete, sender=JobOffer)
+@receiver(m2m_changed, sender=JobOffer.skills.through)
+def invalidate_dashboard(sender, action='post_save', **kwargs):
+    if action.startswith('post'):
+        invalidate_dashboard_cache_on_commit()
+
+
+@receiver(post_save, sender=JobOffer)
+def update_offer_search_vector(sender, instance, **kwargs):
+    update_search_vectors([instance.pk])
+
+
+@receiver(m2m_changed, sender=JobOffer.skills.through)
+def update_skills_search_vector(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # Desde el lado de Skill (`skill.job_offers.add(...)`) las ofertas vienen en pk_set
+        offer_ids = pk_set if reverse else [instance.pk]
+        if offer_ids:
+            update_search_vectors(offer_ids)
@@ -1,12 +1,44 @@
 # Este módulo contiene pruebas para los scrapers de Tecnoempleo y LinkedIn.
 # Verifica la correcta extracción y procesamiento de datos como fechas, salarios y ofertas de trabajo.
 
-from django.test import TestCase
-from market_analysis.models import JobOffer, Skill
+from django.db import connection, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, override_settings
+from market_analysis.models import Company, JobOffer, Skill, MarketData, OfferDuplicate, OfferSalary, Place, SkillDemandRollup
+from market_analysis.aggregation import refresh_market_data, refresh_market_data_range
+from market_analysis.companies import canonical_company_name
+from market_analysis.dedup import find_duplicates
+from market_analysis.locations import ResolvedLocation, place_rows, resolve_location
+from market_analysis.rollups import DAY, MONTH, WEEK, skill_demand
+from market_analysis.salary import SalaryRange, parse_salary
+from market_analysis.views import _demand_history, _market_dashboard_blocks
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
 from bs4 import BeautifulSoup
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import skipUnless
+from unittest.mock import patch, MagicMock
+import json
 import os
 import re
+import tempfile
+import time
+import httpx
+from django.utils import timezone
+from data_integration.jobs import claim_next_job, enqueue_scrape_job, execute_job
+from data_integration.models import CrawledPage, ScrapeJob, ScrapeRun
+from data_integration.pipeline import OfferBatchWriter
+from data_integration.scrapers.browser_pool import BrowserPool, close_browser_pools
+from data_integration.scrapers.linkedin import LinkedInScraper
+from data_integration.scrapers.tecnoempleo import run_tecnoempleo_scraper, build_tecnoempleo_url
+from data_integration.scrapers.utils import HostRateLimiter
+from data_integration.parsers import parse_linkedin_detail, parse_linkedin_search, parse_tecnoempleo_page, replay_page
+from data_integration.skills import DEFAULT_ALIASES, DEFAULT_VOCABULARY, SkillExtractor
+from data_integration.snapshots import SnapshotStore, get_snapshot_store
 
 class TecnoempleoScraperTests(TestCase):
     def setUp(self):
@@ -84,4 +116,836 @@ class LinkedInScraperTests(TestCase):
         self.assertEqual(job.title, "Full Stack Developer")
         skill, _ = Skill.objects.get_or_create(name="Python")
         job.skills.add(skill)
-        self.assertIn(skill, job.skills.all())
\ No newline at end of file
+        self.assertIn(skill, job.skills.all())
+
+LINKEDIN_DETAIL_HTML = """
+<html><body>
+<h1 class="top-card-layout__title">Backend Developer</h1>
+<a class="topcard__org-name-link">TechCorp</a>
+<div class="jobs-description__content">Buscamos experiencia con Python, Django y Docker.</div>
+<time>2 days ago</time>
+</body></html>
+"""
+
+class HostRateLimiterTests(TestCase):
+    def test_spaces_requests_to_same_host(self):
+        limiter = HostRateLimiter(requests_per_minute=600)  # una petición cada 0,1 s
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.wait("https://www.linkedin.com/jobs/view/1/")
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_hosts_have_independent_budgets(self):
+        limiter = HostRateLimiter(requests_per_minute=1)
+        limiter.wait("https://www.linkedin.com/")
+        self.assertEqual(limiter.wait("https://www.tecnoempleo.com/"), 0)
+
+# Navegador simulado que devuelve un detalle distinto para cada URL visitada.
+def fake_linkedin_driver():
+    driver = MagicMock(page_source=LINKEDIN_DETAIL_HTML)
+    driver.get_cookies.return_value = [{'name': 'li_at', 'value': 'token'}]
+    def get(url):
+        driver.page_source = LINKEDIN_DETAIL_HTML.replace("Backend Developer", f"Backend Developer {url}")
+    driver.get.side_effect = get
+    return driver
+
+@override_settings(SNAPSHOT_DIR=tempfile.mkdtemp())
+class LinkedInDetailPoolTests(TestCase):
+    def setUp(self):
+        patcher = patch.object(LinkedInScraper, '_create_driver', side_effect=fake_linkedin_driver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings_override = override_settings(BROWSER_COOKIE_DIR=tempfile.mkdtemp())
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        close_browser_pools()
+        self.addCleanup(close_browser_pools)
+
+    def test_extract_offer_data_without_database(self):
+        scraper = LinkedInScraper(workers=1, requests_per_minute=0)
+        data = scraper.extract_offer_data(LINKEDIN_DETAIL_HTML, "https://www.linkedin.com/jobs/view/1/")
+        self.assertEqual(data['title'], "Backend Developer")
+        self.assertEqual(data['company'], "TechCorp")
+        self.assertEqual(data['required_skills'], ['django', 'docker', 'python'])
+        self.assertFalse(JobOffer.objects.exists())
+
+    @patch.dict(os.environ, {'LINKEDIN_EMAIL': 'user@example.com', 'LINKEDIN_PASSWORD': 'secret'})
+    def test_run_uses_driver_pool(self):
+        """Cada URL se procesa con alguno de los navegadores del pool y se guarda."""
+        scraper = LinkedInScraper(workers=3, requests_per_minute=0)
+        urls = [f"https://www.linkedin.com/jobs/view/{i}/" for i in range(5)]
+        progress = MagicMock()
+        with patch.object(scraper, 'login'), patch.object(scraper, 'fetch_offers', return_value=urls):
+            offers = scraper.run(max_offers=5, progress=progress)
+
+        self.assertEqual(len(offers), 5)
+        self.assertEqual(JobOffer.objects.filter(source="LinkedIn").count(), 5)
+        self.assertEqual(progress.call_count, 5)
+        self.assertEqual(LinkedInScraper._create_driver.call_count, 3)
+        # El HTML de cada detalle queda en el archivo de capturas
+        detail = next(get_snapshot_store().entries(source="LinkedIn", kind='detail', url=urls[0]))
+        self.assertIn(f"Backend Developer {urls[0]}", get_snapshot_store().read_text(detail))
+
+    @patch.dict(os.environ, {'LINKEDIN_EMAIL': 'user@example.com', 'LINKEDIN_PASSWORD': 'secret'})
+    def test_incremental_run_skips_recently_seen_offers(self):
+        """Solo se abren las ofertas nuevas y las vistas hace más de CRAWL_REFRESH_DAYS días."""
+        urls = [f"https://www.linkedin.com/jobs/view/{i}/" for i in range(3)]
+        for i, days in [(0, 1), (1, 30)]:
+            JobOffer.objects.create(title=f"Oferta {i}", company="TechCorp", source="LinkedIn", url=urls[i],
+                                    publication_date=date.today(), last_seen_at=timezone.now() - timedelta(days=days))
+
+        def fetch_offers(query, location, max_offers, skip=None):
+            return [url for url in urls if not (skip and skip(url))]
+
+        scraper = LinkedInScraper(workers=1, requests_per_minute=0)
+        with patch.object(scraper, 'login'), patch.object(scraper, 'fetch_offers', side_effect=fetch_offers):
+            offers = scraper.run(max_offers=3)
+        self.assertEqual([offer['url'] for offer in offers], urls[1:])
+        self.assertEqual(JobOffer.objects.get(url=urls[1]).title, "Oferta 1")
+        self.assertGreater(JobOffer.objects.get(url=urls[1]).last_seen_at, timezone.now() - timedelta(minutes=1))
+
+        scraper = LinkedInScraper(workers=1, requests_per_minute=0)
+        with patch.object(scraper, 'login'), patch.object(scraper, 'fetch_offers', side_effect=fetch_offers):
+            self.assertEqual(len(scraper.run(max_offers=3, incremental=False)), 3)
+
+    @patch.dict(os.environ, {'LINKEDIN_EMAIL': 'user@example.com', 'LINKEDIN_PASSWORD': 'secret'})
+    def test_runs_reuse_warm_logged_in_browsers(self):
+        """Una segunda ejecución reutiliza el navegador del pool sin arrancar Chrome ni hacer login."""
+        urls = ["https://www.linkedin.com/jobs/view/1/"]
+        for _ in range(2):
+            scraper = LinkedInScraper(workers=1, requests_per_minute=0)
+            with patch.object(LinkedInScraper, 'login') as login, patch.object(scraper, 'fetch_offers', return_value=urls):
+                self.assertEqual(len(scraper.run(max_offers=1, incremental=False)), 1)
+        self.assertEqual(LinkedInScraper._create_driver.call_count, 1)
+        self.assertEqual(login.call_count, 0)  # solo la primera ejecución hace login
+        self.assertEqual(scraper.pool.idle[0].pages, 4)  # búsqueda y detalle en cada ejecución
+
+    @patch.dict(os.environ, {'LINKEDIN_EMAIL': 'user@example.com', 'LINKEDIN_PASSWORD': 'secret'})
+    def test_login_failure_fails_the_job(self):
+        """Un error de login deja el trabajo como fallido con el error, igual que su ejecución."""
+        user = get_user_model().objects.create_superuser(username='admin', password='12345', email='admin@example.com')
+        job, _ = enqueue_scrape_job(user, 'LinkedIn')
+        with patch.object(LinkedInScraper, 'login', side_effect=RuntimeError("Login de LinkedIn fallido")):
+            execute_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error_message), (ScrapeJob.STATUS_FAILED, "Login de LinkedIn fallido"))
+        self.assertEqual(ScrapeRun.objects.get(job=job).status, ScrapeJob.STATUS_FAILED)
+
+    @override_settings(BROWSER_POOL_ENABLED=False)
+    @patch.dict(os.environ, {'LINKEDIN_EMAIL': 'user@example.com', 'LINKEDIN_PASSWORD': 'secret'})
+    def test_private_pool_is_closed_after_run(self):
+        drivers = []
+        LinkedInScraper._create_driver.side_effect = lambda: drivers.append(fake_linkedin_driver()) or drivers[-1]
+        scraper = LinkedInScraper(workers=2, requests_per_minute=0)
+        urls = [f"https://www.linkedin.com/jobs/view/{i}/" for i in range(2)]
+        with patch.object(scraper, 'login'), patch.object(scraper, 'fetch_offers', return_value=urls):
+            scraper.run(max_offers=2, incremental=False)
+        self.assertEqual(len(scraper.pool), 0)
+        self.assertEqual(len(drivers), 2)
+        for driver in drivers:
+            driver.quit.assert_called_once()
+
+
+class BrowserPoolTests(TestCase):
+    def test_recycles_after_max_pages_and_replaces_dead_browsers(self):
+        pool = BrowserPool("Prueba", factory=MagicMock, size=1, max_pages=2, max_memory_mb=0, cookie_dir='')
+        session = pool.acquire()
+        session.pages = 2
+        pool.release(session)
+        session.driver.quit.assert_called_once()
+        self.assertEqual(len(pool), 0)
+
+        session = pool.acquire()
+        pool.release(session)
+        self.assertIs(pool.acquire(), session)
+        self.assertIsNone(pool.acquire(timeout=0))  # tamaño máximo alcanzado
+        pool.release(session)
+
+        type(session.driver).current_url = property(lambda driver: (_ for _ in ()).throw(RuntimeError("muerto")))
+        replacement = pool.acquire()
+        self.assertIsNot(replacement, session)
+        session.driver.quit.assert_called_once()
+
+    def test_recycles_browsers_over_memory_limit(self):
+        pool = BrowserPool("Prueba", factory=MagicMock, max_memory_mb=100, cookie_dir='')
+        session = pool.acquire()
+        session.driver.execute_script.return_value = 200 * 1024 ** 2
+        pool.release(session)
+        session.driver.quit.assert_called_once()
+        self.assertEqual(pool.idle, [])
+
+    def test_cookies_are_persisted_for_new_browsers(self):
+        cookie_dir = tempfile.mkdtemp()
+        pool = BrowserPool("LinkedIn", factory=MagicMock, cookie_url="https://www.linkedin.com", cookie_dir=cookie_dir)
+        session = pool.acquire()
+        session.driver.get_cookies.return_value = [{'name': 'li_at', 'value': 'token'}]
+        pool.save_cookies(session)
+        self.assertEqual(os.stat(os.path.join(cookie_dir, "linkedin.json")).st_mode & 0o777, 0o600)
+
+        # Un pool nuevo (p.ej. tras reiniciar el worker) carga las cookies en sus navegadores
+        restarted = BrowserPool("LinkedIn", factory=MagicMock, cookie_url="https://www.linkedin.com", cookie_dir=cookie_dir)
+        driver = restarted.acquire().driver
+        driver.get.assert_called_once_with("https://www.linkedin.com")
+        driver.add_cookie.assert_called_once_with({'name': 'li_at', 'value': 'token'})
+
+
+# Página de resultados de Tecnoempleo con `count` ofertas publicadas hoy.
+def tecnoempleo_page(prefix, count):
+    today = date.today().strftime("%d/%m/%Y")
+    cards = "".join(
+        f"""<div class="col-10 col-md-9 col-lg-7">
+        <h3 class="fs-5 mb-2"><a href="#">{prefix} Developer {i}</a></h3>
+        <a class="text-primary link-muted" href="#">Empresa {i}</a>
+        <span class="d-block d-lg-none text-gray-800">Oviedo - {today}</span>
+        <span class="badge bg-gray-500">Python</span><span class="badge bg-gray-500">SQL</span>
+        </div>"""
+        for i in range(count)
+    )
+    return f"<html><body>{cards}</body></html>"
+
+@override_settings(SNAPSHOT_DIR=tempfile.mkdtemp())
+class TecnoempleoCrawlerTests(TestCase):
+    def test_build_url(self):
+        self.assertEqual(
+            build_tecnoempleo_url("desarrollador", "33", 2),
+            "https://www.tecnoempleo.com/ofertas-trabajo/?keyword=desarrollador&provincia=33&pagina=2",
+        )
+        self.assertNotIn("provincia", build_tecnoempleo_url("python", None))
+
+    @patch('data_integration.scrapers.tecnoempleo.asyncio.sleep')
+    def test_crawls_pages_concurrently_with_retries(self, mock_sleep):
+        """Recorre todas las combinaciones, para al llegar a una página vacía y reintenta los 503."""
+        requested = []
+        failed_once = set()
+
+        def handler(request):
+            params = request.url.params
+            page = int(params.get('pagina', 1))
+            key = (params['keyword'], params.get('provincia'), page)
+            requested.append(key)
+            if page == 2 and key not in failed_once:
+                failed_once.add(key)
+                return httpx.Response(503)
+            if page > 2:
+                return httpx.Response(200, text=tecnoempleo_page("", 0))
+            return httpx.Response(200, text=tecnoempleo_page(f"{params['keyword']} {params.get('provincia')} p{page}", 2))
+
+        progress = MagicMock()
+        offers, date_list = run_tecnoempleo_scraper(
+            progress=progress, keywords=["python", "java"], provinces=["33", "28"], max_pages=5,
+            concurrency=4, transport=httpx.MockTransport(handler),
+        )
+
+        # 4 búsquedas x 2 páginas con 2 ofertas cada una
+        self.assertEqual(len(offers), 16)
+        self.assertEqual(JobOffer.objects.filter(source="Tecnoempleo").count(), 16)
+        self.assertEqual(len(date_list), 16)
+        # Páginas 1, 2 (con reintento) y 3 (vacía) por búsqueda; nunca se pide la página 4
+        self.assertEqual(len(requested), 4 * 4)
+        self.assertFalse(any(page == 4 for _, _, page in requested))
+        self.assertEqual(progress.call_count, 12)
+        self.assertEqual(len(list(get_snapshot_store().entries(source="Tecnoempleo", kind='search'))), 12)
+
+    def test_incremental_crawl_uses_conditional_requests(self):
+        """Un segundo rastreo recibe 304 o el mismo contenido y no vuelve a guardar las ofertas vistas."""
+        pages = {1: tecnoempleo_page("Python", 2), 2: tecnoempleo_page("Java", 2), 3: tecnoempleo_page("", 0)}
+        conditional = []
+
+        def handler(request):
+            page = int(request.url.params.get('pagina', 1))
+            etag = f'"p{page}"'
+            conditional.append((page, request.headers.get('If-None-Match')))
+            # La página 1 admite peticiones condicionales; la 2 siempre devuelve el contenido
+            if page == 1 and request.headers.get('If-None-Match') == etag:
+                return httpx.Response(304)
+            headers = {'ETag': etag} if page == 1 else {}
+            return httpx.Response(200, text=pages[page], headers=headers)
+
+        def crawl():
+            return run_tecnoempleo_scraper(keywords=["python"], provinces=["33"], max_pages=5,
+                                           transport=httpx.MockTransport(handler))
+
+        offers, _ = crawl()
+        self.assertEqual(len(offers), 4)
+        snapshots = len(list(get_snapshot_store().entries(source="Tecnoempleo", kind='search')))
+        self.assertEqual(CrawledPage.objects.get(url=build_tecnoempleo_url("python", "33", 1)).etag, '"p1"')
+
+        conditional.clear()
+        offers, _ = crawl()
+        self.assertEqual(offers, [])
+        self.assertEqual(conditional, [(1, '"p1"'), (2, None), (3, None)])
+        # Las páginas sin cambios no se vuelven a archivar
+        self.assertEqual(len(list(get_snapshot_store().entries(source="Tecnoempleo", kind='search'))), snapshots)
+
+        # Una página que cambia solo guarda las ofertas nuevas
+        pages[2] = tecnoempleo_page("Java", 3)
+        offers, _ = crawl()
+        self.assertEqual([offer.title for offer in offers], ["Java Developer 2"])
+        self.assertEqual(JobOffer.objects.filter(source="Tecnoempleo").count(), 5)
+
+        offers, _ = run_tecnoempleo_scraper(keywords=["python"], provinces=["33"], max_pages=5,
+                                            transport=httpx.MockTransport(handler), incremental=False)
+        self.assertEqual(len(offers), 5)
+
+    @patch('data_integration.scrapers.tecnoempleo.asyncio.sleep')
+    def test_connection_error_is_raised(self, mock_sleep):
+        def handler(request):
+            raise httpx.ConnectError("Error de conexión", request=request)
+
+        with self.assertRaises(httpx.HTTPError):
+            run_tecnoempleo_scraper(keywords=["python"], provinces=["33"], max_pages=1,
+                                    transport=httpx.MockTransport(handler))
+        self.assertFalse(JobOffer.objects.exists())
+
+
+LINKEDIN_FULL_DETAIL_HTML = """
+<html><body>
+<h1 class="top-card-layout__title">Ingeniero de Datos Sénior</h1>
+<a class="topcard__org-name-link">DataCorp</a>
+<div class="artdeco-entity-lockup__caption"><div dir="ltr">Madrid, España</div></div>
+<div class="jobs-description__content"><p>Equipo de datos.</p><ul><li>Golang</li><li>K8s</li></ul></div>
+<span class="jobs-unified-top-card__posted-date">3 weeks ago</span>
+<div class="jobs-unified-top-card__salary">40.000 EUR - 50.000 EUR</div>
+</body></html>
+"""
+
+LINKEDIN_SEARCH_HTML = """
+<html><body>
+<a href="/jobs/view/11/?trk=a">Oferta 11</a><a href="/jobs/view/12/">Oferta 12</a>
+<a href="/jobs/view/11/?trk=b">Oferta 11 otra vez</a><a href="/company/acme/">Empresa</a>
+</body></html>
+"""
+
+# Pruebas de las funciones puras de análisis del HTML (data_integration/parsers.py).
+# Se comprueban con los dos analizadores de BeautifulSoup para detectar diferencias.
+class ParserTests(TestCase):
+    PARSERS = ['lxml', 'html.parser']
+
+    def setUp(self):
+        self.extractor = SkillExtractor(DEFAULT_VOCABULARY, DEFAULT_ALIASES)
+        self.today = date(2025, 4, 30)
+
+    def test_linkedin_detail(self):
+        for parser in self.PARSERS:
+            with self.subTest(parser=parser):
+                data = parse_linkedin_detail(LINKEDIN_FULL_DETAIL_HTML, "https://www.linkedin.com/jobs/view/1/",
+                                             self.extractor, parser=parser, today=self.today)
+                self.assertEqual(data['title'], "Ingeniero de Datos Senior")
+                self.assertEqual(data['company'], "DataCorp")
+                self.assertEqual(data['location'], "Madrid, Espana")
+                self.assertEqual(data['description'], "Equipo de datos.\nGolang\nK8s")
+                self.assertEqual(data['required_skills'], ["go", "kubernetes"])
+                self.assertEqual(data['publication_date'], date(2025, 4, 9))
+                self.assertEqual(data['salary'], "40.000 EUR - 50.000 EUR")
+
+    def test_linkedin_detail_without_title_is_discarded(self):
+        self.assertIsNone(parse_linkedin_detail("<html></html>", "https://www.linkedin.com/jobs/view/1/", self.extractor))
+
+    def test_linkedin_search(self):
+        for parser in self.PARSERS:
+            with self.subTest(parser=parser):
+                self.assertEqual(parse_linkedin_search(LINKEDIN_SEARCH_HTML, parser=parser), [
+                    "https://www.linkedin.com/jobs/view/11/",
+                    "https://www.linkedin.com/jobs/view/12/",
+                ])
+
+    def test_tecnoempleo_page(self):
+        html = tecnoempleo_page("Python", 3)
+        for parser in self.PARSERS:
+            with self.subTest(parser=parser):
+                offers, date_list, cards = parse_tecnoempleo_page(html, date.today() - timedelta(days=30), parser=parser)
+                self.assertEqual(cards, 3)
+                self.assertEqual(len(date_list), 3)
+                self.assertEqual(offers[0]['title'], "Python Developer 0")
+                self.assertEqual(offers[0]['location'], "Oviedo")
+                self.assertEqual(offers[0]['required_skills'], ["Python", "SQL"])
+
+    def test_replay_saved_page(self):
+        store = SnapshotStore(tempfile.mkdtemp())
+        entry = store.put(LINKEDIN_FULL_DETAIL_HTML, "LinkedIn", 'detail', url="https://www.linkedin.com/jobs/view/1/")
+        offers = replay_page(entry['source'], entry['kind'], store.read_text(entry), entry['url'], self.extractor)
+        self.assertEqual([offer['company'] for offer in offers], ["DataCorp"])
+        self.assertIsNone(replay_page("LinkedIn", 'screenshot', "", "", self.extractor))
+
+
+# Pruebas para los modelos (antes en market_analysis/tasks.py, donde no se ejecutaban)
+class JobOfferModelTests(TestCase):
+    def setUp(self):
+        self.skill = Skill.objects.create(name="Python")
+        self.job_offer = JobOffer.objects.create(
+            title="Desarrollador Python",
+            company="TechCorp",
+            location="Madrid",
+            source="Tecnoempleo",
+            publication_date=date.today(),
+            salary="30000-40000 EUR",
+            url="https://example.com/job/123"
+        )
+        self.job_offer.skills.add(self.skill)
+
+    def test_job_offer_creation(self):
+        """Prueba la creación de una oferta de empleo."""
+        self.assertEqual(self.job_offer.title, "Desarrollador Python")
+        self.assertEqual(self.job_offer.company, "TechCorp")
+        self.assertEqual(self.job_offer.location, "Madrid")
+        self.assertIn(self.skill, self.job_offer.skills.all())
+
+    def test_unique_together_constraint(self):
+        """Prueba que no se puedan crear dos ofertas con el mismo título, empresa y fuente."""
+        with self.assertRaises(Exception):
+            JobOffer.objects.create(
+                title="Desarrollador Python",
+                company="TechCorp",
+                location="Barcelona",
+                source="Tecnoempleo",
+                publication_date=date.today(),
+                salary="35000-45000 EUR",
+                url="https://example.com/job/456"
+            )
+
+class SkillModelTests(TestCase):
+    def setUp(self):
+        self.skill = Skill.objects.create(name="Java")
+
+    def test_skill_creation(self):
+        """Prueba la creación de una habilidad."""
+        self.assertEqual(self.skill.name, "Java")
+
+class MarketDataModelTests(TestCase):
+    def setUp(self):
+        self.skill = Skill.objects.create(name="Python")
+        self.market_data = MarketData.objects.create(
+            date=date.today(),
+            skill=self.skill,
+            demand_count=10,
+            source="LinkedIn"
+        )
+
+    def test_market_data_creation(self):
+        """Prueba la creación de datos de mercado."""
+        self.assertEqual(self.market_data.demand_count, 10)
+        self.assertEqual(self.market_data.source, "LinkedIn")
+        self.assertEqual(self.market_data.skill, self.skill)
+
+
+class MarketDataAggregationTests(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.python = Skill.objects.create(name="python")
+        self.java = Skill.objects.create(name="java")
+        for i, (source, skills) in enumerate([
+            ("LinkedIn", [self.python, self.java]),
+            ("LinkedIn", [self.python]),
+            ("Tecnoempleo", [self.python]),
+        ]):
+            offer = JobOffer.objects.create(
+                title=f"Oferta {i}", company="TechCorp", source=source, publication_date=self.today
+            )
+            offer.skills.set(skills)
+
+    def demand(self, skill, source):
+        return MarketData.objects.get(date=self.today, skill=skill, source=source).demand_count
+
+    def test_refresh_groups_by_day_skill_and_source(self):
+        written = refresh_market_data([self.today])
+        self.assertEqual(written, 3)
+        self.assertEqual(self.demand(self.python, "LinkedIn"), 2)
+        self.assertEqual(self.demand(self.python, "Tecnoempleo"), 1)
+        self.assertEqual(self.demand(self.java, "LinkedIn"), 1)
+
+    def test_refresh_is_idempotent_and_reflects_deletions(self):
+        refresh_market_data([self.today])
+        JobOffer.objects.filter(title="Oferta 1").delete()
+        refresh_market_data([self.today])
+        self.assertEqual(MarketData.objects.count(), 3)
+        self.assertEqual(self.demand(self.python, "LinkedIn"), 1)
+
+    def test_refresh_range_only_touches_requested_days(self):
+        old = MarketData.objects.create(
+            date=self.today - timedelta(days=60), skill=self.java, source="LinkedIn", demand_count=7
+        )
+        refresh_market_data_range(self.today - timedelta(days=30), self.today)
+        self.assertTrue(MarketData.objects.filter(pk=old.pk).exists())
+        self.assertEqual(MarketData.objects.filter(date=self.today).count(), 3)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('aggregate_market_data', '--days', '7', stdout=out)
+        self.assertIn("3 filas", out.getvalue())
+
+    def test_data_dashboard_reads_aggregates(self):
+        refresh_market_data([self.today])
+        response = self.client.get(reverse('data_integration:data_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['skills_labels'], '["python", "java"]')
+        self.assertEqual(response.context['skills_data'], '[3, 1]')
+
+
+# Pruebas de las series por semana y mes (market_analysis/rollups.py).
+class SkillDemandRollupTests(TestCase):
+    def setUp(self):
+        self.python = Skill.objects.create(name="python")
+        self.count = 0
+        # Lunes 29/01/2024: la semana ISO 5 empieza en enero y termina en febrero
+        self.monday = date(2024, 1, 29)
+
+    def offer(self, day, location="Madrid", source="LinkedIn"):
+        self.count += 1
+        place_id, _ = resolve_location(location)
+        offer = JobOffer.objects.create(title=f"Oferta {self.count}", company="TechCorp", source=source,
+                                        publication_date=day, location=location, place_id=place_id)
+        offer.skills.add(self.python)
+        return offer
+
+    def rollup(self, granularity, start, region):
+        return SkillDemandRollup.objects.get(granularity=granularity, period_start=start, region=region).demand_count
+
+    def test_refresh_builds_week_and_month_series_incrementally(self):
+        self.offer(self.monday)
+        self.offer(self.monday + timedelta(days=3))  # 01/02/2024
+        self.offer(self.monday + timedelta(days=3), location="Barcelona")
+        self.offer(self.monday + timedelta(days=3), location="En algún lugar")
+        refresh_market_data_range(self.monday, self.monday + timedelta(days=6))
+
+        self.assertEqual(self.rollup(WEEK, self.monday, "Comunidad de Madrid"), 2)
+        self.assertEqual(self.rollup(MONTH, date(2024, 1, 1), "Comunidad de Madrid"), 1)
+        self.assertEqual(self.rollup(MONTH, date(2024, 2, 1), "Comunidad de Madrid"), 1)
+        self.assertEqual(self.rollup(MONTH, date(2024, 2, 1), "Cataluña"), 1)
+        self.assertEqual(self.rollup(MONTH, date(2024, 2, 1), ""), 1)
+        # MarketData sigue siendo el total por día, habilidad y fuente
+        self.assertEqual(MarketData.objects.get(date=self.monday + timedelta(days=3)).demand_count, 3)
+
+        # Recalcular un solo día actualiza su semana y su mes sin perder el resto de días
+        self.offer(date(2024, 2, 20))
+        refresh_market_data([date(2024, 2, 20)])
+        self.assertEqual(self.rollup(MONTH, date(2024, 2, 1), "Comunidad de Madrid"), 2)
+        self.assertEqual(self.rollup(WEEK, self.monday, "Comunidad de Madrid"), 2)
+
+        rows = list(skill_demand('period_start', granularity=MONTH, start=date(2024, 1, 15)))
+        self.assertEqual(rows, [{'period_start': date(2024, 1, 1), 'count': 1},
+                                {'period_start': date(2024, 2, 1), 'count': 4}])
+        self.assertEqual(list(skill_demand('region', granularity=DAY, region="Cataluña")),
+                         [{'region': "Cataluña", 'count': 1}])
+
+    def test_dashboard_history_reads_series(self):
+        today = date.today()
+        self.offer(today)
+        self.offer(today - timedelta(days=800))
+        refresh_market_data([today, today - timedelta(days=800)])
+        history = _demand_history(today, MONTH)
+        labels = json.loads(history['history_labels'])
+        self.assertEqual(len(labels), 24)
+        self.assertEqual(labels[-1], today.strftime('%m/%Y'))
+        self.assertEqual(json.loads(history['history_datasets']), [{'label': "python", 'data': [0] * 23 + [1]}])
+
+        history = _demand_history(today, WEEK)
+        self.assertEqual(len(json.loads(history['history_labels'])), 52)
+        self.assertEqual(json.loads(history['history_datasets'])[0]['data'][-1], 1)
+
+    # La migración 0017 rellena las series de las instalaciones que ya tenían ofertas con las
+    # mismas filas que el cálculo incremental
+    def test_migration_backfills_existing_offers(self):
+        from importlib import import_module
+        from django.apps import apps
+        migration = import_module('market_analysis.migrations.0017_skill_demand_rollup')
+        self.offer(self.monday)
+        self.offer(self.monday + timedelta(days=3), location="Barcelona", source="Tecnoempleo")
+        self.offer(date(2024, 3, 5), location="En algún lugar")
+        fields = ('granularity', 'period_start', 'skill_id', 'source', 'region', 'demand_count', 'unique_count')
+
+        migration.backfill_rollups(apps, SimpleNamespace(connection=connection))
+        backfilled = sorted(SkillDemandRollup.objects.values_list(*fields))
+        self.assertEqual(len(backfilled), 9)  # día, semana y mes de cada oferta
+
+        SkillDemandRollup.objects.all().delete()
+        refresh_market_data_range(self.monday, date(2024, 3, 5))
+        self.assertEqual(backfilled, sorted(SkillDemandRollup.objects.values_list(*fields)))
+
+
+# Pruebas de la detección de ofertas duplicadas entre fuentes (market_analysis/dedup.py).
+class OfferDeduplicationTests(TestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.python = Skill.objects.create(name="python")
+
+    def create(self, title, company, source, location="Madrid", days_ago=0):
+        offer = JobOffer.objects.create(title=title, company=company, source=source, location=location,
+                                        publication_date=self.today - timedelta(days=days_ago))
+        offer.skills.add(self.python)
+        return offer
+
+    def test_find_duplicates_across_sources(self):
+        offers = [
+            (1, "Desarrollador Python Senior", "TechCorp S.L.", "Madrid, Espana", "LinkedIn", self.today),
+            (2, "Desarrollador/a Python senior", "Techcorp", "Madrid (Híbrido)", "Tecnoempleo", self.today),
+            # Misma fuente, otra empresa, otra ciudad o demasiado lejos en el tiempo: no son duplicados
+            (3, "Desarrollador Python Senior", "TechCorp", "Madrid", "LinkedIn", self.today),
+            (4, "Desarrollador Python Senior", "OtraEmpresa", "Madrid", "Tecnoempleo", self.today),
+            (5, "Desarrollador Python Senior", "TechCorp", "Oviedo", "Tecnoempleo", self.today),
+            (6, "Desarrollador Python Senior", "TechCorp", "Madrid", "Tecnoempleo", self.today - timedelta(days=90)),
+            (7, "Administrador de sistemas", "TechCorp", "Madrid", "Tecnoempleo", self.today),
+        ]
+        canonical = find_duplicates(offers)
+        # 1, 2 y 3 quedan en el mismo grupo a través de 2 (3 y 2 son de fuentes distintas)
+        self.assertEqual(canonical, {1: None, 2: 1, 3: 1, 4: None, 5: None, 6: None, 7: None})
+
+    def test_writer_links_duplicates_and_dashboard_can_skip_them(self):
+        original = self.create("Backend Developer (Python)", "DataCorp", "LinkedIn")
+        with OfferBatchWriter() as writer:
+            writer.add({'title': "Backend Developer Python", 'company': "DataCorp SL", 'location': "Madrid",
+                        'source': "Tecnoempleo", 'publication_date': self.today, 'required_skills': ["python"]})
+        duplicate = JobOffer.objects.get(source="Tecnoempleo")
+        self.assertEqual(duplicate.duplicate.canonical, original)
+        data = MarketData.objects.filter(date=self.today, skill=self.python)
+        self.assertEqual(sum(data.values_list('demand_count', flat=True)), 2)
+        self.assertEqual(sum(data.values_list('unique_count', flat=True)), 1)
+
+        one_month_ago = self.today - timedelta(days=30)
+        self.assertEqual(_market_dashboard_blocks(one_month_ago)['total_offers'], 2)
+        blocks = _market_dashboard_blocks(one_month_ago, dedupe=True)
+        self.assertEqual(blocks['total_offers'], 1)
+        self.assertEqual(blocks['skills_data'], '[1]')
+
+    def test_management_command_recomputes_links(self):
+        first = self.create("Data Engineer", "BigData", "LinkedIn", days_ago=40)
+        second = self.create("Data Engineer", "BigData", "Tecnoempleo", days_ago=40)
+        out = StringIO()
+        call_command('dedupe_offers', '--dry-run', stdout=out)
+        self.assertIn("0 duplicadas", out.getvalue())
+        call_command('dedupe_offers', '--all', '--dry-run', stdout=out)
+        self.assertIn("1 duplicadas", out.getvalue())
+        self.assertFalse(OfferDuplicate.objects.exists())
+
+        call_command('dedupe_offers', '--all', stdout=out)
+        self.assertEqual(OfferDuplicate.objects.get(offer=second).canonical, first)
+        self.assertEqual(MarketData.objects.get(source="Tecnoempleo").unique_count, 0)
+
+
+class SalaryNormalizationTests(TestCase):
+    def test_parse_salary_formats(self):
+        cases = {
+            "27.000€ - 33.000€ b/a": SalaryRange(27000, 33000, 'EUR', 'year'),
+            "40.000 EUR - 50.000 EUR": SalaryRange(40000, 50000, 'EUR', 'year'),
+            "$120,000.00/yr - $150,000.00/yr": SalaryRange(120000, 150000, 'USD', 'year'),
+            "€40K/yr - €50K/yr": SalaryRange(40000, 50000, 'EUR', 'year'),
+            "De 30 a 40 mil euros": SalaryRange(30000, 40000, 'EUR', 'year'),
+            "1.800 € brutos/mes": SalaryRange(1800, 1800, 'EUR', 'month'),
+            "€25/hr": SalaryRange(25, 25, 'EUR', 'hour'),
+            "12,50 €/hora": SalaryRange(Decimal('12.50'), Decimal('12.50'), 'EUR', 'hour'),
+            "1.500,50 - 1.800,75 € brutos/mes": SalaryRange(Decimal('1500.50'), Decimal('1800.75'), 'EUR', 'month'),
+            "Hasta 40.000€": SalaryRange(None, 40000, 'EUR', 'year'),
+            "Salario: 2.000€/mes, 14 pagas": SalaryRange(2000, 2000, 'EUR', 'month'),
+            "40.000 € brutos anuales, 23 días vacaciones": SalaryRange(40000, 40000, 'EUR', 'year'),
+            "1.800 €/mes, 40 horas semanales": SalaryRange(1800, 1800, 'EUR', 'month'),
+            "800€/semana": SalaryRange(800, 800, 'EUR', 'week'),
+            "27.000 – 33.000 € brutos/año": SalaryRange(27000, 33000, 'EUR', 'year'),
+            "CA$90K/yr": SalaryRange(90000, 90000, 'CAD', 'year'),
+            "US$100K - US$120K": SalaryRange(100000, 120000, 'USD', 'year'),
+            "3 años de experiencia, 35.000-45.000 EUR": SalaryRange(35000, 45000, 'EUR', 'year'),
+            "Salario no disponible": None,
+            "2 años de experiencia": None,
+            None: None,
+        }
+        for text, expected in cases.items():
+            self.assertEqual(parse_salary(text), expected, text)
+
+    def offer(self, title, salary, source="LinkedIn"):
+        return {'title': title, 'company': "TechCorp", 'location': "Madrid", 'source': source,
+                'publication_date': date.today(), 'salary': salary, 'url': f"https://example.com/{title}",
+                'required_skills': []}
+
+    def test_writer_normalizes_salaries_and_dashboard_groups_bands(self):
+        with OfferBatchWriter() as writer:
+            writer.add(self.offer("a", "27.000€ - 33.000€ b/a"))
+            writer.add(self.offer("b", "€2,500/mo"))
+            writer.add(self.offer("c", "Salario a convenir"))
+        salary = OfferSalary.objects.get(offer__url="https://example.com/a")
+        self.assertEqual((salary.annual_min, salary.annual_max, salary.annual_mid), (27000, 33000, 30000))
+        self.assertEqual(OfferSalary.objects.get(offer__url="https://example.com/b").annual_mid, 30000)
+        self.assertEqual(OfferSalary.objects.count(), 2)
+
+        blocks = _market_dashboard_blocks(date.today() - timedelta(days=30))
+        bands = {band['label']: band['count'] for band in blocks['salary_bands']}
+        self.assertEqual(bands["30k - 40k"], 2)
+        self.assertEqual(sum(bands.values()), 2)
+        self.assertEqual(blocks['salary_by_source'], [{'source': "LinkedIn", 'count': 2, 'average': 30000}])
+
+        # Si la oferta pierde el salario al volver a guardarla se borra su rango
+        with OfferBatchWriter() as writer:
+            writer.add(self.offer("a", None))
+        self.assertFalse(OfferSalary.objects.filter(offer__url="https://example.com/a").exists())
+
+    # Los céntimos se conservan y el salario anual se calcula antes de redondear
+    def test_hourly_salary_keeps_cents(self):
+        with OfferBatchWriter() as writer:
+            writer.add(self.offer("a", "12,50 €/hora"))
+        salary = OfferSalary.objects.get()
+        self.assertEqual((salary.salary_min, salary.salary_max), (Decimal('12.50'), Decimal('12.50')))
+        self.assertEqual((salary.annual_min, salary.annual_mid), (22000, 22000))
+
+    def test_backfill_command_processes_existing_offers(self):
+        for i, salary in enumerate(["35k-45k", "Según valía", "", None]):
+            JobOffer.objects.create(title=f"Oferta {i}", company="TechCorp", source="Tecnoempleo",
+                                    publication_date=date.today(), salary=salary)
+        out = StringIO()
+        call_command('normalize_salaries', '--batch-size', '1', stdout=out)
+        self.assertIn("2 ofertas procesadas, 1 salarios normalizados", out.getvalue())
+        self.assertEqual(OfferSalary.objects.get().salary_max, 45000)
+
+        JobOffer.objects.filter(title="Oferta 0").update(salary=None)
+        call_command('normalize_salaries', '--all', stdout=out)
+        self.assertFalse(OfferSalary.objects.exists())
+
+
+class LocationNormalizationTests(TestCase):
+    def test_resolve_location_formats(self):
+        cases = {
+            "Madrid y otras": ResolvedLocation(28, ''),
+            "Barcelona (Híbrido)": ResolvedLocation(8, 'hybrid'),
+            "Gijón, Principado de Asturias, España": ResolvedLocation(33, ''),
+            "Greater Madrid Metropolitan Area": ResolvedLocation(28, ''),
+            "Cataluña, España": ResolvedLocation(109, ''),
+            "Castilla y León": ResolvedLocation(107, ''),
+            "León, Castilla y León, España (Presencial)": ResolvedLocation(24, 'onsite'),
+            "Remote": ResolvedLocation(None, 'remote'),
+            "Ubicación no especificada": ResolvedLocation(None, ''),
+            "": ResolvedLocation(None, ''),
+        }
+        for text, expected in cases.items():
+            self.assertEqual(resolve_location(text), expected, text)
+
+    # La migración 0014 carga una copia fija de las provincias y comunidades
+    def test_migration_loads_every_place(self):
+        self.assertEqual(sorted(Place.objects.values_list('id', 'name', 'region')), sorted(place_rows()))
+
+    def offer(self, title, location):
+        return {'title': title, 'company': "TechCorp", 'location': location, 'source': "LinkedIn",
+                'publication_date': date.today(), 'url': f"https://example.com/{title}",
+                'required_skills': ["Python"]}
+
+    def test_writer_sets_place_and_dashboard_groups_by_region(self):
+        with OfferBatchWriter() as writer:
+            writer.add(self.offer("a", "Oviedo, Asturias (Remoto)"))
+            writer.add(self.offer("b", "Gijón"))
+            writer.add(self.offer("c", "Barcelona (Híbrido)"))
+            writer.add(self.offer("d", "En algún lugar"))
+        offer = JobOffer.objects.select_related('place').get(url="https://example.com/a")
+        self.assertEqual((offer.place.name, offer.place.region, offer.work_mode),
+                         ("Asturias", "Principado de Asturias", 'remote'))
+
+        blocks = _market_dashboard_blocks(date.today() - timedelta(days=30), region=3)
+        regions = {row['place__region']: (row['count'], row['remote'], row['hybrid']) for row in blocks['regions_count']}
+        self.assertEqual(regions, {"Principado de Asturias": (2, 1, 0), "Cataluña": (1, 0, 1), None: (1, 0, 0)})
+        self.assertEqual(blocks['region_skills'], [{'skill__name': "Python", 'count': 2}])
+        self.assertEqual(_market_dashboard_blocks(date.today() - timedelta(days=30), region=9)['region_skills'],
+                         [{'skill__name': "Python", 'count': 1}])
+
+    def test_backfill_command_processes_existing_offers(self):
+        for i, location in enumerate(["Madrid", "Madrid", "Valencia (Híbrido)", "Ninguna"]):
+            JobOffer.objects.create(title=f"Oferta {i}", company="TechCorp", source="Tecnoempleo",
+                                    publication_date=date.today(), location=location)
+        out = StringIO()
+        call_command('normalize_locations', stdout=out)
+        self.assertIn("4 ofertas actualizadas; 2 de 3 ubicaciones distintas", out.getvalue())
+        self.assertEqual(JobOffer.objects.filter(place_id=28).count(), 2)
+        self.assertEqual(JobOffer.objects.get(title="Oferta 2").work_mode, 'hybrid')
+
+        # Sin --all solo se procesan las ofertas que siguen sin provincia ni modalidad
+        call_command('normalize_locations', stdout=out)
+        self.assertIn("1 ofertas actualizadas", out.getvalue())
+
+    def test_backfill_command_refreshes_region_series(self):
+        python = Skill.objects.create(name="Python")
+        for i, location in enumerate(["Madrid", "Oviedo"]):
+            offer = JobOffer.objects.create(title=f"Oferta {i}", company="TechCorp", source="Tecnoempleo",
+                                            publication_date=date.today(), location=location)
+            offer.skills.add(python)
+        # Series calculadas antes de normalizar las ubicaciones (p.ej. por la migración 0017)
+        refresh_market_data([date.today()])
+        self.assertEqual(list(skill_demand('region', granularity=MONTH)), [{'region': "", 'count': 2}])
+
+        call_command('normalize_locations', stdout=StringIO())
+        self.assertEqual(list(skill_demand('region', granularity=MONTH)),
+                         [{'region': "Comunidad de Madrid", 'count': 1}, {'region': "Principado de Asturias", 'count': 1}])
+        self.assertEqual(_market_dashboard_blocks(date.today() - timedelta(days=30), region=13)['region_skills'],
+                         [{'skill__name': "Python", 'count': 1}])
+
+
+class CompanyNormalizationTests(TestCase):
+    def test_canonical_company_name(self):
+        cases = {
+            "Acme S.L.": "acme",
+            "ACME SL": "acme",
+            "Acme, s. l.": "acme",
+            "Telefónica, S.A.U.": "telefonica",
+            "Indra Sistemas, Sociedad Anónima": "indra sistemas",
+            "Globant Inc": "globant",
+            "A B C": "abc",
+            "A. B. C. S.L.": "abc",
+            "Banco X Y Z, S.A.": "banco xyz",
+            "AT&T": "at&t",
+            "AT & T Inc.": "at&t",
+            "Johnson & Johnson": "johnson&johnson",
+            "SL": "sl",
+            "Desconocida": "",
+            "": "",
+        }
+        for name, expected in cases.items():
+            self.assertEqual(canonical_company_name(name), expected, name)
+
+    def offer(self, title, company):
+        return {'title': title, 'company': company, 'location': "Madrid", 'source': "LinkedIn",
+                'publication_date': date.today(), 'url': f"https://example.com/{title}",
+                'required_skills': []}
+
+    def test_writer_links_variants_to_one_company(self):
+        with OfferBatchWriter() as writer:
+            writer.add(self.offer("a", "Acme S.L."))
+            writer.add(self.offer("b", "ACME SL"))
+            writer.add(self.offer("c", "Globex"))
+            writer.add(self.offer("d", None))
+        with OfferBatchWriter() as writer:
+            writer.add(self.offer("e", "acme, s. l."))
+        company = Company.objects.get(canonical_name="acme")
+        self.assertEqual(company.name, "Acme S.L.")
+        self.assertEqual(company.job_offers.count(), 3)
+        self.assertIsNone(JobOffer.objects.get(title="d").employer_id)
+
+        blocks = _market_dashboard_blocks(date.today() - timedelta(days=30))
+        self.assertEqual(blocks['companies_count'], [{'company': "Acme S.L.", 'count': 3}, {'company': "Globex", 'count': 1}])
+
+    def test_migration_backfills_existing_offers(self):
+        from importlib import import_module
+        from django.apps import apps
+        migration = import_module('market_analysis.migrations.0016_backfill_employer')
+        for i, company in enumerate(["Initech S.A.", "INITECH SA", "Umbrella", "Desconocida", "AT&T", "AT & T Inc."]):
+            JobOffer.objects.create(title=f"Oferta {i}", company=company, source="Tecnoempleo",
+                                    publication_date=date.today())
+        migration.backfill_employers(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(Company.objects.count(), 3)
+        self.assertEqual(Company.objects.get(canonical_name="initech").job_offers.count(), 2)
+        self.assertEqual(Company.objects.get(canonical_name="at&t").job_offers.count(), 2)
+        self.assertEqual(JobOffer.objects.filter(employer__isnull=True).count(), 1)
+
+
+# Aplica todas las migraciones en una base de datos SQLite nueva: los índices exclusivos de
+# PostgreSQL no deben llegar a SQLite aunque una migración posterior rehaga la tabla.
+@skipUnless(connection.vendor == 'sqlite', "Solo para el fallback de SQLite")
+class SQLiteMigrationTests(SimpleTestCase):
+    def test_full_migration_chain(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            default = connections['default']
+            fresh = type(default)({**default.settings_dict, 'NAME': os.path.join(tmp, 'db.sqlite3')}, alias='migration_check')
+            # Las migraciones de datos buscan la conexión por su alias
+            connections['migration_check'] = fresh
+            try:
+                executor = MigrationExecutor(fresh)
+                executor.migrate(executor.loader.graph.leaf_nodes())
+                with fresh.cursor() as cursor:
+                    indexes = set(fresh.introspection.get_constraints(cursor, 'market_analysis_joboffer'))
+            finally:
+                fresh.close()
+                del connections['migration_check']
+        self.assertIn('joboffer_place_pubdate_idx', indexes)
+        self.assertNotIn('joboffer_search_vector_gin', indexes)
+        self.assertNotIn('joboffer_location_trgm', indexes)
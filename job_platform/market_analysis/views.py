@@ -1,90 +1,106 @@
 # market_analysis/views.py
 from django.shortcuts import render, redirect
-from django.db.models import Count, Q
+from django.db.models import Avg, Count, Q, Sum
 from django.contrib import messages
-from market_analysis.models import JobOffer, Skill, MarketData
+from market_analysis.models import Company, JobOffer, Skill, MarketData, OfferSalary
+from market_analysis.dashboard_cache import cached_block
+from market_analysis.locations import REGIONS
+from market_analysis.rollups import DAY, MONTH, WEEK, period_start, skill_demand
+from market_analysis.salary import DEFAULT_CURRENCY, salary_band_counts
+from market_analysis.search import search_offers
 from ai_module.recommendations import recommend_tasks
 from datetime import datetime, timedelta
 import json
-from data_integration.scrapers.linkedin import scrape_linkedin
-from data_integration.scrapers.tecnoempleo import scrape_tecnoempleo
+from data_integration.jobs import enqueue_scrape_job
 from django.core.paginator import Paginator
 from django.utils import timezone
-from collections import defaultdict
 
-def dashboard(request):
-    one_month_ago = datetime.now().date() - timedelta(days=30)
-    
+# Calcula los bloques del dashboard que no dependen del usuario ni de la búsqueda.
+# Devuelve solo listas, diccionarios y números para poder guardarlos en caché.
+# Con `dedupe` cada vacante publicada en varias fuentes cuenta una sola vez (market_analysis/dedup.py).
+# `region` es el código del INE de la comunidad autónoma del bloque de habilidades por región.
+DEFAULT_REGION = 3  # Principado de Asturias
+
+def _market_dashboard_blocks(one_month_ago, dedupe=False, region=DEFAULT_REGION):
+    # Agregados diarios de demanda por habilidad y fuente (ver market_analysis/aggregation.py)
+    recent_market_data = MarketData.objects.filter(date__gte=one_month_ago, skill__name__gt='')
+    count_field = 'unique_count' if dedupe else 'demand_count'
+    offers = JobOffer.objects.filter(publication_date__gte=one_month_ago)
+    salaries = OfferSalary.objects.filter(offer__publication_date__gte=one_month_ago)
+    if dedupe:
+        offers = offers.filter(duplicate__isnull=True)
+        salaries = salaries.filter(offer__duplicate__isnull=True)
+
     # Habilidades más demandadas (último mes)
-    skills_demand = JobOffer.objects.filter(
-        publication_date__gte=one_month_ago,
-        skills__isnull=False,
-        skills__name__isnull=False,
-        skills__name__gt=''
-    ).values('skills__name').annotate(count=Count('id')).order_by('-count')[:10]
-    skills_labels = json.dumps([skill['skills__name'].capitalize() for skill in skills_demand])
+    skills_demand = list(recent_market_data.values('skill__name').annotate(
+        count=Sum(count_field)
+    ).order_by('-count')[:10])
+    skills_labels = json.dumps([skill['skill__name'].capitalize() for skill in skills_demand])
     skills_data = json.dumps([skill['count'] for skill in skills_demand])
     print("Skills Labels:", skills_labels)
     print("Skills Data:", skills_data)
     
     # Ofertas por fuente
-    sources_count = JobOffer.objects.filter(publication_date__gte=one_month_ago).values('source').annotate(count=Count('id')).order_by('-count')
+    sources_count = list(offers.values('source').annotate(count=Count('id')).order_by('-count'))
     sources_labels = json.dumps([source['source'] for source in sources_count])
     sources_data = json.dumps([source['count'] for source in sources_count])
     
     print("Sources Labels:", sources_labels)
     print("Sources Data:", sources_data)
     
-    # Habilidades por región (Asturias)
-    asturias_skills = JobOffer.objects.filter(
-        publication_date__gte=one_month_ago,
-        location__icontains='Asturias',
-        skills__isnull=False,
-        skills__name__isnull=False,
-        skills__name__gt=''
-    ).values('skills__name').annotate(count=Count('id')).order_by('-count')[:5]
+    # Ofertas por región (provincia asignada al guardar la oferta, ver market_analysis/locations.py)
+    regions_count = list(offers.values('place__region').annotate(
+        count=Count('id'),
+        remote=Count('id', filter=Q(work_mode='remote')),
+        hybrid=Count('id', filter=Q(work_mode='hybrid')),
+    ).order_by('-count'))
+
+    # Habilidades por región (series diarias por región, ver market_analysis/rollups.py)
+    region_skills = list(skill_demand(
+        'skill__name', granularity=DAY, unique=dedupe, start=one_month_ago, region=REGIONS[region]
+    ).filter(skill__name__gt='').order_by('-count')[:5])
     
     # Total de ofertas
-    total_offers = JobOffer.objects.filter(publication_date__gte=one_month_ago).count()
+    total_offers = offers.count()
     
-    # Empresas con más ofertas
-    companies_count = JobOffer.objects.filter(
-        publication_date__gte=one_month_ago
-    ).values('company').annotate(count=Count('id')).order_by('-count')[:5]
+    # Empresas con más ofertas, agrupadas por empresa normalizada (market_analysis/companies.py)
+    top_employers = list(offers.filter(employer__isnull=False).values('employer').annotate(
+        count=Count('id')
+    ).order_by('-count')[:5])
+    employer_names = dict(Company.objects.filter(
+        id__in=[row['employer'] for row in top_employers]
+    ).values_list('id', 'name'))
+    companies_count = [{'company': employer_names[row['employer']], 'count': row['count']} for row in top_employers]
     
+    # Ofertas por banda salarial (salario anual normalizado, ver market_analysis/salary.py)
+    salary_bands = salary_band_counts(salaries)
+    salary_by_source = [
+        {'source': row['offer__source'], 'count': row['count'], 'average': round(row['average'])}
+        for row in salaries.filter(currency=DEFAULT_CURRENCY).values('offer__source').annotate(
+            count=Count('offer'), average=Avg('annual_mid')
+        ).order_by('-count')
+    ]
+
     # Comparación entre plataformas
     platform_comparison = {}
     for source in ['LinkedIn', 'Tecnoempleo']:
-        skills = JobOffer.objects.filter(
-            publication_date__gte=one_month_ago,
-            source=source,
-            skills__isnull=False,
-            skills__name__isnull=False,
-            skills__name__gt=''
-        ).values('skills__name').annotate(count=Count('id')).order_by('-count')[:5]
-        platform_comparison[source] = [{'name': s['skills__name'], 'count': s['count']} for s in skills]
+        skills = recent_market_data.filter(source=source).values('skill__name').annotate(
+            count=Sum(count_field)
+        ).order_by('-count')[:5]
+        platform_comparison[source] = [{'name': s['skill__name'], 'count': s['count']} for s in skills]
     
     # Predicciones de habilidades futuras usando MarketData
     skill_trends = []
     future_skills_labels = json.dumps([])
     future_skills_data = json.dumps([])
     try:
-        # Filtrar datos de MarketData de los últimos 30 días
-        market_data = MarketData.objects.filter(date__gte=one_month_ago)
-        
-        # Agrupar por habilidad y calcular el promedio de demand_count
-        skill_demand = defaultdict(list)
-        for entry in market_data:
-            # Convertir el objeto Skill a su nombre (str)
-            skill_name = entry.skill.name if entry.skill else "Desconocido"
-            skill_demand[skill_name].append(entry.demand_count)
-        
-        # Calcular promedio y ordenar por demanda descendente (top 5)
+        # Promedio de demand_count por habilidad en los últimos 30 días (top 5), calculado en SQL
         skill_trends = [
-            {'name': skill, 'count': sum(demands) / len(demands)} 
-            for skill, demands in skill_demand.items() if len(demands) > 0
+            {'name': row['skill__name'], 'count': row['count']}
+            for row in MarketData.objects.filter(date__gte=one_month_ago).values('skill__name').annotate(
+                count=Avg(count_field)
+            ).order_by('-count')[:5]
         ]
-        skill_trends = sorted(skill_trends, key=lambda x: x['count'], reverse=True)[:5]
         
         # Generar datos para el gráfico
         future_skills_labels = json.dumps([trend['name'] for trend in skill_trends])
@@ -92,6 +108,75 @@ def dashboard(request):
     except Exception as e:
         print("Error al calcular tendencias de habilidades:", e)
 
+    return {
+        'skills_demand': skills_demand,
+        'skills_labels': skills_labels,
+        'skills_data': skills_data,
+        'sources_count': sources_count,
+        'sources_labels': sources_labels,
+        'sources_data': sources_data,
+        'regions_count': regions_count,
+        'region_skills': region_skills,
+        'total_offers': total_offers,
+        'companies_count': companies_count,
+        'salary_bands': salary_bands,
+        'salary_by_source': salary_by_source,
+        'platform_comparison': platform_comparison,
+        'future_skills': skill_trends,
+        'future_skills_labels': future_skills_labels,
+        'future_skills_data': future_skills_data,
+    }
+
+# Periodos del histórico de demanda según la granularidad (?granularity=week|month).
+HISTORY_PERIODS = {WEEK: 52, MONTH: 24}
+HISTORY_SKILLS = 5
+
+# Histórico de demanda de las habilidades más demandadas, por semana ISO o por mes, leído de
+# las series agregadas (market_analysis/rollups.py): dos consultas sobre unas pocas filas por
+# periodo, sea cual sea el número de ofertas.
+def _demand_history(today, granularity, dedupe=False):
+    periods = [period_start(today, granularity)]
+    while len(periods) < HISTORY_PERIODS[granularity]:
+        periods.insert(0, period_start(periods[0] - timedelta(days=1), granularity))
+
+    top_skills = list(skill_demand(
+        'skill', 'skill__name', granularity=granularity, unique=dedupe, start=periods[0]
+    ).filter(skill__name__gt='').order_by('-count')[:HISTORY_SKILLS])
+    counts = {
+        (row['period_start'], row['skill']): row['count']
+        for row in skill_demand('period_start', 'skill', granularity=granularity, unique=dedupe,
+                                start=periods[0], skill_ids=[skill['skill'] for skill in top_skills])
+    }
+
+    if granularity == WEEK:
+        labels = [f"{start.isocalendar()[0]}-S{start.isocalendar()[1]:02d}" for start in periods]
+    else:
+        labels = [start.strftime('%m/%Y') for start in periods]
+    datasets = [
+        {'label': skill['skill__name'], 'data': [counts.get((start, skill['skill']), 0) for start in periods]}
+        for skill in top_skills
+    ]
+    return {
+        'history_labels': json.dumps(labels),
+        'history_datasets': json.dumps(datasets),
+    }
+
+def dashboard(request):
+    one_month_ago = datetime.now().date() - timedelta(days=30)
+    
+    dedupe = request.GET.get('dedupe') == '1'
+    region = request.GET.get('region', '')
+    region = int(region) if region.isdigit() and int(region) in REGIONS else DEFAULT_REGION
+
+    # Gráficos y rankings desde la caché (se invalidan al guardar nuevas ofertas)
+    blocks = cached_block(f"{'market_dedupe' if dedupe else 'market'}_{region}", one_month_ago,
+                          lambda: _market_dashboard_blocks(one_month_ago, dedupe, region))
+    granularity = request.GET.get('granularity')
+    granularity = granularity if granularity in HISTORY_PERIODS else MONTH
+    today = datetime.now().date()
+    history = cached_block(f"history_{granularity}{'_dedupe' if dedupe else ''}", today,
+                           lambda: _demand_history(today, granularity, dedupe))
+
     # Recomendaciones de tareas
     try:
         recommended_tasks = recommend_tasks(request.user)
@@ -107,12 +192,7 @@ def dashboard(request):
         publication_date__gte=one_month_ago
     ).order_by('-publication_date')
     
-    if search_query:
-        recent_offers = recent_offers.filter(
-            Q(title__icontains=search_query) |
-            Q(company__icontains=search_query) |
-            Q(location__icontains=search_query)
-        )
+    recent_offers = search_offers(recent_offers, search_query)
     
     paginator = Paginator(recent_offers, 10)
     page_number = request.GET.get('page')
@@ -120,37 +200,31 @@ def dashboard(request):
     
     # Definir el contexto después de todas las variables
     context = {
-        'skills_demand': skills_demand,
-        'skills_labels': skills_labels,
-        'skills_data': skills_data,
-        'sources_count': sources_count,
-        'sources_labels': sources_labels,
-        'sources_data': sources_data,
-        'asturias_skills': asturias_skills,
-        'total_offers': total_offers,
-        'companies_count': companies_count,
-        'platform_comparison': platform_comparison,
-        'future_skills': skill_trends,
-        'future_skills_labels': future_skills_labels,
-        'future_skills_data': future_skills_data,
+        **blocks,
+        **history,
+        'granularity': granularity,
         'recommended_tasks': recommended_tasks,
         'recent_offers': recent_offers,
         'search_query': search_query,
         'priority_filter': priority_filter,
+        'dedupe': dedupe,
+        'region': region,
+        'regions': sorted(REGIONS.items(), key=lambda item: item[1]),
     }
     
     return render(request, 'market_analysis/dashboard.html', context)
 
+# Encola la actualización de la fuente elegida; el worker en segundo plano ejecuta el scraper.
 def update_scraper(request):
     if request.method == 'POST':
         source = request.POST.get('source')
         try:
-            if source == 'LinkedIn':
-                scrape_linkedin(request)
-                messages.success(request, 'Datos de LinkedIn actualizados correctamente.')
-            elif source == 'Tecnoempleo':
-                scrape_tecnoempleo(request)
-                messages.success(request, 'Datos de Tecnoempleo actualizados correctamente.')
+            if source in ('LinkedIn', 'Tecnoempleo'):
+                job, created = enqueue_scrape_job(request.user, source)
+                if created:
+                    messages.success(request, f'Actualización de {source} encolada (trabajo #{job.pk}).')
+                else:
+                    messages.info(request, f'Ya hay una actualización de {source} en curso (trabajo #{job.pk}).')
         except Exception as e:
             messages.error(request, f'Error al actualizar {source}: {e}')
     return redirect('market_analysis:dashboard')
\ No newline at end of file
@@ -84,6 +84,32 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
+    // Histórico de demanda por semana o mes (Línea, una serie por habilidad)
+    if (document.getElementById('historyChart') && chartData.history) {
+        const historyColors = ['#4CAF50', '#2196F3', '#FF5722', '#9C27B0', '#FFC107'];
+        new Chart(document.getElementById('historyChart'), {
+            type: 'line',
+            data: {
+                labels: chartData.history.labels,
+                datasets: chartData.history.datasets.map((dataset, i) => ({
+                    ...dataset,
+                    borderColor: historyColors[i % historyColors.length],
+                    backgroundColor: historyColors[i % historyColors.length],
+                    borderWidth: 2,
+                    pointRadius: 2,
+                    fill: false
+                }))
+            },
+            options: {
+                scales: {
+                    x: { grid: { color: '#333333' }, ticks: { color: '#cccccc' } },
+                    y: { beginAtZero: true, grid: { color: '#333333' }, ticks: { color: '#cccccc' } }
+                },
+                plugins: { legend: { labels: { color: '#cccccc' } } }
+            }
+        });
+    }
+
     // Gráfico de Comparación 
     if (document.getElementById('comparisonChart')) {
         new Chart(document.getElementById('comparisonChart'), {